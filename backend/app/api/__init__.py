@@ -4,18 +4,28 @@ Sets up CORS middleware and includes API routes.
 Provides health check endpoint for monitoring application status.
 """
 
+import asyncio
 import logging
+import math
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.routes.health import router as health_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.v1 import router as v1_router
 from app.core.configs.config import settings
 from app.core.db import close_db, init_db
+from app.core.db.partitions import maintain_partitions
+from app.core.hands.registry import get_gesture_registry
 from app.core.logging import setup_logging
+from app.core.phrase_bank import get_phrase_bank
+from app.core.rate_limit import UpstreamBusyError
+from app.core.speech_to_text import get_stt_engine
+from app.core.text_to_speech import get_tts_engine
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +34,35 @@ logger = logging.getLogger(__name__)
 async def lifespan(_application: FastAPI) -> AsyncGenerator[None, None]:
     setup_logging(level="DEBUG" if settings.IS_DEBUG else "INFO")
     await init_db()
+    await get_stt_engine().start()
+    await get_tts_engine().start()
+    try:
+        await asyncio.to_thread(
+            get_gesture_registry().load,
+            settings.GESTURE_CONFIG_PATH,
+            max_batch_size=settings.GESTURE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.GESTURE_BATCH_WAIT_MS,
+            session_profile=settings.GESTURE_SESSION_PROFILE,
+            quantized=settings.GESTURE_QUANTIZED,
+            workers=settings.GESTURE_WORKERS,
+        )
+    except Exception as e:
+        logger.warning(f"Gesture model is not available, video recognition is disabled: {e}")
+    # Confirmations are synthesized in full until the bank is rendered
+    phrase_bank_task = asyncio.create_task(get_phrase_bank().keep_warm()) if settings.TTS_PHRASE_BANK else None
+    partitions_task = asyncio.create_task(
+        maintain_partitions(settings.REQUESTS_PARTITIONS_AHEAD, settings.REQUESTS_PARTITIONS_INTERVAL)
+    )
     logger.info("Application started")
 
     yield
 
+    partitions_task.cancel()
+    if phrase_bank_task is not None:
+        phrase_bank_task.cancel()
+    get_gesture_registry().close()
+    await get_tts_engine().close()
+    await get_stt_engine().close()
     await close_db()
 
 
@@ -45,5 +80,18 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+
+
+@app.exception_handler(UpstreamBusyError)
+async def upstream_busy_handler(_request: Request, exc: UpstreamBusyError) -> JSONResponse:
+    """An external API is over its quota: ask the client to retry instead of failing with 500."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(v1_router, prefix="/api")
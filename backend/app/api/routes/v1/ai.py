@@ -1,18 +1,24 @@
+import asyncio
 import logging
 import uuid
 import base64
 import httpx
 
 from app.api.schemas.ai import AIResponse
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, HTTPException, status, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 
 from app.api.schemas.speech_to_text import TextRequest
+from app.api.schemas.stream import ControlMessage
 from app.core.redis import get_redis_client
+from app.core.analytics import complete_request
 from app.core.db.models import Request as RequestModel
 from app.core.connector import wait_for_response
-from app.core.speech_to_text import speech_to_text, video_to_text
+from app.core.hands.registry import ModelNotLoadedError
+from app.core.speech_stream import SpeechStreamSession
+from app.core.speech_to_text import get_stt_engine, speech_to_text, video_to_text
 from app.core.configs.config import settings
+from app.core.rate_limit import UpstreamBusyError, get_upstream_limiter
 
 redis_client = get_redis_client()
 logger = logging.getLogger(__name__)
@@ -55,14 +61,19 @@ async def process_video(request: Request) -> AIResponse | None:
             # Wait for response with timeout
             response = await wait_for_response(request_uuid)
             # Update database record with the response
-            await RequestModel.filter(id=request_uuid).update(status="Completed", response=response)
+            await complete_request(request_uuid, response)
             return response
         except TimeoutError:
             return None
 
+    except ModelNotLoadedError as e:
+        logger.error(f"Video rejected: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UpstreamBusyError:
+        raise
     except Exception as e:
         logger.exception(f"Error processing audio: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error processing audio")
@@ -102,7 +113,7 @@ async def process_speech(request: Request) -> AIResponse | None:
             # Wait for response with timeout
             response = await wait_for_response(request_uuid)
             # Update database record with the response
-            await RequestModel.filter(id=request_uuid).update(status="Completed", response=response)
+            await complete_request(request_uuid, response)
             return response
         except TimeoutError:
             raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Timeout waiting for response")
@@ -110,11 +121,94 @@ async def process_speech(request: Request) -> AIResponse | None:
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UpstreamBusyError:
+        raise
     except Exception as e:
         logger.exception(f"Error processing audio: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error processing audio")
 
 
+@router.websocket("/speech/stream")
+async def stream_speech(websocket: WebSocket) -> None:
+    """
+    Streaming speech recognition.
+    The client sends binary messages with 16 kHz mono 16-bit little-endian PCM as it is recorded,
+    and may send {"type": "end"} to finalize the current utterance.
+    The server answers with {"type": "partial", "text"} while the user speaks (local engine only),
+    {"type": "final", "text", "request_id"} as soon as the utterance ends and
+    {"type": "response", "request_id", "response"} once the queued text is classified.
+    Malformed control frames are ignored.
+    """
+    await websocket.accept()
+    # Classification of every finalized utterance still in flight, by request ID
+    pending_responses: dict[asyncio.Task, uuid.UUID] = {}
+
+    async def send_partial(text: str) -> None:
+        await websocket.send_json({"type": "partial", "text": text})
+
+    async def send_error(_error: Exception) -> None:
+        await websocket.send_json({"type": "error", "detail": "Speech recognition failed"})
+
+    async def deliver_response(request_uuid: uuid.UUID) -> None:
+        try:
+            response = await wait_for_response(request_uuid)
+        except TimeoutError:
+            await websocket.send_json({"type": "error", "request_id": str(request_uuid), "detail": "Timeout"})
+            return
+        await complete_request(request_uuid, response)
+        await websocket.send_json(
+            {"type": "response", "request_id": str(request_uuid), "response": response.model_dump()}
+        )
+
+    async def send_final(text: str) -> None:
+        request_uuid = uuid.uuid4()
+        # Queue classification right away, the client keeps streaming the next utterance meanwhile
+        await redis_client.queue_text_request(str(request_uuid), text)
+        await websocket.send_json({"type": "final", "text": text, "request_id": str(request_uuid)})
+        await RequestModel.create(id=request_uuid, request_type="speech", input_text=text, status="Processing")
+        task = asyncio.create_task(deliver_response(request_uuid))
+        pending_responses[task] = request_uuid
+        task.add_done_callback(lambda done: pending_responses.pop(done, None))
+
+    engine = get_stt_engine()
+    session = SpeechStreamSession(
+        engine,
+        on_partial=send_partial,
+        on_final=send_final,
+        on_error=send_error,
+        # Every partial re-sends the open segment, which only a local engine does for free
+        partial_interval_ms=1000 if engine.local else None,
+    )
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                await session.feed(message["bytes"])
+            elif message.get("text"):
+                control = ControlMessage.parse(message["text"])
+                if control is None:
+                    logger.debug("Ignoring a malformed control frame in speech stream")
+                elif control.type == "end":
+                    await session.flush()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception(f"Error in speech stream: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        await session.close()
+        abandoned = [request_uuid for task, request_uuid in list(pending_responses.items()) if not task.done()]
+        for task in list(pending_responses):
+            task.cancel()
+        if abandoned:
+            try:
+                await RequestModel.filter(id__in=abandoned).update(status="Failed")
+            except Exception as e:
+                logger.warning(f"Failed to mark abandoned speech stream requests as failed: {e}")
+
+
 @router.post("/text", status_code=status.HTTP_200_OK, response_model=AIResponse)
 async def process_text(request: TextRequest) -> AIResponse:
     """
@@ -134,7 +228,7 @@ async def process_text(request: TextRequest) -> AIResponse:
             # Wait for response with timeout
             response = await wait_for_response(request_uuid)
             # Update database record with the response
-            await RequestModel.filter(id=request_uuid).update(status="Completed", response=response)
+            await complete_request(request_uuid, response)
             return response
         except TimeoutError:
             raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Timeout waiting for response")
@@ -163,13 +257,16 @@ async def upload_image_to_gigachat(image_data: str) -> str:
             'Authorization': f'Bearer {settings.GIGACHAT_TOKEN}'
         }
         
-        async with httpx.AsyncClient() as client:
+        limiter = get_upstream_limiter("gigachat")
+        async with httpx.AsyncClient() as client, limiter.acquire():
             response = await client.post(
                 f"{GIGACHAT_API_URL}/files",
                 headers=headers,
                 files=files
             )
             
+            if response.status_code == 429:
+                raise limiter.throttled(response.headers.get("Retry-After"))
             if not response.is_success:
                 raise ValueError(f"Failed to upload image: {response.text}")
             
@@ -205,13 +302,16 @@ async def process_image_with_gigachat(file_id: str) -> dict:
             "update_interval": 0
         }
         
-        async with httpx.AsyncClient() as client:
+        limiter = get_upstream_limiter("gigachat")
+        async with httpx.AsyncClient() as client, limiter.acquire():
             response = await client.post(
                 f"{GIGACHAT_API_URL}/chat/completions",
                 headers=headers,
                 json=payload
             )
             
+            if response.status_code == 429:
+                raise limiter.throttled(response.headers.get("Retry-After"))
             if not response.is_success:
                 raise ValueError(f"Failed to process with GigaChat: {response.text}")
             
@@ -277,6 +377,8 @@ async def process_gesture(request: Request) -> AIResponse | None:
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UpstreamBusyError:
+        raise
     except Exception as e:
         logger.exception(f"Error processing gesture: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error processing gesture")
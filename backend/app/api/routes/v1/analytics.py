@@ -0,0 +1,28 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.api.schemas.analytics import TaskStats, TaskStatsResponse
+from app.core.analytics import task_stats
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["analytics"])
+
+
+@router.get("/tasks", status_code=status.HTTP_200_OK, response_model=TaskStatsResponse)
+async def get_task_stats(
+    since: datetime | None = Query(None, description="Start of the range, 24 hours ago by default"),
+    until: datetime | None = Query(None, description="End of the range, exclusive, now by default"),
+    granularity: Literal["hour", "day"] = Query("hour"),
+) -> TaskStatsResponse:
+    """
+    Calls and latency percentiles per task, from the hourly rollups.
+    """
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=1)
+    if since >= until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'since' must be before 'until'")
+    stats = await task_stats(since, until, granularity)
+    return TaskStatsResponse(items=[TaskStats(**entry) for entry in stats])
@@ -0,0 +1,79 @@
+import logging
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.api.schemas.history import HistoryItem, HistoryPage
+from app.core.export import MEDIA_TYPES, export_requests
+from app.core.history import MAX_PAGE_SIZE, fetch_history
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["history"])
+
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=HistoryPage)
+async def get_history(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    request_type: str | None = Query(None, description="speech, text, video or gesture"),
+    request_status: str | None = Query(None, alias="status"),
+    task: str | None = Query(None, description="Task the AI chose, e.g. call_elevator"),
+    created_after: datetime | None = Query(None, description="Inclusive lower bound of created_at"),
+    created_before: datetime | None = Query(None, description="Exclusive upper bound of created_at"),
+) -> HistoryPage:
+    """
+    Request history, newest first, paged with an opaque cursor.
+    """
+    try:
+        rows, next_cursor = await fetch_history(
+            limit=limit,
+            cursor=cursor,
+            request_type=request_type,
+            status=request_status,
+            task=task,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    items = [
+        HistoryItem(
+            id=row.id,
+            request_type=row.request_type,
+            input_text=row.input_text,
+            status=row.status,
+            response=row.response,
+            task=row.task,
+            latency_ms=row.latency_ms,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        for row in rows
+    ]
+    return HistoryPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_history(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    since: datetime | None = Query(None, description="Inclusive lower bound of created_at"),
+    until: datetime | None = Query(None, description="Exclusive upper bound of created_at"),
+    task: str | None = Query(None, description="Task the AI chose, e.g. call_elevator"),
+    request_type: str | None = Query(None, description="speech, text, video or gesture"),
+    request_status: str | None = Query(None, alias="status"),
+) -> StreamingResponse:
+    """
+    Request history, oldest first, streamed as NDJSON or CSV for model retraining.
+    NDJSON exports can be passed to posttrain/train.py as the dataset as they are.
+    """
+    chunks = export_requests(
+        export_format, since=since, until=until, task=task, request_type=request_type, status=request_status
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="requests.{export_format}"'},
+    )
@@ -1,54 +1,59 @@
-from io import BytesIO
 import logging
+from typing import AsyncIterator
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from gtts import gTTS
+from app.api.schemas.text_to_speech import ConfirmationRequest, TextToSpeechRequest
+from app.core.configs.config import settings
+from app.core.phrase_bank import get_phrase_bank
+from app.core.text_to_speech import get_tts_service
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["ping"])
+router = APIRouter(tags=["tts"])
 
 
-class RequestData(BaseModel):
-    text: str
+@router.post("", status_code=status.HTTP_200_OK)
+async def synthesize_speech(data: TextToSpeechRequest) -> StreamingResponse:
+    """
+    Synthesize speech, streamed sentence by sentence as each one is ready.
+    """
+    service = get_tts_service()
+    lang = data.lang or settings.TTS_LANGUAGE
+    try:
+        service.validate(data.text, lang, data.voice)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    chunks = service.stream(data.text, lang=lang, voice=data.voice)
+    # Wait for the first sentence, so a failing synthesizer is an error status, not a cut stream
+    try:
+        first = await anext(chunks, b"")
+    except Exception as e:
+        logger.exception(f"Error synthesizing speech: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error synthesizing speech")
 
+    async def audio() -> AsyncIterator[bytes]:
+        yield first
+        async for chunk in chunks:
+            yield chunk
 
-@router.post("", status_code=status.HTTP_200_OK)
-async def text_to_speech(data: RequestData) -> StreamingResponse:
-    """Ping us!"""
-    audio_bytes = text_to_speech(data.text)
-    return StreamingResponse(audio_bytes, media_type="audio/mp3")
+    return StreamingResponse(audio(), media_type=service.media_type)
 
 
-def text_to_speech(text: str) -> BytesIO:
+@router.post("/confirmation", status_code=status.HTTP_200_OK)
+async def speak_confirmation(data: ConfirmationRequest) -> Response:
     """
-    Конвертация текста в речь с использованием Google Text-to-Speech
-    
-    Args:
-        text: Текст для преобразования
-        
-    Returns:
-        str: Путь к созданному аудио файлу или пустая строка в случае ошибки
+    Spoken confirmation of a task, assembled from the pre-rendered phrase bank when possible.
+    The X-TTS-Source header tells whether it came from the bank or from full synthesis.
     """
+    bank = get_phrase_bank()
     try:
-        # Создаем объект gTTS
-        tts = gTTS(text=text, lang='ru', slow=False)
-        # save audio to bytes object
-        audio_bytes = BytesIO()
-        tts.write_to_fp(audio_bytes)
-        audio_bytes.seek(0)
-        
-        return audio_bytes
-
+        audio, source = await bank.confirmation(data.task, data.parameters)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No confirmation for task {data.task}")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        print(f"Ошибка при конвертации текста в речь: {str(e)}")
-        return ""
-
-if __name__ == "__main__":
-
-    text = "Привет, это тестовое сообщение через Google Text-to-Speech"
-    result = text_to_speech(text, "output.mp3")
-    if result:
-        print(f"Аудио сохранено в: {result}")
\ No newline at end of file
+        logger.exception(f"Error synthesizing confirmation: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error synthesizing speech")
+    return Response(audio, media_type=bank.service.media_type, headers={"X-TTS-Source": source})
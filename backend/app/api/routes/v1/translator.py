@@ -1,15 +1,23 @@
+import asyncio
 import logging
-import uuid
+import time
 import base64
-import httpx
 
 from gigachat import GigaChat
-from app.api.schemas.ai import AIResponse, GigaChatResponse
-from fastapi import APIRouter, HTTPException, status, Request
+from gigachat.exceptions import ResponseError
+from app.api.schemas.ai import GigaChatResponse
+from app.api.schemas.stream import ControlMessage
+from fastapi import APIRouter, HTTPException, status, Request, WebSocket, WebSocketDisconnect
 
+from app.core.cache import content_digest, get_gesture_text_cache, get_gigachat_file_cache
+from app.core.image import dhash, prepare_for_upload
+from app.core.metrics import Counter, Histogram
+from app.core.rate_limit import UpstreamBusyError, get_upstream_limiter
 from app.core.redis import get_redis_client
-from app.core.db.models import Request as RequestModel
 from app.core.configs.config import settings
+from app.core.hands.registry import get_gesture_registry
+from app.core.hands.snapshot import recognize_snapshot, snapshot_requests
+from app.core.hands.stream import GestureStreamSession
 
 redis_client = get_redis_client()
 logger = logging.getLogger(__name__)
@@ -22,19 +30,105 @@ gigachat_client = GigaChat(
     scope='GIGACHAT_API_PERS',
     model='GigaChat-Max'
 )
+
+upload_bytes = Counter(
+    "gigachat_upload_bytes_total", "Gesture image bytes received from clients and uploaded to GigaChat"
+)
+upload_latency = Histogram("gigachat_upload_seconds", "Preparing and uploading a gesture image to GigaChat")
+request_latency = Histogram(
+    "gesture_image_request_seconds", "End-to-end gesture image recognition by the recognizer that answered"
+)
         
 
-async def upload_image_to_gigachat(image_data: str) -> str:
-    """Upload image to GigaChat and return file ID."""
+def decode_base64_image(image_data: str) -> bytes:
+    """Decode a base64 image, with or without the data URL prefix."""
+    # Remove data:image/jpeg;base64, prefix if present
+    if ',' in image_data:
+        image_data = image_data.split(',')[1]
     try:
-        # Remove data:image/jpeg;base64, prefix if present
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
-        
-        # Decode base64 to bytes
         image_bytes = base64.b64decode(image_data)
-        
-        file_id = await gigachat_client.aupload_file(('image.jpg', image_bytes, 'image/jpeg'))
+    except ValueError:
+        raise ValueError("Image must be base64 encoded")
+    if not image_bytes:
+        raise ValueError("Image is empty")
+    return image_bytes
+
+
+async def recognize_locally(images: list[bytes]) -> GigaChatResponse | None:
+    """
+    Recognize the gesture with the local model.
+
+    Returns:
+        GigaChatResponse | None: The answer, None when the model is not loaded, cannot
+            decode the images, fails or is not confident enough.
+    """
+    registry = get_gesture_registry()
+    if not settings.GESTURE_LOCAL_FIRST or not registry.is_loaded:
+        return None
+    try:
+        frames = await registry.batcher.adecode_frames(images)
+        label, confidence = await recognize_snapshot(registry.batcher, frames)
+    except ValueError as e:
+        logger.warning(f"Local gesture recognition skipped: {e}")
+        return None
+    except Exception as e:
+        # A broken local model must not fail the request while GigaChat can still answer
+        logger.exception(f"Local gesture recognition failed, falling back to GigaChat: {e}")
+        return None
+
+    threshold = settings.GESTURE_LOCAL_THRESHOLD
+    if threshold is None:
+        threshold = registry.config["threshold"]
+    logger.debug(f"Local gesture recognition: {label}, confidence={confidence:.3f}, threshold={threshold}")
+    if label is None or confidence < threshold:
+        return None
+    return GigaChatResponse(text=label, source="local", confidence=confidence)
+
+
+async def call_gigachat(method, *args):
+    """Run a GigaChat client call under the GigaChat limit shared by all replicas."""
+    limiter = get_upstream_limiter("gigachat")
+    async with limiter.acquire():
+        try:
+            return await method(*args)
+        except ResponseError as e:
+            # Older client versions keep (url, status_code, content, headers) only in args
+            status_code = getattr(e, "status_code", e.args[1] if len(e.args) > 1 else None)
+            if status_code == 429:
+                headers = getattr(e, "headers", e.args[3] if len(e.args) > 3 else None) or {}
+                raise limiter.throttled(headers.get("Retry-After")) from e
+            raise
+
+
+async def upload_image_to_gigachat(image_bytes: bytes) -> str:
+    """
+    Upload image to GigaChat and return file ID, reusing the file of a byte-identical image.
+    The image is downscaled and re-encoded off the event loop first, unless GIGACHAT_IMAGE_MAX_SIDE is 0.
+    """
+    try:
+        cache = get_gigachat_file_cache()
+        digest = await asyncio.to_thread(content_digest, image_bytes)
+        cached = await cache.get(digest)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        upload_bytes.inc(len(image_bytes), stage="received")
+        if settings.GIGACHAT_IMAGE_MAX_SIDE:
+            try:
+                image_bytes = await asyncio.to_thread(
+                    prepare_for_upload,
+                    image_bytes,
+                    max_side=settings.GIGACHAT_IMAGE_MAX_SIDE,
+                    quality=settings.GIGACHAT_IMAGE_QUALITY,
+                )
+            except ValueError as e:
+                logger.warning(f"Uploading the image as is: {e}")
+        upload_bytes.inc(len(image_bytes), stage="uploaded")
+
+        file_id = await call_gigachat(gigachat_client.aupload_file, ('image.jpg', image_bytes, 'image/jpeg'))
+        upload_latency.observe(time.perf_counter() - started)
+        await cache.set(digest, file_id.id_)
         return file_id.id_
     except Exception as e:
         logger.error(f"Error uploading image to GigaChat: {e}")
@@ -49,7 +143,11 @@ async def process_image_with_gigachat(file_id: str) -> dict:
             "messages": [
                 {
                     "role": "system",
-                    "content": "Ты - система распознавания жестов русского жестового языка. Опиши, какой жест показан на изображении человеком, и определи его значение. В ответ дай одно слово или фразу, которую имеет ввиду человек, сделавший жест. Постарайся быть как можно точнее."
+                    "content": (
+                        "Ты - система распознавания жестов русского жестового языка. Опиши, какой жест "
+                        "показан на изображении человеком, и определи его значение. В ответ дай одно слово "
+                        "или фразу, которую имеет ввиду человек, сделавший жест. Постарайся быть как можно точнее."
+                    ),
                 },
                 {
                     "role": "user",
@@ -58,7 +156,7 @@ async def process_image_with_gigachat(file_id: str) -> dict:
                 }
             ],
         }
-        result = await gigachat_client.achat(payload)
+        result = await call_gigachat(gigachat_client.achat, payload)
 
         return result.choices[0].message.content
                 
@@ -67,31 +165,59 @@ async def process_image_with_gigachat(file_id: str) -> dict:
         raise
 
 
+async def recognize_with_gigachat(image_bytes: bytes) -> str:
+    """Recognize the gesture with GigaChat, reusing the answer for a visually identical image."""
+    cache = get_gesture_text_cache()
+    try:
+        image_hash = await asyncio.to_thread(dhash, image_bytes)
+    except ValueError:
+        # Not decodable here, GigaChat may still accept it
+        image_hash = None
+    if image_hash is not None:
+        cached = await cache.get(image_hash)
+        if cached is not None:
+            return cached
+
+    file_id = await upload_image_to_gigachat(image_bytes)
+    text = await process_image_with_gigachat(file_id)
+    if image_hash is not None and text:
+        await cache.set(image_hash, text)
+    return text
+
+
 @router.post("/raspalcovka", status_code=status.HTTP_200_OK, response_model=GigaChatResponse)
 async def process_gesture(request: Request) -> GigaChatResponse | None:
     """
-    Process gesture image using GigaChat API.
-    The request body should contain base64 encoded image.
+    Recognize a gesture image, locally first and with GigaChat API when the local model is not confident.
+    The request body should contain base64 encoded image, or 'images' with a short clip of
+    base64 encoded frames. The response reports which recognizer answered in 'source'.
     """
     try:
         # Read JSON from request body
         data = await request.json()
-        image_data = data.get('image')
+        images = data.get('images') or ([data['image']] if data.get('image') else [])
         
-        if not image_data:
+        if not images:
             raise ValueError("Request body must contain 'image' field with base64 encoded image")
+        if not isinstance(images, list) or not all(isinstance(image, str) for image in images):
+            raise ValueError("'images' must be a list of base64 encoded images")
+        images = await asyncio.to_thread(list, map(decode_base64_image, images))
 
-        # Generate unique ID for this request
-        request_uuid = uuid.uuid4()
+        started = time.perf_counter()
 
         try:
-            # Upload image to GigaChat
-            file_id = await upload_image_to_gigachat(image_data)
-            
-            # Process with GigaChat
-            response = await process_image_with_gigachat(file_id)
+            local = await recognize_locally(images)
+            if local is not None:
+                snapshot_requests.inc(source="local")
+                request_latency.observe(time.perf_counter() - started, source="local")
+                return local
+
+            # Recognize the middle frame with GigaChat
+            response = await recognize_with_gigachat(images[len(images) // 2])
             
-            return GigaChatResponse(text=response)
+            snapshot_requests.inc(source="gigachat")
+            request_latency.observe(time.perf_counter() - started, source="gigachat")
+            return GigaChatResponse(text=response, source="gigachat")
             
         except ValueError as e:
             raise ValueError(str(e))
@@ -99,6 +225,55 @@ async def process_gesture(request: Request) -> GigaChatResponse | None:
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UpstreamBusyError:
+        raise
     except Exception as e:
         logger.exception(f"Error processing gesture: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error processing gesture")
+
+
+@router.websocket("/stream")
+async def stream_gestures(websocket: WebSocket) -> None:
+    """
+    Real-time gesture recognition session.
+    The client sends camera frames as binary messages, either JPEG/PNG/WebP images or raw
+    224x224 RGB pixels, and may send {"type": "end"} to get the final phrase.
+    The server sends {"type": "gesture", "gesture", "phrase"} whenever a new gesture stabilizes
+    and {"type": "final", "text"} at the end of the session. Malformed control frames are ignored.
+    """
+    await websocket.accept()
+    try:
+        model = get_gesture_registry().batcher
+    except RuntimeError as e:
+        logger.error(f"Gesture stream rejected: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    async def send_gesture(gesture: str, phrase: str) -> None:
+        await websocket.send_json({"type": "gesture", "gesture": gesture, "phrase": phrase})
+
+    session = GestureStreamSession(model, on_gesture=send_gesture)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                try:
+                    await session.feed(message["bytes"])
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+            elif message.get("text"):
+                control = ControlMessage.parse(message["text"])
+                if control is None:
+                    logger.debug("Ignoring a malformed control frame in gesture stream")
+                elif control.type == "end":
+                    await session.close()
+                    await websocket.send_json({"type": "final", "text": session.phrase})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception(f"Error in gesture stream: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        await session.close()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -10,4 +12,6 @@ class AIResponse(BaseModel):
 
 class GigaChatResponse(BaseModel):
     text: str
+    source: Literal["local", "gigachat"] = Field("gigachat", description="Which recognizer answered")
+    confidence: float | None = Field(None, description="Confidence of the local model, if it answered")
 
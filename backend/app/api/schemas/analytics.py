@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class TaskStats(BaseModel):
+    bucket: datetime = Field(..., description="Start of the period")
+    request_type: str
+    task: str | None = Field(None, description="Task the AI chose, null for answers without one")
+    requests: int
+    mean_latency_ms: float
+    p50_latency_ms: float | None
+    p95_latency_ms: float | None
+    p99_latency_ms: float | None
+
+
+class TaskStatsResponse(BaseModel):
+    items: list[TaskStats]
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class HistoryItem(BaseModel):
+    id: UUID
+    request_type: str = Field(..., description="speech, text, video or gesture")
+    input_text: str | None
+    status: str
+    response: Any = Field(None, description="Response as stored: the AI answer object or recognized text")
+    task: str | None
+    latency_ms: int | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class HistoryPage(BaseModel):
+    items: list[HistoryItem]
+    next_cursor: str | None = Field(None, description="Pass as 'cursor' to get the next page, null on the last page")
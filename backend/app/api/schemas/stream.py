@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ValidationError
+
+
+class ControlMessage(BaseModel):
+    """Text frame of a streaming websocket, e.g. {"type": "end"}."""
+
+    type: str
+
+    @classmethod
+    def parse(cls, text: str) -> "ControlMessage | None":
+        """Parse a control frame, None if it is not a JSON object with a type."""
+        try:
+            return cls.model_validate_json(text)
+        except ValidationError:
+            return None
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class TextToSpeechRequest(BaseModel):
+    text: str = Field(..., min_length=1, description="Text to synthesize")
+    lang: str | None = Field(None, description="Language code, the configured default if omitted")
+    voice: str = Field("", description="Engine-specific voice, the engine default if empty")
+
+
+class ConfirmationRequest(BaseModel):
+    task: str = Field(..., description="Task type, e.g. call_elevator")
+    parameters: dict[str, str | int] = Field(default_factory=dict, description="Parameters of the task")
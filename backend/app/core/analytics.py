@@ -0,0 +1,129 @@
+"""
+Server-side analytics of completed AI requests.
+
+Every completion updates its request row and an hourly rollup row (request type, task)
+in one statement, so per-task counts and latency percentiles are read from a few
+rollup rows instead of scanning and parsing the requests table. Latencies are kept as
+a histogram over LATENCY_BOUNDS_MS; percentiles are interpolated within a bucket.
+"""
+
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+from pydantic import BaseModel
+from tortoise import Tortoise
+
+# Upper bounds of the latency histogram buckets; one more bucket holds everything above
+LATENCY_BOUNDS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+COMPLETE_REQUEST_SQL = f"""
+WITH done AS (
+    UPDATE requests
+    SET status = $2, response = $3::JSONB, task = $4,
+        latency_ms = (EXTRACT(EPOCH FROM now() - created_at) * 1000)::INT, updated_at = now()
+    -- The time bound lets Postgres prune the partitions the request cannot be in
+    WHERE id = $1 AND created_at > now() - interval '1 day'
+    RETURNING created_at, request_type, task, latency_ms
+)
+INSERT INTO request_rollups AS r (bucket, request_type, task, requests, latency_sum_ms, latency_buckets)
+SELECT
+    date_trunc('hour', created_at, 'UTC'), request_type, COALESCE(task, ''), 1, latency_ms,
+    ARRAY(
+        SELECT (i = width_bucket(latency_ms, ARRAY{list(LATENCY_BOUNDS_MS)}) + 1)::INT::BIGINT
+        FROM generate_series(1, {len(LATENCY_BOUNDS_MS) + 1}) AS i
+    )
+FROM done
+ON CONFLICT (bucket, request_type, task) DO UPDATE SET
+    requests = r.requests + 1,
+    latency_sum_ms = r.latency_sum_ms + EXCLUDED.latency_sum_ms,
+    latency_buckets = ARRAY(
+        SELECT a + b FROM unnest(r.latency_buckets, EXCLUDED.latency_buckets) AS t(a, b)
+    )
+"""
+
+ROLLUPS_SQL = """
+SELECT date_trunc($3, bucket, 'UTC') AS bucket, request_type, task, requests, latency_sum_ms, latency_buckets
+FROM request_rollups
+WHERE bucket >= $1 AND bucket < $2
+"""
+
+
+async def complete_request(request_id: UUID, response: BaseModel, status: str = "Completed") -> None:
+    """
+    Store the response of a request and count it in the hourly rollup.
+
+    Args:
+        request_id: ID of the request row.
+        response: Response of the ML service; its task goes into the indexed task column.
+        status: New status of the request.
+    """
+    await Tortoise.get_connection("default").execute_query(
+        COMPLETE_REQUEST_SQL,
+        [request_id, status, json.dumps(response.model_dump(), ensure_ascii=False), getattr(response, "task", None)],
+    )
+
+
+def histogram_percentile(buckets: list[int], q: float) -> float | None:
+    """
+    Latency percentile from a histogram over LATENCY_BOUNDS_MS.
+
+    Args:
+        buckets: Request counts per bucket.
+        q: Percentile from 0 to 100.
+
+    Returns:
+        Latency in ms interpolated within its bucket, the last bound if it falls above
+        all bounds, None for an empty histogram.
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q / 100 * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            if index == len(LATENCY_BOUNDS_MS):
+                return float(LATENCY_BOUNDS_MS[-1])
+            lower = LATENCY_BOUNDS_MS[index - 1] if index else 0
+            return lower + (LATENCY_BOUNDS_MS[index] - lower) * (rank - seen) / count
+        seen += count
+    return float(LATENCY_BOUNDS_MS[-1])
+
+
+async def task_stats(since: datetime, until: datetime, granularity: str = "hour") -> list[dict]:
+    """
+    Per-task request counts and latency percentiles.
+
+    Args:
+        since: Start of the first period.
+        until: End of the last period, exclusive.
+        granularity: Period length, "hour" or "day" (days in UTC).
+
+    Returns:
+        One dict per period, request type and task, ordered by period.
+    """
+    rows = await Tortoise.get_connection("default").execute_query_dict(ROLLUPS_SQL, [since, until, granularity])
+    merged: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["bucket"], row["request_type"], row["task"])
+        entry = merged.setdefault(
+            key, {"requests": 0, "latency_sum_ms": 0, "buckets": [0] * len(row["latency_buckets"])}
+        )
+        entry["requests"] += row["requests"]
+        entry["latency_sum_ms"] += row["latency_sum_ms"]
+        entry["buckets"] = [a + b for a, b in zip(entry["buckets"], row["latency_buckets"])]
+
+    return [
+        {
+            "bucket": bucket.astimezone(timezone.utc),
+            "request_type": request_type,
+            "task": task or None,
+            "requests": entry["requests"],
+            "mean_latency_ms": entry["latency_sum_ms"] / entry["requests"],
+            "p50_latency_ms": histogram_percentile(entry["buckets"], 50),
+            "p95_latency_ms": histogram_percentile(entry["buckets"], 95),
+            "p99_latency_ms": histogram_percentile(entry["buckets"], 99),
+        }
+        for (bucket, request_type, task), entry in sorted(merged.items(), key=lambda item: item[0])
+    ]
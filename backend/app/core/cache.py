@@ -0,0 +1,230 @@
+"""
+Caching utilities.
+
+Provides a thread-safe in-process LRU cache with optional TTL and a two-tier cache that
+layers the LRU in front of Redis for string values such as transcripts.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable
+
+from app.core.configs.config import settings
+from app.core.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+cache_requests = Counter("cache_requests_total", "Two-tier cache lookups by cache and result")
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used mapping with optional per-entry time to live.
+
+    Args:
+        maxsize: Maximum number of entries kept.
+        ttl: Seconds an entry stays valid, None for no expiry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def content_digest(data: bytes, *scope: str) -> str:
+    """
+    Content address of raw input bytes.
+
+    Args:
+        data: Input bytes.
+        *scope: Anything else the cached result depends on, e.g. the model that produced it.
+    """
+    digest = hashlib.sha256()
+    for part in scope:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class TieredCache:
+    """
+    In-process LRU in front of Redis for string values.
+
+    Redis access goes through the given RedisClient methods, so every cache keeps its own
+    key layout; Redis failures degrade to a miss. Redis hits are promoted into the LRU so
+    repeated lookups are served without a round-trip.
+
+    Args:
+        name: Cache name in metrics and logs.
+        fetch: Coroutine reading a value from Redis by key.
+        store: Coroutine writing a value to Redis by key with a TTL.
+        maxsize: Maximum number of entries kept in memory.
+        ttl: Seconds an entry stays valid in both tiers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[str], Awaitable[str | None]],
+        store: Callable[[str, str, int], Awaitable[None]],
+        maxsize: int,
+        ttl: int,
+    ):
+        self.name = name
+        self._fetch = fetch
+        self._store = store
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._ttl = ttl
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """
+        Cached value of a key, computed by `compute` on a miss.
+
+        Concurrent misses of the same key share one computation. Empty values are not
+        cached. Errors of `compute` reach every waiting caller.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        future = self._inflight.get(key)
+        if future is not None:
+            cache_requests.inc(cache=self.name, result="coalesced")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The caller that started the computation went away, compute it here
+                return await self.get_or_compute(key, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an error nobody else waited for is not reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._inflight[key]
+        if value:
+            await self.set(key, value)
+        return value
+
+    async def get(self, key: str) -> str | None:
+        value = self._memory.get(key)
+        if value is not None:
+            cache_requests.inc(cache=self.name, result="memory_hit")
+            return value
+        try:
+            value = await self._fetch(key)
+        except Exception as e:
+            logger.warning(f"Cache {self.name} lookup failed: {e}")
+            value = None
+        if value is None:
+            cache_requests.inc(cache=self.name, result="miss")
+            return None
+        cache_requests.inc(cache=self.name, result="redis_hit")
+        self._memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._memory.set(key, value)
+        try:
+            await self._store(key, value, self._ttl)
+        except Exception as e:
+            logger.warning(f"Cache {self.name} store failed: {e}")
+
+
+@lru_cache()
+def get_transcript_cache() -> TieredCache:
+    """Get singleton cache of recognition results, keyed by input kind and content digest"""
+    # Imported here: app.core.redis pulls in app.api, whose routes import this module
+    from app.core.redis import get_redis_client
+
+    redis_client = get_redis_client()
+    return TieredCache(
+        "transcript",
+        redis_client.get_transcript,
+        redis_client.set_transcript,
+        maxsize=settings.STT_CACHE_SIZE,
+        ttl=settings.STT_CACHE_TTL,
+    )
+
+
+@lru_cache()
+def get_gesture_text_cache() -> TieredCache:
+    """Get singleton cache of gestures recognized by GigaChat, keyed by perceptual image hash"""
+    from app.core.redis import get_redis_client
+
+    redis_client = get_redis_client()
+    return TieredCache(
+        "gesture_text",
+        redis_client.get_gesture_text,
+        redis_client.set_gesture_text,
+        maxsize=settings.GIGACHAT_CACHE_SIZE,
+        ttl=settings.GIGACHAT_TEXT_CACHE_TTL,
+    )
+
+
+@lru_cache()
+def get_gigachat_file_cache() -> TieredCache:
+    """Get singleton cache of GigaChat file IDs, keyed by image content digest"""
+    from app.core.redis import get_redis_client
+
+    redis_client = get_redis_client()
+    return TieredCache(
+        "gigachat_file",
+        redis_client.get_gigachat_file_id,
+        redis_client.set_gigachat_file_id,
+        maxsize=settings.GIGACHAT_CACHE_SIZE,
+        ttl=settings.GIGACHAT_FILE_CACHE_TTL,
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, SecretStr
 
 
@@ -18,11 +20,93 @@ class DataBaseConfigsModel(BaseModel):
     DB_HOST: str
     DB_PORT: str
     DB_NAME: str
+    # Monthly partitions of the requests table created in advance
+    REQUESTS_PARTITIONS_AHEAD: int = 2
+    # Seconds between checks that the upcoming partitions exist
+    REQUESTS_PARTITIONS_INTERVAL: int = 6 * 60 * 60
+    # Full months of requests kept in the database besides the current one
+    REQUESTS_RETENTION_MONTHS: int = 12
+    REQUESTS_ARCHIVE_DIR: str = "archive/requests"
+
+
+class UserCacheConfigsModel(BaseModel):
+    USER_CACHE_SIZE: int = 10000
+    # In-process copies of user settings; Redis keeps them for 7 days
+    USER_CACHE_TTL: int = 60
+    # Unknown users and users without a language are remembered for this long
+    USER_NEGATIVE_CACHE_TTL: int = 5 * 60
+
+
+class SpeechConfigsModel(BaseModel):
+    STT_ENGINE: Literal["hf", "local"] = "hf"
+    STT_LANGUAGE: str | None = "ru"
+    STT_LOCAL_MODEL: str = "small"
+    STT_LOCAL_COMPUTE_TYPE: str = "int8"
+    STT_WORKERS: int = 2
+    STT_CPU_THREADS: int = 2
+    STT_CACHE_SIZE: int = 1024
+    STT_CACHE_TTL: int = 60 * 60 * 24
+    TTS_ENGINE: Literal["gtts", "piper"] = "gtts"
+    TTS_PIPER_MODEL: str = "models/tts/ru_RU-irina-medium.onnx"
+    TTS_LOCAL_WORKERS: int = 2
+    TTS_LANGUAGE: str = "ru"
+    TTS_WORKERS: int = 4
+    TTS_CACHE_DIR: str = "cache/tts"
+    TTS_CACHE_TTL: int = 60 * 60 * 24 * 7
+    # Size of the disk tier of the TTS cache, 0 keeps audio in Redis only
+    TTS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Render the task confirmation phrase bank at startup
+    TTS_PHRASE_BANK: bool = True
+
+
+class GestureConfigsModel(BaseModel):
+    GESTURE_CONFIG_PATH: str = "configs/config.json"
+    GESTURE_MAX_BATCH_SIZE: int = 8
+    GESTURE_BATCH_WAIT_MS: float = 5.0
+    # Worker processes for gesture inference, 0 runs the model in the web server process
+    GESTURE_WORKERS: int = 0
+    # /translator/raspalcovka: try the local model first, GigaChat only below the threshold
+    GESTURE_LOCAL_FIRST: bool = True
+    GESTURE_LOCAL_THRESHOLD: float | None = None  # defaults to the model config threshold
+    # Overrides of the model config: session profile name and the INT8 model variant
+    GESTURE_SESSION_PROFILE: str | None = None
+    GESTURE_QUANTIZED: bool | None = None
+    # /video decodes at most this much of a clip; 224x224 RGB frames take ~4.5 MB per second
+    GESTURE_VIDEO_MAX_SECONDS: float = 30.0
+
+
+class GigaChatConfigsModel(BaseModel):
+    GIGACHAT_CACHE_SIZE: int = 1024
+    # Visually identical frames reuse the recognized gesture for this long
+    GIGACHAT_TEXT_CACHE_TTL: int = 10 * 60
+    # Byte-identical images reuse the uploaded file
+    GIGACHAT_FILE_CACHE_TTL: int = 60 * 60 * 24
+    # Uploaded images are downscaled to this longest side and re-encoded as JPEG
+    GIGACHAT_IMAGE_MAX_SIDE: int = 1024
+    GIGACHAT_IMAGE_QUALITY: int = 85
+
+
+class RateLimitConfigsModel(BaseModel):
+    # Longest time a call to an external API queues for the limiter before failing with 503
+    UPSTREAM_MAX_WAIT: float = 5.0
+    # Per upstream: sustained calls per second, burst after idle and calls in flight,
+    # shared by all replicas
+    HF_RATE_LIMIT: float = 2.0
+    HF_BURST: int = 5
+    HF_CONCURRENCY: int = 4
+    GIGACHAT_RATE_LIMIT: float = 1.0
+    GIGACHAT_BURST: int = 5
+    GIGACHAT_CONCURRENCY: int = 2
 
 
 class SettingsModel(
     BaseConfigsModel,
     RedisConfigsModel,
     DataBaseConfigsModel,
+    UserCacheConfigsModel,
+    SpeechConfigsModel,
+    GestureConfigsModel,
+    GigaChatConfigsModel,
+    RateLimitConfigsModel,
 ):
     pass
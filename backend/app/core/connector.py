@@ -3,14 +3,14 @@ import uuid
 from datetime import datetime, timedelta
 import logging
 
-from app.core.redis import get_redis_client
+from app.core.redis import AI_RESPONSE_TIMEOUT, get_redis_client
 from app.api.schemas.ai import AIResponse
 
 logger = logging.getLogger(__name__)
 redis_client = get_redis_client()
 
 
-async def wait_for_response(request_id: uuid.UUID, timeout: int = 30) -> AIResponse:
+async def wait_for_response(request_id: uuid.UUID, timeout: float = AI_RESPONSE_TIMEOUT) -> AIResponse:
     """
     Wait for a response to be available in Redis for the given request ID.
     Polls Redis every 10ms for up to timeout seconds.
@@ -1,14 +1,19 @@
 import logging
 
 from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+from tortoise.utils import generate_schema_for_client
 
 from app.core.configs.config import settings
+from app.core.db.partitions import ensure_partitions
+from app.core.db.schema import SCHEMA_SQL
 
 db_url = "postgres://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 logger = logging.getLogger(__name__)
 
 
 async def init_db():
+    """Connect to the database. The schema is not touched, see migrate_db."""
     logger.info("Initializing database")
     await Tortoise.init(
         db_url=db_url.format(
@@ -20,7 +25,22 @@ async def init_db():
         ),
         modules={"models": ["app.core.db.models"]},
     )
-    await Tortoise.generate_schemas()
+
+
+async def migrate_db():
+    """
+    Bring the schema up to date and create the upcoming request partitions.
+
+    Converts the requests table to a partitioned one on first run, so it is an explicit
+    deploy step (scripts/migrate_db.py), not part of every process start. Call init_db first.
+    """
+    logger.info("Migrating database")
+    async with in_transaction("default") as connection:
+        # Before generate_schemas: its indexes may cover columns the upgrade adds
+        await connection.execute_script(SCHEMA_SQL)
+        await generate_schema_for_client(connection, safe=True)
+    created = await ensure_partitions(settings.REQUESTS_PARTITIONS_AHEAD)
+    logger.info(f"Request partitions up to date, created: {', '.join(created) or 'none'}")
 
 
 async def close_db():
@@ -40,17 +40,30 @@ class User(Model):
         ordering = ["created_at"]
 
     id = fields.BigIntField(pk=True, unique=True, index=True)
+    language_code = fields.CharField(max_length=2, null=True)
+
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
 
 
 class Request(Model):
     class Meta:
         table = "requests"
         ordering = ["-created_at"]
+        # History pages walk (created_at, id) backwards, optionally after an equality filter
+        indexes = (
+            ("created_at", "id"),
+            ("request_type", "created_at", "id"),
+            ("status", "created_at", "id"),
+            ("task", "created_at", "id"),
+        )
 
     id = fields.UUIDField(pk=True)
     request_type = fields.CharField(max_length=32)  # 'speech' or 'text'
     input_text = fields.TextField(null=True)  # For text requests or transcribed speech
     status = fields.CharField(max_length=64)
-    response = fields.TextField(null=True)  # Store the AI's response
+    response = fields.JSONField(null=True)  # Store the AI's response, JSONB in Postgres
+    task = fields.CharField(max_length=32, null=True)  # Task the AI chose, copied out of the response
+    latency_ms = fields.IntField(null=True)  # From creation to completion
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
@@ -0,0 +1,227 @@
+"""
+Monthly partitions of the requests table and their retention.
+
+Partitions are named requests_pYYYYMM and cover one calendar month (UTC) of
+created_at. They are created ahead of time by the migration step, periodically by every
+app process and by the retention job; partitions older than the retention period are
+detached, exported to gzipped NDJSON and dropped, so the live table and its indexes
+only hold recent months.
+
+There is no default partition: it would hold the rows of months created too late and
+block their partitions, and it rules out detaching partitions concurrently.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from app.core.db.schema import LOCK_SCHEMA_SQL
+from app.core.db.streaming import iter_batches
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "requests"
+PARTITION_NAME = re.compile(r"^requests_(p\d{6}|legacy)$")
+LOWER_BOUND = re.compile(r"FROM \('([^']+)'\)")
+UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+LIST_PARTITIONS_SQL = """
+SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass($1)
+"""
+
+# Partitions left half-detached by an interrupted DETACH ... CONCURRENTLY
+LIST_DETACH_PENDING_SQL = """
+SELECT c.relname AS name
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass($1) AND i.inhdetachpending
+"""
+
+LIST_DETACHED_SQL = """
+SELECT relname AS name FROM pg_class
+WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace
+    AND relname ~ '^requests_(p[0-9]{6}|legacy)$' AND NOT relispartition
+"""
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after the month of the given day."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def month_bound(month: date) -> str:
+    return f"{month:%Y-%m-%d} 00:00:00+00"
+
+
+def month_start(month: date) -> datetime:
+    return datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+
+
+def parse_bound(pattern: re.Pattern, bound: str) -> datetime | None:
+    match = pattern.search(bound)
+    return datetime.fromisoformat(match.group(1)) if match else None
+
+
+async def list_partition_ranges(connection=None) -> dict[str, tuple[datetime | None, datetime | None]]:
+    """
+    Attached partitions of the requests table with their ranges.
+
+    Args:
+        connection: Connection or transaction to query, the default connection if None.
+
+    Returns:
+        Lower (inclusive) and upper (exclusive) bound of every partition by name,
+        None for MINVALUE and MAXVALUE.
+    """
+    connection = connection or Tortoise.get_connection("default")
+    rows = await connection.execute_query_dict(LIST_PARTITIONS_SQL, [PARENT_TABLE])
+    return {
+        row["name"]: (parse_bound(LOWER_BOUND, row["bound"]), parse_bound(UPPER_BOUND, row["bound"])) for row in rows
+    }
+
+
+async def list_partitions(connection=None) -> dict[str, datetime | None]:
+    """
+    Attached partitions of the requests table.
+
+    Args:
+        connection: Connection or transaction to query, the default connection if None.
+
+    Returns:
+        Upper bound (exclusive) of every partition by name, None for unbounded ones.
+    """
+    return {name: upper for name, (_lower, upper) in (await list_partition_ranges(connection)).items()}
+
+
+async def ensure_partitions(months_ahead: int = 2, months_back: int = 0, today: date | None = None) -> list[str]:
+    """
+    Create the missing monthly partitions around the current month.
+
+    Every month is checked on its own against the ranges of the attached partitions, so
+    months covered by another partition, like the legacy table, are skipped and gaps
+    before the last partition are filled. Runs under the schema lock, so concurrent
+    callers do not race to create the same partition.
+
+    Args:
+        months_ahead: Months after the current one to create in advance.
+        months_back: Months before the current one to create, for backfills.
+        today: Reference day, today in UTC by default.
+
+    Returns:
+        Names of the partitions created by this call, empty if every month was covered.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    created = []
+    async with in_transaction("default") as connection:
+        await connection.execute_script(LOCK_SCHEMA_SQL)
+        ranges = list((await list_partition_ranges(connection)).values())
+        for offset in range(-months_back, months_ahead + 1):
+            month = add_months(today, offset)
+            start, end = month_start(month), month_start(add_months(month, 1))
+            if any((lower is None or lower < end) and (upper is None or upper > start) for lower, upper in ranges):
+                continue
+            name = partition_name(month)
+            # No IF NOT EXISTS: under the lock the month is known to be uncovered, and a
+            # leftover detached table of that name must not pass for a new partition
+            await connection.execute_script(
+                f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{month_bound(month)}') TO ('{month_bound(add_months(month, 1))}')"
+            )
+            created.append(name)
+            ranges.append((start, end))
+    return created
+
+
+async def maintain_partitions(months_ahead: int, interval: float) -> None:
+    """
+    Create the upcoming partitions every `interval` seconds, so inserts never run past
+    the last partition of a process that has been up for months.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            created = await ensure_partitions(months_ahead)
+            if created:
+                logger.info(f"Created request partitions: {', '.join(created)}")
+        except Exception as e:
+            logger.warning(f"Failed to create the upcoming request partitions: {e}")
+
+
+async def export_table(name: str, path: str, batch_size: int = 5000) -> int:
+    """
+    Write every row of a table to a gzipped NDJSON file, one JSON object per line.
+
+    Rows are serialized by Postgres (row_to_json) and read through a server-side
+    cursor, so memory use does not depend on the table size. The file appears under
+    its final name only once it is complete.
+
+    Returns:
+        Number of rows written.
+    """
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        async for batch in iter_batches(f"SELECT row_to_json(r)::TEXT FROM {name} r", batch_size=batch_size):
+            f.writelines(f"{record[0]}\n" for record in batch)
+            rows += len(batch)
+    os.replace(tmp_path, path)
+    return rows
+
+
+async def archive_partitions(
+    retention_months: int, archive_dir: str, today: date | None = None
+) -> list[tuple[str, int]]:
+    """
+    Detach, export and drop the partitions that ended before the retention period.
+
+    Partitions are detached concurrently, without blocking queries on the live table;
+    each detach runs in its own implicit transaction, as Postgres requires. Detaches
+    interrupted by an earlier run are finalized, and tables detached by an earlier run
+    that failed to export are archived as well.
+
+    Args:
+        retention_months: Full months kept in addition to the current one.
+        archive_dir: Directory of the exported files.
+        today: Reference day, today in UTC by default.
+
+    Returns:
+        Name and row count of every archived partition.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = month_start(add_months(today, -retention_months))
+    connection = Tortoise.get_connection("default")
+
+    pending = {row["name"] for row in await connection.execute_query_dict(LIST_DETACH_PENDING_SQL, [PARENT_TABLE])}
+    for name in sorted(pending):
+        await connection.execute_script(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name} FINALIZE")
+        logger.info(f"Finished detaching partition {name}")
+    expired = [name for name, bound in (await list_partitions()).items() if bound is not None and bound <= cutoff]
+    for name in expired:
+        await connection.execute_script(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name} CONCURRENTLY")
+        logger.info(f"Detached partition {name}")
+    detached = [row["name"] for row in await connection.execute_query_dict(LIST_DETACHED_SQL)]
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+    for name in sorted(set(detached)):
+        if not PARTITION_NAME.match(name):
+            continue
+        rows = await export_table(name, os.path.join(archive_dir, f"{name}.ndjson.gz"))
+        await connection.execute_script(f"DROP TABLE {name}")
+        logger.info(f"Archived partition {name}, {rows} rows")
+        archived.append((name, rows))
+    return archived
@@ -0,0 +1,109 @@
+"""
+Schema changes Tortoise cannot express or apply to existing tables.
+
+generate_schemas only creates missing tables, so columns added to existing ones and
+type changes are applied here, idempotently, before it runs. Tables with arrays or
+composite keys, like the analytics rollups, and the partitioned requests table are
+created here as well.
+"""
+
+# The response was stringified into a text column. Values that parse as JSON are kept
+# as such, the rest (Python reprs of the response) become JSON strings.
+UPGRADE_REQUESTS_SQL = """
+ALTER TABLE IF EXISTS requests ADD COLUMN IF NOT EXISTS task VARCHAR(32);
+ALTER TABLE IF EXISTS requests ADD COLUMN IF NOT EXISTS latency_ms INT;
+
+CREATE OR REPLACE FUNCTION pg_temp.text_to_jsonb(value TEXT) RETURNS JSONB AS $$
+BEGIN
+    RETURN value::JSONB;
+EXCEPTION WHEN others THEN
+    RETURN to_jsonb(value);
+END
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'requests' AND column_name = 'response') = 'text' THEN
+        ALTER TABLE requests ALTER COLUMN response TYPE JSONB USING pg_temp.text_to_jsonb(response);
+    END IF;
+END
+$$;
+"""
+
+# Columns of models.User missing from the users tables created before they were added
+UPGRADE_USERS_SQL = """
+ALTER TABLE IF EXISTS users
+    ADD COLUMN IF NOT EXISTS language_code VARCHAR(2),
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP;
+"""
+
+# requests is range-partitioned by month of created_at, see app.core.db.partitions.
+# The primary key must include the partition key. Keep the columns in sync with
+# models.Request. An existing plain table is attached as the first partition, covering
+# everything up to the end of the current month, instead of being copied.
+PARTITION_REQUESTS_SQL = """
+DO $$
+DECLARE
+    legacy_index RECORD;
+    converting BOOLEAN := EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('requests') AND relkind = 'r');
+BEGIN
+    IF converting THEN
+        ALTER TABLE requests RENAME TO requests_legacy;
+        -- A partition needs the primary key of the parent, which includes created_at
+        ALTER TABLE requests_legacy DROP CONSTRAINT requests_pkey;
+        ALTER TABLE requests_legacy ADD CONSTRAINT requests_legacy_pkey PRIMARY KEY (id, created_at);
+        -- Free the names, so generate_schemas creates the indexes on the new parent
+        FOR legacy_index IN
+            SELECT indexname FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = 'requests_legacy' AND indexname LIKE 'idx_requests_%'
+        LOOP
+            EXECUTE format('ALTER INDEX %I RENAME TO %I', legacy_index.indexname, 'legacy_' || legacy_index.indexname);
+        END LOOP;
+    END IF;
+
+    CREATE TABLE IF NOT EXISTS requests (
+        id UUID NOT NULL,
+        request_type VARCHAR(32) NOT NULL,
+        input_text TEXT,
+        status VARCHAR(64) NOT NULL,
+        response JSONB,
+        task VARCHAR(32),
+        latency_ms INT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    IF converting THEN
+        EXECUTE format(
+            'ALTER TABLE requests ATTACH PARTITION requests_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+            (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '1 month') AT TIME ZONE 'UTC'
+        );
+    END IF;
+END
+$$;
+"""
+
+# Hourly per-task counters and a latency histogram, see app.core.analytics
+CREATE_ROLLUPS_SQL = """
+CREATE TABLE IF NOT EXISTS request_rollups (
+    bucket TIMESTAMPTZ NOT NULL,
+    request_type VARCHAR(32) NOT NULL,
+    task VARCHAR(32) NOT NULL,
+    requests BIGINT NOT NULL,
+    latency_sum_ms BIGINT NOT NULL,
+    latency_buckets BIGINT[] NOT NULL,
+    PRIMARY KEY (bucket, request_type, task)
+);
+"""
+
+# Serializes schema changes of the replicas starting at once, so only the first one
+# converts the requests table and the others find it partitioned. Held until the end of
+# the transaction, which has to include generate_schemas for the same reason.
+LOCK_SCHEMA_SQL = """
+SELECT pg_advisory_xact_lock(hashtext('requests_schema'));
+"""
+
+SCHEMA_SQL = LOCK_SCHEMA_SQL + UPGRADE_USERS_SQL + UPGRADE_REQUESTS_SQL + PARTITION_REQUESTS_SQL + CREATE_ROLLUPS_SQL
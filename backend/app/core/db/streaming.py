@@ -0,0 +1,27 @@
+"""
+Reading large result sets in constant memory.
+"""
+
+from typing import AsyncIterator
+
+from asyncpg import Record
+from tortoise import Tortoise
+
+
+async def iter_batches(query: str, args: list | None = None, batch_size: int = 5000) -> AsyncIterator[list[Record]]:
+    """
+    Rows of a query in batches, read through a server-side cursor.
+
+    The connection is held until the iteration ends or the iterator is closed.
+
+    Args:
+        query: SQL query with $n placeholders.
+        args: Values of the placeholders.
+        batch_size: Rows fetched per round trip.
+    """
+    async with Tortoise.get_connection("default").acquire_connection() as connection:
+        # Cursors only live inside a transaction
+        async with connection.transaction(readonly=True):
+            cursor = await connection.cursor(query, *(args or []))
+            while batch := await cursor.fetch(batch_size):
+                yield batch
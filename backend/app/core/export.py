@@ -0,0 +1,86 @@
+"""
+Streaming export of the request history for model retraining.
+
+Rows are read through a server-side cursor and encoded batch by batch, so an export
+of any size runs in constant memory. NDJSON lines are produced by Postgres itself
+(row_to_json) and are what posttrain/train.py's load_dataset reads; CSV carries the
+same columns with the response as JSON text.
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Literal
+
+from app.core.db.streaming import iter_batches
+
+EXPORT_COLUMNS = ("id", "request_type", "input_text", "status", "response", "task", "latency_ms", "created_at")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def build_export_query(
+    columns: str = ", ".join(EXPORT_COLUMNS),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    task: str | None = None,
+    request_type: str | None = None,
+    status: str | None = None,
+) -> tuple[str, list]:
+    """
+    Query of the exported rows, oldest first, and its arguments.
+
+    Args:
+        columns: Select list.
+        since: Only requests created at or after this time.
+        until: Only requests created before this time.
+        task: Only requests the AI answered with this task.
+        request_type: Only requests of this type.
+        status: Only requests in this status.
+    """
+    conditions, args = [], []
+    for condition, value in (
+        ("created_at >= ${}", since),
+        ("created_at < ${}", until),
+        ("task = ${}", task),
+        ("request_type = ${}", request_type),
+        ("status = ${}", status),
+    ):
+        if value is not None:
+            args.append(value)
+            conditions.append(condition.format(len(args)))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM requests {where} ORDER BY created_at, id", args
+
+
+async def export_requests(
+    export_format: Literal["ndjson", "csv"] = "ndjson", batch_size: int = 5000, **filters
+) -> AsyncIterator[bytes]:
+    """
+    Encoded request history, one chunk per cursor batch.
+
+    Args:
+        export_format: "ndjson" (one JSON object per line) or "csv" (with a header row).
+        batch_size: Rows per chunk.
+        **filters: Filters of build_export_query.
+    """
+    if export_format == "ndjson":
+        query, args = build_export_query(**filters)
+        async for batch in iter_batches(f"SELECT row_to_json(r)::TEXT FROM ({query}) r", args, batch_size):
+            yield "".join(f"{record[0]}\n" for record in batch).encode()
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    columns = ", ".join(f"{column}::TEXT AS {column}" if column == "response" else column for column in EXPORT_COLUMNS)
+    query, args = build_export_query(columns, **filters)
+    async for batch in iter_batches(query, args, batch_size):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in record] for record in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header of an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import queue
+import time
+from concurrent.futures import Future
+from threading import Thread
+
+import numpy as np
+
+from app.core.metrics import Histogram
+
+from .model import Predictor
+from .video import decode_image_frame
+
+logger = logging.getLogger(__name__)
+
+batch_size_histogram = Histogram(
+    "gesture_inference_batch_size", "Clips per batched gesture model run", buckets=(1, 2, 4, 8, 16, 32)
+)
+batch_latency_histogram = Histogram("gesture_inference_batch_seconds", "Duration of batched gesture model runs")
+
+
+class BatchingPredictor:
+    """
+    Dynamic micro-batcher in front of a shared Predictor.
+
+    Concurrent predict calls are collected for up to max_wait_ms or until max_batch_size
+    clips are waiting, run through the model as one batch and the results are scattered
+    back to the callers. It exposes the same predict interface as Predictor, so SLInference
+    can use either of them.
+
+    Attributes:
+        predictor (Predictor): The wrapped model.
+        max_batch_size (int): Maximum number of clips in one model run.
+        max_wait (float): Seconds the first clip of a batch waits for companions.
+        clip_seconds (float): Moving average of model time per clip.
+    """
+
+    def __init__(self, predictor: Predictor, max_batch_size: int = 8, max_wait_ms: float = 5.0):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Thread | None = None
+        self._batch_buffer: np.ndarray | None = None
+        self.clip_seconds = 0.0
+
+    @property
+    def config(self) -> dict:
+        return self.predictor.config
+
+    @property
+    def labels(self) -> dict:
+        return self.predictor.labels
+
+    def start(self):
+        """
+        Start the batching thread.
+        """
+        if self._thread is None:
+            self._thread = Thread(target=self.worker, name="gesture-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop the batching thread after the queued clips are processed.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, x) -> Future:
+        """
+        Queue a window of frames for prediction.
+
+        Args:
+            x (FrameRingBuffer | list): Frame window; a ring buffer must not change until the future resolves.
+
+        Returns:
+            Future: Resolves to the class probabilities of the window.
+        """
+        return self.enqueue(self.predictor.preprocess(x))
+
+    def enqueue(self, clip: np.ndarray) -> Future:
+        """
+        Queue a preprocessed clip of shape (1, c, t, h, w) for prediction.
+        """
+        future = Future()
+        self._queue.put((clip, future))
+        return future
+
+    def predict_proba(self, x):
+        """
+        Blocking class probabilities, for worker threads. Never call it from the event loop thread.
+        """
+        return self.submit(x).result()
+
+    def predict(self, x):
+        """
+        Blocking prediction, for worker threads. Never call it from the event loop thread.
+        """
+        return self.predictor.postprocess(self.predict_proba(x))
+
+    async def apredict_proba(self, x):
+        """
+        Class probabilities for coroutines; the window is normalized in a worker thread.
+        """
+        clip = await asyncio.to_thread(self.predictor.preprocess, x)
+        return await asyncio.wrap_future(self.enqueue(clip))
+
+    async def adecode_frames(self, images: list[bytes]) -> list[np.ndarray]:
+        """
+        Decode camera frames into model frames in a worker thread.
+
+        Raises:
+            ValueError: If an image cannot be decoded.
+        """
+        return await asyncio.to_thread(lambda: [decode_image_frame(image) for image in images])
+
+    async def apredict(self, x):
+        """
+        Prediction for coroutines.
+        """
+        return self.predictor.postprocess(await self.apredict_proba(x))
+
+    def worker(self):
+        """
+        Collect clips into batches and run them until stopped.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self.run_batch(batch)
+            if stopping:
+                return
+
+    def gather(self, batch: list[tuple[np.ndarray, Future]]) -> np.ndarray:
+        """
+        Stack the clips of a batch into a reused preallocated input array.
+        """
+        if len(batch) == 1:
+            return batch[0][0]
+        clip_shape = batch[0][0].shape[1:]
+        if self._batch_buffer is None or self._batch_buffer.shape[1:] != clip_shape:
+            self._batch_buffer = np.empty((self.max_batch_size, *clip_shape), dtype=np.float32)
+        clips = self._batch_buffer[: len(batch)]
+        for index, (clip, _) in enumerate(batch):
+            clips[index] = clip[0]
+        return clips
+
+    def run_batch(self, batch: list[tuple[np.ndarray, Future]]):
+        clips = self.gather(batch)
+        started = time.perf_counter()
+        try:
+            results = self.predictor.predict_proba_batch(clips)
+        except Exception as e:
+            logger.exception(f"Batched gesture inference failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        elapsed = time.perf_counter() - started
+        batch_latency_histogram.observe(elapsed)
+        per_clip = elapsed / len(batch)
+        self.clip_seconds = per_clip if not self.clip_seconds else 0.9 * self.clip_seconds + 0.1 * per_clip
+        batch_size_histogram.observe(len(batch))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
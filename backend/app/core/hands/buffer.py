@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+
+FRAME_SIZE = 224
+SCALE = np.float32(1 / 255)
+
+
+class FrameRingBuffer:
+    """
+    Preallocated window of frames stored directly in the model's (c, t, h, w) layout.
+
+    Frames are written in place as they arrive, and to_clip normalizes the window into a
+    preallocated float32 clip in chronological order, so evaluating a window allocates
+    nothing. It supports the deque operations SLInference relies on (append, clear, len).
+    Writes and reads hold a lock, so a window can be read in a worker thread while the
+    event loop keeps appending frames.
+
+    Attributes:
+        window_size (int): Number of frames in the window.
+        frames (np.ndarray): uint8 ring of shape (c, t, h, w).
+        clip (np.ndarray): float32 model input of shape (1, c, t, h, w).
+    """
+
+    def __init__(self, window_size: int, height: int = FRAME_SIZE, width: int = FRAME_SIZE, channels: int = 3):
+        self.window_size = window_size
+        self.frames = np.zeros((channels, window_size, height, width), dtype=np.uint8)
+        self.clip = np.empty((1, channels, window_size, height, width), dtype=np.float32)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def maxlen(self) -> int:
+        return self.window_size
+
+    def append(self, frame: np.ndarray) -> None:
+        """
+        Write an (h, w, c) uint8 frame into the oldest slot.
+        """
+        with self._lock:
+            np.copyto(self.frames[:, self._next], frame.transpose(2, 0, 1))
+            self._next = (self._next + 1) % self.window_size
+            self._count = min(self._count + 1, self.window_size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+    def copy_to(self, out: np.ndarray) -> None:
+        """
+        Copy the uint8 window into out of shape (c, t, h, w), oldest frame first.
+        """
+        with self._lock:
+            oldest = self._next if self._count == self.window_size else 0
+            head = self.window_size - oldest
+            np.copyto(out[:, :head], self.frames[:, oldest:])
+            np.copyto(out[:, head:], self.frames[:, :oldest])
+
+    def to_clip(self) -> np.ndarray:
+        """
+        Normalize the window into the preallocated float32 clip, oldest frame first.
+
+        Returns:
+            np.ndarray: Clip of shape (1, c, t, h, w), valid until the next call.
+        """
+        with self._lock:
+            oldest = self._next if self._count == self.window_size else 0
+            head = self.window_size - oldest
+            np.multiply(self.frames[:, oldest:], SCALE, out=self.clip[0, :, :head], dtype=np.float32)
+            np.multiply(self.frames[:, :oldest], SCALE, out=self.clip[0, :, head:], dtype=np.float32)
+        return self.clip
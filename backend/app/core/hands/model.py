@@ -1,7 +1,9 @@
 from sys import platform
 from einops import rearrange
 import numpy as np
-import onnxruntime as rt
+
+from .buffer import FrameRingBuffer
+from .session import create_session, quantized_model_path
 
 
 class Predictor:
@@ -11,49 +13,95 @@ class Predictor:
 
         Args:
             model_config (dict): Model configuration containing path_to_model,
-                path_to_class_list, threshold, and topk values.
+                path_to_class_list, threshold, and topk values. Optional keys: "session"
+                (session profile and overrides), "quantized" (load the INT8 variant) and
+                "path_to_quantized_model".
         """
         self.config = model_config
         self.provider = self.config["provider"]
         self.threshold = self.config["threshold"]
         self.labels = {}
 
-        self.model_init(self.config["path_to_model"])
+        path_to_model = self.config["path_to_model"]
+        if self.config.get("quantized"):
+            path_to_model = self.config.get("path_to_quantized_model") or quantized_model_path(path_to_model)
+        self.model_init(path_to_model)
         self.create_labels()
 
     def create_labels(self):
         """
         Create a dictionary of labels from the provided path_to_class_list.
         """
-        with open(self.config["path_to_class_list"], "r") as f:
-            labels = [line.strip() for line in f]
-            labels = self.decode_preds(labels)
-
-            idx_lbl_pairs = [x.split("\t") for x in labels]
-            self.labels = {int(x[0]): x[1] for x in idx_lbl_pairs}
+        self.labels = read_labels(self.config["path_to_class_list"])
 
 
     def softmax(self, x):
-        exp_x = np.exp(x - np.max(x, axis=1, keepdims=True))
-        return exp_x / np.sum(exp_x, axis=1, keepdims=True)
+        # In place: the logits array is a fresh output of the session
+        x -= np.max(x, axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= np.sum(x, axis=1, keepdims=True)
+        return x
 
-    def predict(self, x):
+    def preprocess(self, x):
         """
-        Make a prediction using the provided input frames.
+        Convert a window of frames into a model input clip.
 
         Args:
-            x (list): List of input frames.
+            x (FrameRingBuffer | list): Preallocated frame window or list of input frames.
 
         Returns:
-            dict: Dictionary containing predicted labels and confidence values.
+            np.ndarray: Clip of shape (1, c, t, h, w).
         """
+        if isinstance(x, FrameRingBuffer):
+            return x.to_clip()
         clip = np.array(x).astype(np.float32) / 255.0
-        clip = rearrange(clip, "t h w c -> 1 c t h w")
+        return rearrange(clip, "t h w c -> 1 c t h w")
+
+    def predict_proba_batch(self, clips):
+        """
+        Run the model on a batch of clips.
+
+        Args:
+            clips (np.ndarray): Clips of shape (n, c, t, h, w).
+
+        Returns:
+            np.ndarray: Class probabilities of shape (n, num_classes).
+        """
+        if self.max_batch_size is not None and len(clips) > self.max_batch_size:
+            # The graph has a fixed batch dimension, split the batch into runs it accepts
+            step = self.max_batch_size
+            return np.concatenate(
+                [self.predict_proba_batch(clips[i : i + step]) for i in range(0, len(clips), step)]
+            )
+
+        prediction = self.model([self.output_name], {self.input_name: clips})[0]
+        return self.softmax(prediction)
 
-        prediction = self.model([self.output_name], {self.input_name: clip})[0]
-        prediction = self.softmax(prediction)
-        prediction = np.squeeze(prediction)
-        topk_labels = prediction.argsort()[-self.config["topk"] :][::-1]
+    def predict_batch(self, clips):
+        """
+        Run the model on a batch of clips.
+
+        Args:
+            clips (np.ndarray): Clips of shape (n, c, t, h, w).
+
+        Returns:
+            list: Prediction dictionary (or None) for every clip.
+        """
+        return [self.postprocess(row) for row in self.predict_proba_batch(clips)]
+
+    def postprocess(self, prediction):
+        """
+        Turn class probabilities of one clip into the top-k labels.
+
+        Args:
+            prediction (np.ndarray): Class probabilities of one clip.
+
+        Returns:
+            dict: Dictionary containing predicted labels and confidence values.
+        """
+        topk = self.config["topk"]
+        topk_labels = np.argpartition(prediction, -topk)[-topk:]
+        topk_labels = topk_labels[np.argsort(prediction[topk_labels])[::-1]]
         topk_confidence = prediction[topk_labels]
 
         result = [self.labels[lbl_idx] for lbl_idx in topk_labels]
@@ -65,6 +113,30 @@ class Predictor:
             "confidence": dict(zip([i for i in range(len(result))], topk_confidence)),
         }
 
+    def predict_proba(self, x):
+        """
+        Class probabilities for the provided input frames.
+
+        Args:
+            x (FrameRingBuffer | list): Frame window.
+
+        Returns:
+            np.ndarray: Class probabilities of the window.
+        """
+        return self.predict_proba_batch(self.preprocess(x))[0]
+
+    def predict(self, x):
+        """
+        Make a prediction using the provided input frames.
+
+        Args:
+            x (FrameRingBuffer | list): Frame window.
+
+        Returns:
+            dict: Dictionary containing predicted labels and confidence values.
+        """
+        return self.postprocess(self.predict_proba(x))
+
     def model_init(self, path_to_model: str) -> None:
         """
         Load and init the ONNX model using the provided path.
@@ -75,13 +147,36 @@ class Predictor:
         Returns:
             None
         """
-        session = rt.InferenceSession(path_to_model, providers=[self.provider])
+        session = create_session(path_to_model, self.provider, self.config.get("session"))
         self.input_name = session.get_inputs()[0].name
         self.output_name = session.get_outputs()[0].name
+        batch_dim = session.get_inputs()[0].shape[0]
+        self.max_batch_size = batch_dim if isinstance(batch_dim, int) else None
 
         self.model = session.run
 
     def decode_preds(self, data):
-        if platform in {"win32", "win64"}:
-            data = [i.encode("cp1251").decode("utf-8") for i in data]
-        return data
\ No newline at end of file
+        return decode_preds(data)
+
+
+def decode_preds(data):
+    if platform in {"win32", "win64"}:
+        data = [i.encode("cp1251").decode("utf-8") for i in data]
+    return data
+
+
+def read_labels(path_to_class_list: str) -> dict:
+    """
+    Read the class index to label mapping of the model.
+
+    Args:
+        path_to_class_list (str): Path to the file with "index<TAB>label" lines.
+
+    Returns:
+        dict: Class index to label mapping.
+    """
+    with open(path_to_class_list, "r") as f:
+        labels = decode_preds([line.strip() for line in f])
+
+    idx_lbl_pairs = [x.split("\t") for x in labels]
+    return {int(x[0]): x[1] for x in idx_lbl_pairs}
\ No newline at end of file
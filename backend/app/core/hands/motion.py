@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.core.metrics import Counter
+
+gesture_windows = Counter("gesture_windows_total", "Ready gesture windows by outcome (evaluated or skipped)")
+gesture_seconds_saved = Counter(
+    "gesture_inference_seconds_saved_total", "Estimated inference time saved by skipping static windows"
+)
+
+
+class MotionGate:
+    """
+    Cheap motion detector ahead of gesture inference.
+
+    Frames are downsampled by striding and converted to grayscale. The motion score is
+    the fraction of pixels that changed by more than pixel_threshold since the previous
+    frame, so a hand moving in a small part of the frame counts while sensor noise and
+    slow lighting drift do not. A window in which no frame moved can be skipped: the
+    previous prediction still holds.
+
+    Attributes:
+        threshold (float): Fraction of changed pixels above which a frame counts as moving.
+        pixel_threshold (float): Grayscale difference (0-255) above which a pixel counts as changed.
+        frames_since_motion (int): Consecutive static frames seen most recently.
+    """
+
+    def __init__(self, threshold: float = 0.005, pixel_threshold: float = 15.0, step: int = 8):
+        """
+        Initialize the gate.
+
+        Args:
+            threshold (float): Fraction of changed pixels above which a frame counts as moving.
+            pixel_threshold (float): Grayscale difference above which a pixel counts as changed.
+            step (int): Downsampling stride in both directions.
+        """
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.step = step
+        self.frames_since_motion = 0
+        self._previous: np.ndarray | None = None
+
+    def update(self, frame: np.ndarray) -> float:
+        """
+        Score the motion between the frame and the previous one.
+
+        Args:
+            frame (np.ndarray): RGB frame of shape (h, w, 3).
+
+        Returns:
+            float: The motion score.
+        """
+        small = frame[:: self.step, :: self.step].mean(axis=2, dtype=np.float32)
+        if self._previous is None:
+            score = float("inf")
+        else:
+            score = float(np.count_nonzero(np.abs(small - self._previous) > self.pixel_threshold)) / small.size
+        self._previous = small
+        self.frames_since_motion = 0 if score > self.threshold else self.frames_since_motion + 1
+        return score
+
+    def is_static(self, window_size: int) -> bool:
+        """
+        Nothing moved between any two of the last window_size frames.
+        """
+        return self.frames_since_motion >= window_size - 1
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .buffer import FRAME_SIZE, SCALE, FrameRingBuffer
+from .model import Predictor, read_labels
+from .video import decode_image_frame
+
+logger = logging.getLogger(__name__)
+
+# Per-process state of the gesture workers
+_worker_predictor: Predictor | None = None
+_worker_segments: dict[str, SharedMemory] = {}
+_worker_clips: dict[tuple, np.ndarray] = {}
+
+
+def _init_gesture_worker(config: dict) -> None:
+    """Create the ONNX session once per worker process."""
+    global _worker_predictor
+    # Several sessions share the machine: one thread each unless the config says otherwise
+    session = {"profile": "shared", **config.get("session", {})}
+    _worker_predictor = Predictor({**config, "session": session})
+
+
+def _attach_segment(name: str) -> SharedMemory:
+    """
+    Attach to a segment owned by the server process without tracking it here, otherwise
+    the worker's resource tracker would unlink it when the worker exits.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        segment = SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _gesture_predict_proba(segment_name: str, shape: tuple) -> np.ndarray:
+    """
+    Normalize a uint8 (c, t, h, w) window from shared memory and run the model on it.
+    """
+    segment = _worker_segments.get(segment_name)
+    if segment is None:
+        segment = _worker_segments[segment_name] = _attach_segment(segment_name)
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=segment.buf)
+
+    clip = _worker_clips.get(shape)
+    if clip is None:
+        clip = _worker_clips[shape] = np.empty((1, *shape), dtype=np.float32)
+    np.multiply(frames, SCALE, out=clip[0], dtype=np.float32)
+    return _worker_predictor.predict_proba_batch(clip)[0]
+
+
+def _gesture_warmup() -> None:
+    """Run a dummy clip so the first real request hits a hot session."""
+    window_size = _worker_predictor.config["window_size"]
+    _worker_predictor.predict(np.zeros((window_size, FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8))
+
+
+class ProcessPoolPredictor:
+    """
+    Gesture inference in a pool of worker processes, each holding its own ONNX session.
+
+    Image decoding, normalization, the model run and softmax happen in the workers, so
+    gesture traffic does not hold the GIL of the web server process. Windows are handed
+    over through shared memory segments that are reused between requests: the caller
+    copies the uint8 frames into a free segment and only its name is pickled. It exposes
+    the same predict interface as BatchingPredictor, so SLInference can use either of them.
+
+    Attributes:
+        config (dict): Configuration parameters for the model.
+        labels (dict): Class index to label mapping.
+        workers (int): Number of worker processes.
+        clip_seconds (float): Moving average of time per clip, including the hand-over.
+    """
+
+    # Top-k selection only needs config, labels and threshold
+    postprocess = Predictor.postprocess
+
+    def __init__(self, config: dict, workers: int = 2):
+        self.config = config
+        self.labels = read_labels(config["path_to_class_list"])
+        self.threshold = config["threshold"]
+        self.workers = workers
+        self.shape = (3, config["window_size"], FRAME_SIZE, FRAME_SIZE)
+        self.clip_seconds = 0.0
+        self._pool: ProcessPoolExecutor | None = None
+        self._segments: list[SharedMemory] = []
+        self._free: queue.SimpleQueue = queue.SimpleQueue()
+        # Bumped by every restart, so callers that saw the same crash restart the pool once
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the worker processes and load the model in each of them.
+        """
+        if self._pool is not None:
+            return
+        self._pool = self._create_pool()
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Spawned workers don't inherit the batcher and event loop threads of this process
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_gesture_worker,
+            initargs=(self.config,),
+        )
+        # Concurrent warm-up tasks force every worker to spawn and load the model now
+        for future in wait([pool.submit(_gesture_warmup) for _ in range(self.workers)]).done:
+            future.result()
+        logger.info(f"Gesture worker pool is warm, workers={self.workers}")
+        return pool
+
+    def restart(self, generation: int) -> None:
+        """
+        Replace a pool broken by a crashed worker, e.g. killed for memory or by a fault in onnxruntime.
+
+        The segments of the broken pool are dropped as well: idle ones right away, the
+        ones of calls still failing when those calls finish.
+
+        Args:
+            generation (int): Generation of the pool the caller saw broken; a pool that was
+                already replaced is left alone.
+        """
+        with self._lock:
+            if generation != self._generation or self._pool is None:
+                return
+            logger.error("Gesture worker pool is broken, restarting it")
+            self._generation += 1
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            for segment in self._segments:
+                segment.unlink()
+            self._segments = []
+            free, self._free = self._free, queue.SimpleQueue()
+            while not free.empty():
+                free.get_nowait().close()
+            self._pool = self._create_pool()
+
+    def stop(self):
+        """
+        Stop the workers and free the shared memory segments.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
+        self._free = queue.SimpleQueue()
+
+    def acquire_segment(self) -> SharedMemory:
+        """
+        Take a free segment; the pool grows to the peak number of windows in flight.
+        """
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            segment = SharedMemory(create=True, size=int(np.prod(self.shape)))
+            self._segments.append(segment)
+            return segment
+
+    def submit(self, x) -> Future:
+        """
+        Copy a window of frames into shared memory and queue it for prediction.
+
+        The window is copied before returning, so a ring buffer may change right away.
+
+        Args:
+            x (FrameRingBuffer | list): Frame window.
+
+        Returns:
+            Future: Resolves to the class probabilities of the window.
+
+        Raises:
+            BrokenProcessPool: If a worker crashed; see restart.
+        """
+        return self._submit(x)[0]
+
+    def _submit(self, x) -> tuple[Future, int]:
+        with self._lock:
+            pool, generation = self._pool, self._generation
+            segment = self.acquire_segment()
+        frames = np.ndarray(self.shape, dtype=np.uint8, buffer=segment.buf)
+        if isinstance(x, FrameRingBuffer):
+            x.copy_to(frames)
+        else:
+            np.copyto(frames, np.asarray(x, dtype=np.uint8).transpose(3, 0, 1, 2))
+        del frames
+
+        started = time.perf_counter()
+
+        def release(_future: Future | None = None) -> None:
+            elapsed = time.perf_counter() - started
+            self.clip_seconds = elapsed if not self.clip_seconds else 0.9 * self.clip_seconds + 0.1 * elapsed
+            with self._lock:
+                if generation == self._generation:
+                    self._free.put(segment)
+                else:
+                    segment.close()
+
+        try:
+            future = pool.submit(_gesture_predict_proba, segment.name, self.shape)
+        except BaseException:
+            release()
+            raise
+        future.add_done_callback(release)
+        return future, generation
+
+    def predict_proba(self, x):
+        """
+        Blocking class probabilities, for worker threads. Never call it from the event loop thread.
+
+        A call that hits a crashed worker restarts the pool and is retried once.
+        """
+        future, generation = self._submit(x)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self.restart(generation)
+        return self.submit(x).result()
+
+    def predict(self, x):
+        """
+        Blocking prediction, for worker threads. Never call it from the event loop thread.
+        """
+        return self.postprocess(self.predict_proba(x))
+
+    async def apredict_proba(self, x):
+        """
+        Class probabilities for coroutines; the window is copied to shared memory in a worker thread.
+
+        A call that hits a crashed worker restarts the pool and is retried once.
+        """
+        future, generation = await asyncio.to_thread(self._submit, x)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            await asyncio.to_thread(self.restart, generation)
+        return await asyncio.wrap_future(await asyncio.to_thread(self.submit, x))
+
+    async def adecode_frames(self, images: list[bytes]) -> list[np.ndarray]:
+        """
+        Decode camera frames into model frames; encoded images are decoded, resized and
+        converted in the worker processes, raw RGB frames are used as they are.
+
+        Raises:
+            ValueError: If an image cannot be decoded.
+        """
+        raw_size = FRAME_SIZE * FRAME_SIZE * 3
+        frames = [decode_image_frame(image) if len(image) == raw_size else None for image in images]
+        encoded = [index for index, frame in enumerate(frames) if frame is None]
+        loop = asyncio.get_running_loop()
+        generation = self._generation
+        try:
+            decoded = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, decode_image_frame, images[index]) for index in encoded)
+            )
+        except BrokenProcessPool:
+            await asyncio.to_thread(self.restart, generation)
+            decoded = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, decode_image_frame, images[index]) for index in encoded)
+            )
+        for index, frame in zip(encoded, decoded):
+            frames[index] = frame
+        return frames
+
+    async def apredict(self, x):
+        """
+        Prediction for coroutines.
+        """
+        return self.postprocess(await self.apredict_proba(x))
@@ -0,0 +1,139 @@
+import json
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+from .batcher import BatchingPredictor
+from .buffer import FRAME_SIZE
+from .model import Predictor
+from .pool import ProcessPoolPredictor
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotLoadedError(RuntimeError):
+    """The gesture model is not loaded, e.g. it failed to load at startup."""
+
+    def __init__(self):
+        super().__init__("Gesture model is not loaded")
+
+
+class GestureModelRegistry:
+    """
+    Process-wide holder of the gesture recognition model.
+
+    The ONNX session is created once at application startup and shared by all requests;
+    onnxruntime sessions are safe to run from several threads concurrently. With workers
+    the sessions live in a pool of worker processes instead and there is no in-process
+    predictor.
+
+    Attributes:
+        config (dict): Configuration parameters for the model.
+        predictor (Predictor): The shared prediction model.
+        batcher (BatchingPredictor | ProcessPoolPredictor): Model used by requests, either the
+            micro-batcher that merges concurrent requests or the worker pool.
+    """
+
+    def __init__(self):
+        self.config: dict | None = None
+        self._predictor: Predictor | None = None
+        self._batcher: BatchingPredictor | ProcessPoolPredictor | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._batcher is not None
+
+    @property
+    def model_id(self) -> str:
+        """Model file and variant; cached recognition results are keyed by it."""
+        if self.config is None:
+            raise ModelNotLoadedError()
+        return f"{self.config['path_to_model']}:{'int8' if self.config.get('quantized') else 'fp32'}"
+
+    @property
+    def predictor(self) -> Predictor:
+        if self._predictor is None:
+            raise ModelNotLoadedError()
+        return self._predictor
+
+    @property
+    def batcher(self) -> BatchingPredictor | ProcessPoolPredictor:
+        if self._batcher is None:
+            raise ModelNotLoadedError()
+        return self._batcher
+
+    def load(
+        self,
+        config_path: str,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        session_profile: str | None = None,
+        quantized: bool | None = None,
+        workers: int = 0,
+    ) -> Predictor | None:
+        """
+        Read the configuration file, create the inference session, warm it up and start the batcher.
+
+        Args:
+            config_path (str): Path to the configuration file.
+            max_batch_size (int): Maximum number of clips in one batched model run.
+            max_wait_ms (float): How long a clip waits for companions before its batch runs.
+            session_profile (str | None): Session profile overriding the one in the config.
+            quantized (bool | None): Whether to load the INT8 model variant, overriding the config.
+            workers (int): Worker processes holding the model, 0 runs it in this process.
+
+        Returns:
+            Predictor | None: The loaded model, None when it runs in worker processes.
+        """
+        config = self.read_config(config_path, session_profile=session_profile, quantized=quantized)
+        if workers > 0:
+            pool = ProcessPoolPredictor(config, workers=workers)
+            pool.start()
+            self.config = config
+            self._batcher = pool
+            logger.info(f"Gesture model loaded from {config['path_to_model']} in {workers} worker processes")
+            return None
+
+        predictor = Predictor(config)
+        self.warmup(predictor)
+        self.config = config
+        self._predictor = predictor
+        self._batcher = BatchingPredictor(predictor, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self._batcher.start()
+        logger.info(f"Gesture model loaded from {config['path_to_model']}, quantized={config.get('quantized', False)}")
+        return predictor
+
+    @staticmethod
+    def read_config(config_path: str, session_profile: str | None = None, quantized: bool | None = None) -> dict:
+        """
+        Read the model configuration file and apply the overrides.
+        """
+        with open(config_path, "r") as f:
+            config = json.load(f)
+        if session_profile is not None:
+            config["session"] = {**config.get("session", {}), "profile": session_profile}
+        if quantized is not None:
+            config["quantized"] = quantized
+        return config
+
+    def close(self) -> None:
+        """
+        Stop the batcher or the worker pool.
+        """
+        if self._batcher is not None:
+            self._batcher.stop()
+
+    @staticmethod
+    def warmup(predictor: Predictor) -> None:
+        """
+        Run a dummy clip through the model so lazy allocations happen before the first request.
+        """
+        clip = np.zeros((predictor.config["window_size"], FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8)
+        predictor.predict(clip)
+
+
+@lru_cache()
+def get_gesture_registry() -> GestureModelRegistry:
+    """Get singleton instance of GestureModelRegistry"""
+    return GestureModelRegistry()
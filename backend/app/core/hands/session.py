@@ -0,0 +1,168 @@
+import logging
+import os
+from pathlib import Path
+
+import onnxruntime as rt
+
+logger = logging.getLogger(__name__)
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+CPU_COUNT = os.cpu_count() or 1
+
+# Named session settings; keys of the "session" section of the model config override them.
+#   default    - onnxruntime defaults, kept as the reference for benchmarks
+#   latency    - one clip at a time as fast as possible: all cores inside each operator
+#   throughput - batched runs sharing the machine with the web server: half the cores per
+#                operator, independent graph branches run in parallel, and idle threads sleep
+#                instead of spin-waiting between runs
+#   shared     - one thread per session, for several sessions in one machine (worker processes)
+SESSION_PROFILES = {
+    "default": {},
+    "latency": {
+        "intra_op_threads": CPU_COUNT,
+        "inter_op_threads": 1,
+        "execution_mode": "sequential",
+        "graph_optimization_level": "all",
+    },
+    "throughput": {
+        "intra_op_threads": max(1, CPU_COUNT // 2),
+        "inter_op_threads": 2,
+        "execution_mode": "parallel",
+        "graph_optimization_level": "all",
+        "allow_spinning": False,
+    },
+    "shared": {
+        "intra_op_threads": 1,
+        "inter_op_threads": 1,
+        "execution_mode": "sequential",
+        "graph_optimization_level": "all",
+    },
+}
+
+
+def resolve_session_settings(config: dict | None) -> dict:
+    """
+    Merge the "session" section of the model config over its named profile.
+
+    Args:
+        config (dict | None): Session section, e.g. {"profile": "latency", "intra_op_threads": 4}.
+
+    Returns:
+        dict: Effective settings including the profile name.
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    config = dict(config or {})
+    profile = config.pop("profile", "default")
+    if profile not in SESSION_PROFILES:
+        raise ValueError(f"Unknown session profile {profile!r}, expected one of {sorted(SESSION_PROFILES)}")
+    return {"profile": profile, **SESSION_PROFILES[profile], **config}
+
+
+def optimized_model_path(model_path: str, settings: dict) -> str:
+    """
+    Path of the cached optimized graph for the model and optimization level.
+
+    The graph is stored next to the model unless "optimized_model_dir" is set. Graphs
+    optimized at the "all" level contain layout transformations for the current CPU, so
+    the cache belongs to the machine that produced it and is not meant to be shipped.
+    """
+    source = Path(model_path)
+    directory = Path(settings.get("optimized_model_dir") or source.parent)
+    level = settings.get("graph_optimization_level", "all")
+    return str(directory / f"{source.stem}.{level}.opt.onnx")
+
+
+def create_session(model_path: str, provider: str, config: dict | None = None) -> rt.InferenceSession:
+    """
+    Create an inference session with the configured profile.
+
+    With "cache_optimized_model" enabled, graph optimizations run once: the optimized
+    graph is saved on the first start and loaded with optimizations disabled afterwards,
+    which shortens startup. The cache is rebuilt when the source model is newer.
+
+    Args:
+        model_path (str): Path to the ONNX model file.
+        provider (str): Execution provider, e.g. CPUExecutionProvider.
+        config (dict | None): Session section of the model config.
+
+    Returns:
+        rt.InferenceSession: The session.
+    """
+    settings = resolve_session_settings(config)
+    options = rt.SessionOptions()
+    if settings.get("intra_op_threads"):
+        options.intra_op_num_threads = settings["intra_op_threads"]
+    if settings.get("inter_op_threads"):
+        options.inter_op_num_threads = settings["inter_op_threads"]
+    if settings.get("execution_mode") == "parallel":
+        options.execution_mode = rt.ExecutionMode.ORT_PARALLEL
+    if settings.get("allow_spinning") is False:
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        options.add_session_config_entry("session.inter_op.allow_spinning", "0")
+    if "graph_optimization_level" in settings:
+        options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[settings["graph_optimization_level"]]
+
+    path = model_path
+    cached = tmp_path = None
+    if settings.get("cache_optimized_model"):
+        cached = optimized_model_path(model_path, settings)
+        if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(model_path):
+            path = cached
+            options.graph_optimization_level = rt.GraphOptimizationLevel.ORT_DISABLE_ALL
+        else:
+            # Worker processes may optimize at the same time: each writes its own file and
+            # renames it, so no session ever loads a partially written graph
+            tmp_path = f"{cached}.{os.getpid()}.tmp"
+            options.optimized_model_filepath = tmp_path
+            logger.info(f"Saving optimized gesture model to {cached}")
+
+    logger.info(f"Creating gesture model session from {path} with settings {settings}")
+    try:
+        session = rt.InferenceSession(path, sess_options=options, providers=[provider])
+    except Exception:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if tmp_path is not None:
+        os.replace(tmp_path, cached)
+    return session
+
+
+def quantized_model_path(model_path: str) -> str:
+    """
+    Default path of the INT8 variant of a model: model.onnx -> model.int8.onnx.
+    """
+    source = Path(model_path)
+    return str(source.with_name(f"{source.stem}.int8{source.suffix}"))
+
+
+def quantize_model(model_path: str, output_path: str, per_channel: bool = False) -> None:
+    """
+    Write an INT8 dynamically quantized copy of the model.
+
+    Weights are stored as int8 and activations are quantized on the fly, so no
+    calibration data is needed. Requires the onnx package.
+
+    Args:
+        model_path (str): Path to the FP32 model.
+        output_path (str): Where to save the quantized model.
+        per_channel (bool): Quantize weights per output channel, usually more accurate.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    preprocessed = f"{output_path}.pre.onnx"
+    try:
+        quant_pre_process(model_path, preprocessed, skip_symbolic_shape=True)
+        quantize_dynamic(preprocessed, output_path, per_channel=per_channel, weight_type=QuantType.QInt8)
+    finally:
+        if os.path.exists(preprocessed):
+            os.remove(preprocessed)
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class GestureSequenceDecoder:
+    """
+    Temporal smoothing of per-window class probabilities and decoding into a gesture sequence.
+
+    Probabilities of consecutive windows are averaged with an exponential moving average.
+    A gesture is emitted when the smoothed top class is confident and differs from the
+    gesture currently held; a blank class or a low-confidence stretch ends the current
+    gesture, so the same sign repeated after a pause is emitted twice.
+
+    Attributes:
+        gestures (list): Decoded gestures, in order.
+        current (str | None): Gesture held by the latest windows.
+    """
+
+    def __init__(self, labels: dict, threshold: float, alpha: float = 0.5, blank: str = "no"):
+        """
+        Initialize the decoder.
+
+        Args:
+            labels (dict): Class index to label mapping.
+            threshold (float): Minimum smoothed confidence of an emitted gesture.
+            alpha (float): Weight of the newest window, 1 disables smoothing.
+            blank (str): Label that means "no gesture".
+        """
+        self.labels = labels
+        self.threshold = threshold
+        self.alpha = alpha
+        self.blank = blank
+        self.smoothed: np.ndarray | None = None
+        self.current: str | None = None
+        self.gestures: list = []
+
+    @property
+    def phrase(self) -> str:
+        return " ".join(self.gestures)
+
+    def update(self, probabilities: np.ndarray) -> str | None:
+        """
+        Feed class probabilities of the next window.
+
+        Args:
+            probabilities (np.ndarray): Softmax output of one window.
+
+        Returns:
+            str | None: The newly emitted gesture, if any.
+        """
+        if self.smoothed is None:
+            self.smoothed = probabilities.astype(np.float32, copy=True)
+        else:
+            self.smoothed *= 1 - self.alpha
+            self.smoothed += self.alpha * probabilities
+
+        index = int(np.argmax(self.smoothed))
+        label = self.labels[index]
+        if self.smoothed[index] < self.threshold or label == self.blank:
+            self.current = None
+            return None
+        if label == self.current:
+            return None
+
+        self.current = label
+        self.gestures.append(label)
+        return label
@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.core.metrics import Counter
+
+from .batcher import BatchingPredictor
+from .buffer import FrameRingBuffer
+from .pool import ProcessPoolPredictor
+
+snapshot_requests = Counter("gesture_snapshot_requests_total", "Gesture image requests by the recognizer that answered")
+
+
+async def recognize_snapshot(
+    model: BatchingPredictor | ProcessPoolPredictor, frames: list[np.ndarray], blank: str = "no"
+) -> tuple[str | None, float]:
+    """
+    Recognize the gesture on a still image or a short clip.
+
+    The frames are spread evenly over one model window, so a single image is repeated
+    window_size times and a short clip is stretched or subsampled to the window length.
+
+    Args:
+        model (BatchingPredictor | ProcessPoolPredictor): The shared model.
+        frames (list): RGB frames of shape (224, 224, 3), at least one.
+        blank (str): Label that means "no gesture".
+
+    Returns:
+        tuple: The top label (None for the blank class) and its confidence.
+    """
+    window_size = model.config["window_size"]
+    buffer = FrameRingBuffer(window_size)
+    for index in np.linspace(0, len(frames) - 1, window_size).round().astype(int):
+        buffer.append(frames[index])
+
+    probabilities = await model.apredict_proba(buffer)
+    top = int(np.argmax(probabilities))
+    label = model.labels[top]
+    return (None if label == blank else label), float(probabilities[top])
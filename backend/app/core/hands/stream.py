@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from .batcher import BatchingPredictor
+from .motion import gesture_windows
+from .pool import ProcessPoolPredictor
+from .utils import SLInference
+
+logger = logging.getLogger(__name__)
+
+
+class GestureStreamSession:
+    """
+    Live gesture recognition over camera frames pushed by one client.
+
+    Each session keeps its own frame ring buffer and smoothing state, while the model is
+    shared with every other session through the batching scheduler or the worker pool.
+    Frames keep arriving while a window is being evaluated; at most one evaluation per
+    session is in flight.
+
+    Attributes:
+        inference (SLInference): Per-session window, stride and decoder state.
+    """
+
+    def __init__(
+        self, model: BatchingPredictor | ProcessPoolPredictor, on_gesture: Callable[[str, str], Awaitable[None]]
+    ):
+        """
+        Initialize the session.
+
+        Args:
+            model (BatchingPredictor | ProcessPoolPredictor): The shared model.
+            on_gesture (Callable): Coroutine called with a newly stabilized gesture and the phrase so far.
+        """
+        self.inference = SLInference(model)
+        self.on_gesture = on_gesture
+        self._evaluation: asyncio.Task | None = None
+
+    @property
+    def phrase(self) -> str:
+        return self.inference.state.decoder.phrase
+
+    async def feed(self, data: bytes) -> None:
+        """
+        Add an encoded or raw RGB frame and schedule evaluation when a window is ready.
+        """
+        [frame] = await self.inference.model.adecode_frames([data])
+        if not self.inference.append(frame):
+            return
+        if self._evaluation is None:
+            self._evaluation = asyncio.create_task(self._evaluate())
+        else:
+            # The previous window is still being evaluated, this one is dropped
+            gesture_windows.inc(result="skipped")
+
+    async def _evaluate(self) -> None:
+        try:
+            gesture = await self.inference.aevaluate()
+            if gesture:
+                await self.on_gesture(gesture, self.phrase)
+        except Exception as e:
+            logger.warning(f"Gesture evaluation failed: {e}")
+        finally:
+            self._evaluation = None
+
+    async def close(self) -> None:
+        """
+        Wait for the in-flight evaluation so the last gesture is not lost.
+        """
+        if self._evaluation is not None:
+            await self._evaluation
@@ -1,9 +1,41 @@
-from collections import deque
-import json
+from dataclasses import dataclass
 from threading import Thread
+from .batcher import BatchingPredictor
+from .buffer import FrameRingBuffer
 from .model import Predictor
+from .pool import ProcessPoolPredictor
+from .motion import MotionGate, gesture_seconds_saved, gesture_windows
+from .smoothing import GestureSequenceDecoder
 import time
 
+DEFAULT_STRIDE = 3
+DEFAULT_SMOOTHING = 0.5
+DEFAULT_MOTION_THRESHOLD = 0.005
+
+
+@dataclass
+class GestureState:
+    """
+    Per-request recognition state, kept apart from the shared model.
+
+    Attributes:
+        input_queue (FrameRingBuffer): The most recent frames, at most window_size of them.
+        decoder (GestureSequenceDecoder): Smoothed per-window predictions and decoded gestures.
+        motion (MotionGate | None): Motion detector, None when gating is disabled.
+        pred (str): The gesture currently recognized.
+        frames_since_prediction (int): New frames since the last evaluated window.
+    """
+    input_queue: FrameRingBuffer
+    decoder: GestureSequenceDecoder
+    motion: MotionGate | None = None
+    pred: str = ""
+    frames_since_prediction: int = 0
+
+    @property
+    def gestures(self) -> list:
+        return self.decoder.gestures
+
+
 class SLInference:
     """
     Main prediction thread.
@@ -11,52 +43,128 @@ class SLInference:
     Attributes:
         running (bool): Flag to control the running of the thread.
         config (dict): Configuration parameters for the model.
-        model (Predictor): The prediction model.
-        input_queue (deque): A queue to hold the input data.
-        pred (str): The prediction result.
+        model (Predictor | BatchingPredictor | ProcessPoolPredictor): The shared prediction model.
+        state (GestureState): Recognition state of this request.
         thread (Thread): The worker thread.
     """
-    def __init__(self, config_path):
+    def __init__(self, model: Predictor | BatchingPredictor | ProcessPoolPredictor):
         """
         Initialize the SLInference object.
 
         Args:
-            config_path (str): Path to the configuration file.
+            model (Predictor | BatchingPredictor | ProcessPoolPredictor): The loaded model,
+                shared between requests.
         """
         self.running = True
-        self.config = self.read_config(config_path)
-        self.model = Predictor(self.config)
-        self.input_queue = deque(maxlen=self.config["window_size"])
-        self.pred = ""
+        self.config = model.config
+        self.model = model
+        self.stride = self.config.get("stride", DEFAULT_STRIDE)
+        motion_threshold = self.config.get("motion_threshold", DEFAULT_MOTION_THRESHOLD)
+        self.state = GestureState(
+            input_queue=FrameRingBuffer(self.config["window_size"]),
+            decoder=GestureSequenceDecoder(
+                model.labels, self.config["threshold"], alpha=self.config.get("smoothing", DEFAULT_SMOOTHING)
+            ),
+            motion=MotionGate(motion_threshold) if motion_threshold is not None else None,
+        )
 
-    def read_config(self, config_path):
+    @property
+    def input_queue(self) -> FrameRingBuffer:
+        return self.state.input_queue
+
+    @property
+    def pred(self) -> str:
+        return self.state.pred
+
+    @property
+    def is_ready(self) -> bool:
         """
-        Read the configuration file.
+        A full window with at least `stride` new frames is waiting for evaluation.
+        """
+        return len(self.input_queue) == self.config["window_size"] and self.state.frames_since_prediction >= self.stride
 
-        Args:
-            config_path (str): Path to the configuration file.
+    def append(self, frame) -> bool:
+        """
+        Add a frame to the window.
+
+        A ready window in which nothing moved since the previous evaluation is skipped, the
+        previous prediction still holds.
+
+        Returns:
+            bool: Whether the window should be evaluated.
+        """
+        self.input_queue.append(frame)
+        self.state.frames_since_prediction += 1
+        if self.state.motion is not None:
+            self.state.motion.update(frame)
+        if not self.is_ready:
+            return False
+
+        motion = self.state.motion
+        evaluated_before = self.state.decoder.smoothed is not None
+        if motion is not None and evaluated_before and motion.is_static(self.config["window_size"]):
+            self.state.frames_since_prediction = 0
+            gesture_windows.inc(result="skipped")
+            gesture_seconds_saved.inc(getattr(self.model, "clip_seconds", 0.0))
+            return False
+        return True
+
+    def evaluate(self) -> str | None:
+        """
+        Evaluate the current window and update the smoothed prediction.
+
+        Returns:
+            str | None: The newly emitted gesture, if any.
+        """
+        self.state.frames_since_prediction = 0
+        gesture_windows.inc(result="evaluated")
+        gesture = self.state.decoder.update(self.model.predict_proba(self.input_queue))
+        self.state.pred = self.state.decoder.current or ""
+        return gesture
+
+    async def aevaluate(self) -> str | None:
+        """
+        Evaluate the current window from a coroutine; requires a BatchingPredictor or a
+        ProcessPoolPredictor model.
 
         Returns:
-            dict: The configuration parameters.
+            str | None: The newly emitted gesture, if any.
         """
-        with open(config_path, "r") as f:
-            config = json.load(f)
-        return config
+        self.state.frames_since_prediction = 0
+        gesture_windows.inc(result="evaluated")
+        gesture = self.state.decoder.update(await self.model.apredict_proba(self.input_queue))
+        self.state.pred = self.state.decoder.current or ""
+        return gesture
 
     def worker(self):
         """
         The main worker function that runs in a separate thread.
         """
         while self.running:
-            if len(self.input_queue) == self.config["window_size"]:
-                pred_dict = self.model.predict(self.input_queue)
-                if pred_dict:
-                    self.pred = pred_dict["labels"][0]
-                    self.input_queue.clear()
-                else:
-                    self.pred = ""
+            if self.is_ready:
+                self.evaluate()
             time.sleep(0.1)
 
+    def process_offline(self, frames) -> list:
+        """
+        Recognize the gesture sequence of a finished clip without the worker thread.
+
+        A window of window_size frames is evaluated every `stride` new frames over the
+        continuous stream, per-window probabilities are smoothed over time, and the whole
+        decoded sequence is returned. Runs as fast as inference allows and gives the same
+        result for the same clip.
+
+        Args:
+            frames (Iterable[np.ndarray]): RGB frames of the clip.
+
+        Returns:
+            list: Gestures recognized in the clip, in order.
+        """
+        for frame in frames:
+            if self.append(frame):
+                self.evaluate()
+        return self.state.gestures
+
     def start(self):
         """
         Start the worker thread.
@@ -69,4 +177,4 @@ class SLInference:
         Stop the worker thread.
         """
         self.running = False
-        self.thread.join()
\ No newline at end of file
+        self.thread.join()
@@ -0,0 +1,87 @@
+import io
+import logging
+
+import av
+import cv2
+import numpy as np
+
+from .buffer import FRAME_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def decode_video(
+    video_bytes: bytes, target_fps: float, max_frames: int, size: int = FRAME_SIZE
+) -> list[np.ndarray]:
+    """
+    Decode frames for the gesture model straight from an in-memory video.
+
+    Frames are sampled on a target_fps grid by their presentation time. When the source
+    frame rate is at least twice the target, the decoder drops non-reference frames
+    itself; frames off the grid are never converted. Sampled frames are scaled to
+    size x size RGB by the decoder's scaler, and decoding stops at the first sampled
+    frame past max_frames, so the cost is proportional to the frames actually used.
+
+    Args:
+        video_bytes (bytes): Raw bytes of the video file (e.g., MP4 format).
+        target_fps (float): Frame rate the model expects.
+        max_frames (int): Maximum number of frames to return.
+        size (int): Side of the square output frames.
+
+    Returns:
+        list: RGB frames of shape (size, size, 3).
+    """
+    frames = []
+    with av.open(io.BytesIO(video_bytes), mode="r") as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        source_fps = float(stream.average_rate or 0)
+        if source_fps >= 2 * target_fps:
+            stream.codec_context.skip_frame = "NONREF"
+
+        interval = 1 / target_fps
+        next_time = None
+        for frame in container.decode(stream):
+            if frame.time is None:
+                continue
+            if next_time is None:
+                next_time = frame.time
+            if frame.time + 1e-6 < next_time:
+                continue
+
+            if len(frames) >= max_frames:
+                # Only a sampled frame past the limit means the clip is longer than allowed
+                logger.warning(f"Video truncated to {max_frames} frames at {target_fps} fps")
+                break
+            frames.append(frame.to_ndarray(width=size, height=size, format="rgb24"))
+            next_time += interval
+            # After a long gap in timestamps resume sampling from the current frame
+            if next_time < frame.time:
+                next_time = frame.time + interval
+
+    logger.debug(f"Decoded {len(frames)} frames, source fps={source_fps}, target fps={target_fps}")
+    return frames
+
+
+def decode_image_frame(data: bytes, size: int = FRAME_SIZE) -> np.ndarray:
+    """
+    Turn a single camera frame into a model frame.
+
+    Args:
+        data (bytes): Either raw size x size RGB pixels or an encoded image (JPEG, PNG, WebP).
+        size (int): Side of the square output frame.
+
+    Returns:
+        np.ndarray: RGB frame of shape (size, size, 3).
+
+    Raises:
+        ValueError: If the data is neither raw pixels nor a decodable image.
+    """
+    if len(data) == size * size * 3:
+        return np.frombuffer(data, dtype=np.uint8).reshape(size, size, 3)
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR) if data else None
+    if image is None:
+        raise ValueError("Failed to decode image frame")
+    image = cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
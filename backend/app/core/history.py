@@ -0,0 +1,92 @@
+"""
+Request history with keyset pagination.
+
+Pages are ordered by (created_at, id) descending. The cursor holds the key of the
+last row of a page, and the next page starts right below it, so every page is an
+index range scan of (created_at, id), or of (request_type | status | task, created_at, id)
+when filtered, no matter how deep the client has paged.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from uuid import UUID
+
+from tortoise.expressions import Q
+
+from app.core.db.models import Request
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, request_id: UUID) -> str:
+    """Opaque cursor pointing right below the given row."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{request_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Key of the row a cursor points below.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, request_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(request_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def fetch_history(
+    limit: int = 50,
+    cursor: str | None = None,
+    request_type: str | None = None,
+    status: str | None = None,
+    task: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> tuple[list[Request], str | None]:
+    """
+    One page of the request history, newest first.
+
+    Args:
+        limit: Rows per page, at most MAX_PAGE_SIZE.
+        cursor: next_cursor of the previous page, None for the first page.
+        request_type: Only requests of this type.
+        status: Only requests in this status.
+        task: Only requests the AI answered with this task.
+        created_after: Only requests created at or after this time.
+        created_before: Only requests created before this time.
+
+    Returns:
+        The rows and the cursor of the next page, None on the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    query = Request.all()
+    if request_type is not None:
+        query = query.filter(request_type=request_type)
+    if status is not None:
+        query = query.filter(status=status)
+    if task is not None:
+        query = query.filter(task=task)
+    if created_after is not None:
+        query = query.filter(created_at__gte=created_after)
+    if created_before is not None:
+        query = query.filter(created_at__lt=created_before)
+    if cursor is not None:
+        created_at, request_id = decode_cursor(cursor)
+        # The plain bound keeps the scan a single index range; the OR only breaks ties
+        query = query.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(id__lt=request_id)
+        )
+
+    limit = min(limit, MAX_PAGE_SIZE)
+    rows = await query.order_by("-created_at", "-id").limit(limit + 1)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
@@ -0,0 +1,71 @@
+"""
+Image helpers for requests that carry camera snapshots.
+"""
+
+import cv2
+import numpy as np
+
+
+def dhash(image_bytes: bytes, size: int = 8) -> str:
+    """
+    Difference hash of an encoded image.
+
+    The image is reduced to a (size, size + 1) grayscale thumbnail and every bit tells
+    whether a pixel is brighter than its right neighbour. Re-encoding, small noise and
+    scaling leave the hash unchanged, so visually identical frames share it.
+
+    Args:
+        image_bytes (bytes): Encoded image (JPEG, PNG, WebP).
+        size (int): Hash side, the hash has size * size bits.
+
+    Returns:
+        str: The hash as a hex string.
+
+    Raises:
+        ValueError: If the image cannot be decoded.
+    """
+    # JPEG is decoded straight at 1/8 scale, the thumbnail needs no more
+    buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_REDUCED_GRAYSCALE_8) if image_bytes else None
+    if image is None:
+        raise ValueError("Failed to decode image")
+    thumbnail = cv2.resize(image, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(thumbnail[:, 1:] > thumbnail[:, :-1])
+    return bits.tobytes().hex()
+
+
+def prepare_for_upload(image_bytes: bytes, max_side: int, quality: int) -> bytes:
+    """
+    Downscale an image to max_side on its longer side and re-encode it as JPEG.
+
+    Camera snapshots are usually far larger than what a vision model looks at, so the
+    upload shrinks by an order of magnitude. The original is kept when it is already a
+    small enough JPEG and re-encoding would not make it smaller.
+
+    Args:
+        image_bytes (bytes): Encoded image (JPEG, PNG, WebP).
+        max_side (int): Longest side of the uploaded image, in pixels.
+        quality (int): JPEG quality, 1-100.
+
+    Returns:
+        bytes: JPEG image.
+
+    Raises:
+        ValueError: If the image cannot be decoded.
+    """
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR) if image_bytes else None
+    if image is None:
+        raise ValueError("Failed to decode image")
+
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Failed to encode image")
+    if scale >= 1 and image_bytes[:2] == b"\xff\xd8" and len(encoded) >= len(image_bytes):
+        return image_bytes
+    return encoded.tobytes()
@@ -0,0 +1,228 @@
+"""
+Pre-rendered speech for task confirmations.
+
+Spoken confirmations follow a handful of templates per task type. The static fragments
+of the templates and the words of Russian numbers are synthesized once at startup;
+a confirmation is then assembled by concatenating cached audio segments in a few
+milliseconds. Parameters that are not numbers fall back to full synthesis.
+"""
+
+import asyncio
+import logging
+import string
+import time
+from functools import lru_cache
+
+from app.core.configs.config import settings
+from app.core.metrics import Counter, Histogram
+from app.core.text_to_speech import TextToSpeechService, concat_audio, get_tts_service
+
+logger = logging.getLogger(__name__)
+
+confirmations = Counter("tts_confirmations_total", "Spoken task confirmations by how they were produced")
+confirmation_latency = Histogram(
+    "tts_confirmation_seconds",
+    "Producing the audio of a task confirmation",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5),
+)
+
+# Keys are the task types of the ML service (TaskType values)
+CONFIRMATION_TEMPLATES = {
+    "call_elevator": "Лифт вызван. Этаж {floor}.",
+    "check_camera": "Открываю камеру номер {camera_id}.",
+    "check_snow": "Заявка на проверку снега принята.",
+    "check_obstacles": "Заявка на проверку препятствий принята.",
+    "create_ticket": "Заявка создана.",
+    "submit_readings": "Показания приняты: {value}.",
+    "pay_utilities": "Платёж на сумму {amount} принят.",
+}
+
+UNITS = [
+    "ноль", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять", "десять",
+    "одиннадцать", "двенадцать", "тринадцать", "четырнадцать", "пятнадцать", "шестнадцать",
+    "семнадцать", "восемнадцать", "девятнадцать",
+]
+TENS = ["", "", "двадцать", "тридцать", "сорок", "пятьдесят", "шестьдесят", "семьдесят", "восемьдесят", "девяносто"]
+HUNDREDS = ["", "сто", "двести", "триста", "четыреста", "пятьсот", "шестьсот", "семьсот", "восемьсот", "девятьсот"]
+THOUSANDS = ("тысяча", "тысячи", "тысяч")
+MAX_NUMBER = 999_999
+
+
+def spoken(fragment: str) -> str | None:
+    """Template fragment as a segment, None if it is only punctuation and spaces."""
+    fragment = fragment.strip()
+    return fragment if any(char.isalnum() for char in fragment) else None
+
+
+def _below_thousand(n: int, feminine: bool = False) -> list[str]:
+    words = []
+    if n >= 100:
+        words.append(HUNDREDS[n // 100])
+        n %= 100
+    if n >= 20:
+        words.append(TENS[n // 10])
+        n %= 10
+    if n or not words:
+        if feminine and n in (1, 2):
+            words.append("одна" if n == 1 else "две")
+        else:
+            words.append(UNITS[n])
+    return words
+
+
+def number_words(n: int) -> list[str]:
+    """
+    Russian cardinal number as words, e.g. 5042 -> ["пять", "тысяч", "сорок", "два"].
+
+    Args:
+        n: Number from 0 to MAX_NUMBER.
+
+    Returns:
+        Words of the number.
+    """
+    thousands, rest = divmod(n, 1000)
+    words = []
+    if thousands:
+        words += _below_thousand(thousands, feminine=True)
+        last_two = thousands % 100
+        if last_two % 10 == 1 and last_two != 11:
+            words.append(THOUSANDS[0])
+        elif last_two % 10 in (2, 3, 4) and last_two not in (12, 13, 14):
+            words.append(THOUSANDS[1])
+        else:
+            words.append(THOUSANDS[2])
+    if rest or not thousands:
+        words += _below_thousand(rest)
+    return words
+
+
+def number_vocabulary() -> set[str]:
+    """All words number_words can produce."""
+    return set(UNITS) | set(TENS[2:]) | set(HUNDREDS[1:]) | set(THOUSANDS) | {"одна", "две"}
+
+
+class PhraseBank:
+    """
+    Task confirmations assembled from pre-rendered audio segments.
+
+    Args:
+        service: Synthesizer and cache the segments are rendered with.
+        templates: Confirmation template per task type.
+        lang: Language of the templates.
+    """
+
+    def __init__(self, service: TextToSpeechService, templates: dict[str, str], lang: str = "ru"):
+        self.service = service
+        self.templates = templates
+        self.lang = lang
+        self._segments: dict[str, bytes] = {}
+
+    @property
+    def vocabulary(self) -> set[str]:
+        """Every segment the bank renders: static template fragments and number words."""
+        fragments = {
+            spoken(literal)
+            for template in self.templates.values()
+            for literal, _field, _spec, _conversion in string.Formatter().parse(template)
+        }
+        return (fragments - {None}) | number_vocabulary()
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether every segment is rendered."""
+        return self._segments.keys() >= self.vocabulary
+
+    async def warm(self) -> None:
+        """
+        Render the missing segments; they come from the audio cache after the first start.
+        """
+        started = time.perf_counter()
+        missing = sorted(self.vocabulary - self._segments.keys())
+        results = await asyncio.gather(
+            *(self.service.synthesize_sentence(segment, self.lang, "") for segment in missing),
+            return_exceptions=True,
+        )
+        failed = 0
+        for segment, audio in zip(missing, results):
+            if isinstance(audio, BaseException):
+                failed += 1
+                logger.warning(f"Failed to render phrase bank segment {segment!r}: {audio}")
+            else:
+                self._segments[segment] = audio
+        logger.info(
+            f"Phrase bank rendered {len(missing) - failed} segments in {time.perf_counter() - started:.1f} s, "
+            f"{failed} failed"
+        )
+
+    async def keep_warm(self, retry_interval: float = 60.0) -> None:
+        """
+        Render the bank, retrying the segments that failed until every one is rendered.
+        """
+        await self.warm()
+        while not self.is_ready:
+            await asyncio.sleep(retry_interval)
+            await self.warm()
+
+    def text(self, task: str, parameters: dict) -> str:
+        """
+        Confirmation text of a task.
+
+        Raises:
+            KeyError: If the task has no template.
+            ValueError: If a parameter of the template is missing.
+        """
+        try:
+            return self.templates[task].format(**parameters)
+        except KeyError as e:
+            if task not in self.templates:
+                raise
+            raise ValueError(f"Missing parameter {e} for task {task}")
+
+    def segments(self, task: str, parameters: dict) -> list[str] | None:
+        """
+        Segments that spell the confirmation, None if some parameter is not a number in range.
+        """
+        segments = []
+        for literal, field, _spec, _conversion in string.Formatter().parse(self.templates[task]):
+            if spoken(literal):
+                segments.append(spoken(literal))
+            if field is None:
+                continue
+            value = str(parameters.get(field, "")).strip()
+            if not value.isdigit() or int(value) > MAX_NUMBER:
+                return None
+            segments += number_words(int(value))
+        return segments
+
+    def assemble(self, task: str, parameters: dict) -> bytes | None:
+        """
+        Confirmation audio from pre-rendered segments, None if any segment is not available.
+        """
+        segments = self.segments(task, parameters)
+        if segments is None or any(segment not in self._segments for segment in segments):
+            return None
+        return concat_audio([self._segments[segment] for segment in segments], self.service.media_type)
+
+    async def confirmation(self, task: str, parameters: dict) -> tuple[bytes, str]:
+        """
+        Audio of a task confirmation, from the bank or by full synthesis.
+
+        Returns:
+            The audio and how it was produced: "bank" or "synthesis".
+        """
+        started = time.perf_counter()
+        text = self.text(task, parameters)
+        audio = self.assemble(task, parameters)
+        source = "bank"
+        if audio is None:
+            source = "synthesis"
+            audio = await self.service.synthesize(text, lang=self.lang)
+        confirmations.inc(source=source)
+        confirmation_latency.observe(time.perf_counter() - started, source=source)
+        return audio, source
+
+
+@lru_cache()
+def get_phrase_bank() -> PhraseBank:
+    """Get singleton instance of PhraseBank"""
+    return PhraseBank(get_tts_service(), CONFIRMATION_TEMPLATES, lang=settings.TTS_LANGUAGE)
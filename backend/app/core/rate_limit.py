@@ -0,0 +1,208 @@
+"""
+Distributed rate and concurrency limits for external APIs.
+
+Every upstream (HF Inference, GigaChat, RunPod) gets a token bucket and a concurrency
+semaphore in Redis, so the limits hold across all backend replicas and ML workers.
+ml_service/app/rate_limit.py runs the same scripts on the same keys; keep them in sync.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.core.configs.config import settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+limiter_wait = Histogram(
+    "upstream_limiter_wait_seconds",
+    "Time external API calls waited for the rate and concurrency limiter",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+limiter_rejections = Counter(
+    "upstream_limiter_rejections_total", "External API calls rejected by the limiter or throttled by the upstream"
+)
+
+# Reserves one token. The bucket may go into debt of up to max_wait seconds of refill,
+# so callers queue in arrival order and sleep for the returned wait instead of polling.
+# Returns {acquired, wait seconds as a string}; Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if wait > max_wait then
+    return {0, tostring(wait)}
+end
+
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return {1, tostring(wait)}
+"""
+
+# Takes a slot of a counting semaphore kept as a sorted set of leases scored by expiry,
+# so slots of crashed callers free themselves. Returns 1 when the slot is taken.
+CONCURRENCY_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local lease = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + lease, ARGV[2])
+redis.call('EXPIRE', KEYS[1], math.ceil(lease) + 1)
+return 1
+"""
+
+SLOT_POLL_INTERVAL = 0.05
+
+
+class UpstreamBusyError(Exception):
+    """
+    An external API is over its quota: the limiter would wait too long or the API answered 429.
+
+    Attributes:
+        upstream (str): Name of the external API.
+        retry_after (float): Seconds after which a retry is likely to pass.
+    """
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Upstream {upstream} is busy, retry in {retry_after:.1f} s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class UpstreamLimiter:
+    """
+    Token bucket plus concurrency limit of one external API, shared through Redis.
+
+    Calls over the rate queue for up to max_wait seconds instead of failing. Redis
+    errors disable limiting for the call rather than failing it.
+
+    Args:
+        redis_client: RedisClient used to run the scripts.
+        upstream: Name of the external API, part of the Redis keys.
+        rate: Sustained calls per second.
+        burst: Calls allowed at once after an idle period.
+        concurrency: Calls in flight across all processes.
+        max_wait: Longest time a call waits for the limiter.
+        lease: Seconds after which the slot of a caller that never released it expires.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        upstream: str,
+        rate: float,
+        burst: int,
+        concurrency: int,
+        max_wait: float,
+        lease: float = 120.0,
+    ):
+        self.upstream = upstream
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_wait = max_wait
+        self.lease = lease
+        self._redis = redis_client
+        self._bucket_key = f"ratelimit:{upstream}:tokens"
+        self._slots_key = f"ratelimit:{upstream}:slots"
+        self._take_token = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._take_slot = redis_client.register_script(CONCURRENCY_SCRIPT)
+
+    async def wait_for_token(self, max_wait: float) -> None:
+        acquired, wait = await self._take_token(keys=[self._bucket_key], args=[self.rate, self.burst, max_wait])
+        wait = float(wait)
+        if not acquired:
+            limiter_rejections.inc(upstream=self.upstream, reason="rate")
+            raise UpstreamBusyError(self.upstream, wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def wait_for_slot(self, lease_id: str, deadline: float) -> None:
+        while not await self._take_slot(keys=[self._slots_key], args=[self.concurrency, lease_id, self.lease]):
+            if time.monotonic() >= deadline:
+                limiter_rejections.inc(upstream=self.upstream, reason="concurrency")
+                raise UpstreamBusyError(self.upstream, SLOT_POLL_INTERVAL)
+            await asyncio.sleep(SLOT_POLL_INTERVAL * (0.5 + random.random()))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Wait for a token and a concurrency slot for the duration of one call.
+
+        Raises:
+            UpstreamBusyError: If the call would wait longer than max_wait.
+        """
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        lease_id = uuid.uuid4().hex
+        limited = True
+        try:
+            await self.wait_for_token(self.max_wait)
+            await self.wait_for_slot(lease_id, deadline)
+        except UpstreamBusyError:
+            raise
+        except Exception as e:
+            logger.warning(f"Rate limiter for {self.upstream} is unavailable, calling without it: {e}")
+            limited = False
+        limiter_wait.observe(time.monotonic() - started, upstream=self.upstream)
+
+        try:
+            yield
+        finally:
+            if limited:
+                try:
+                    await self._redis.release_slot(self._slots_key, lease_id)
+                except Exception as e:
+                    logger.warning(f"Failed to release {self.upstream} slot, it expires in {self.lease} s: {e}")
+
+    def throttled(self, retry_after: str | float | None = None) -> UpstreamBusyError:
+        """
+        Error for a 429 answer of the upstream itself, honouring its Retry-After header.
+        """
+        limiter_rejections.inc(upstream=self.upstream, reason="upstream")
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = 1 / self.rate
+        return UpstreamBusyError(self.upstream, delay)
+
+
+@lru_cache()
+def get_upstream_limiter(upstream: str) -> UpstreamLimiter:
+    """Get singleton limiter of an external API configured by its <UPSTREAM>_* settings"""
+    # Imported here: app.core.redis pulls in app.api, whose routes import this module
+    from app.core.redis import get_redis_client
+
+    prefix = upstream.upper()
+    return UpstreamLimiter(
+        get_redis_client(),
+        upstream,
+        rate=getattr(settings, f"{prefix}_RATE_LIMIT"),
+        burst=getattr(settings, f"{prefix}_BURST"),
+        concurrency=getattr(settings, f"{prefix}_CONCURRENCY"),
+        max_wait=settings.UPSTREAM_MAX_WAIT,
+    )
@@ -4,8 +4,10 @@ Provides methods for managing cache data, user settings, and temporary storage.
 Implements connection pooling and transaction support.
 """
 
+import base64
 import os
 import logging
+import time
 
 import orjson
 import redis.asyncio as aioredis
@@ -18,6 +20,8 @@ logger = logging.getLogger(__name__)
 
 SEVEN_DAYS_IN_SECONDS = 60 * 60 * 24 * 7
 PROCESSING_QUEUE_KEY = "ai:processing:queue"
+# Seconds the API waits for the ML workers to answer a request
+AI_RESPONSE_TIMEOUT = 30
 
 
 class RedisClient:
@@ -35,6 +39,17 @@ class RedisClient:
         """Set user language setting in cache"""
         await self._redis.set(f"user:language:{id}", lang, ex=SEVEN_DAYS_IN_SECONDS)
 
+    async def get_user_languages_by_ids(self, ids: list[int]) -> list[str | None]:
+        """Get language settings of several users from cache in one round trip"""
+        return await self._redis.mget([f"user:language:{id}" for id in ids])
+
+    async def set_user_languages_by_ids(self, languages: dict[int, str], ttl: int = SEVEN_DAYS_IN_SECONDS) -> None:
+        """Set language settings of several users in cache in one round trip"""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for id, lang in languages.items():
+                pipe.set(f"user:language:{id}", lang, ex=ttl)
+            await pipe.execute()
+
     async def is_user_blocked(self, user_id: int) -> bool:
         """Get user block status from cache using bitmap"""
         result = await self._redis.get(f"user:{user_id}:blocked")
@@ -44,18 +59,63 @@ class RedisClient:
         """Set user block status in cache using bitmap"""
         await self._redis.set(f"user:{user_id}:blocked", int(is_blocked), ex=SEVEN_DAYS_IN_SECONDS)
 
-    async def queue_text_request(self, request_uuid: str, text: str) -> None:
+    async def get_transcript(self, key: str) -> str | None:
+        """Get cached transcript of an input identified by its kind and content digest"""
+        return await self._redis.get(f"stt:transcript:{key}")
+
+    async def set_transcript(self, key: str, text: str, ttl: int) -> None:
+        """Cache transcript of an input identified by its kind and content digest"""
+        await self._redis.set(f"stt:transcript:{key}", text, ex=ttl)
+
+    async def get_gesture_text(self, image_hash: str) -> str | None:
+        """Get cached gesture recognized on an image identified by its perceptual hash"""
+        return await self._redis.get(f"gesture:text:{image_hash}")
+
+    async def set_gesture_text(self, image_hash: str, text: str, ttl: int) -> None:
+        """Cache gesture recognized on an image identified by its perceptual hash"""
+        await self._redis.set(f"gesture:text:{image_hash}", text, ex=ttl)
+
+    async def get_gigachat_file_id(self, digest: str) -> str | None:
+        """Get GigaChat file ID of an uploaded image identified by its content digest"""
+        return await self._redis.get(f"gigachat:file:{digest}")
+
+    async def set_gigachat_file_id(self, digest: str, file_id: str, ttl: int) -> None:
+        """Cache GigaChat file ID of an uploaded image identified by its content digest"""
+        await self._redis.set(f"gigachat:file:{digest}", file_id, ex=ttl)
+
+    async def get_tts_audio(self, digest: str) -> bytes | None:
+        """Get cached synthesized audio identified by its content digest"""
+        audio = await self._redis.get(f"tts:audio:{digest}")
+        # The pool decodes responses, binary audio is stored base64 encoded
+        return base64.b64decode(audio) if audio is not None else None
+
+    async def set_tts_audio(self, digest: str, audio: bytes, ttl: int) -> None:
+        """Cache synthesized audio identified by its content digest"""
+        await self._redis.set(f"tts:audio:{digest}", base64.b64encode(audio).decode(), ex=ttl)
+
+    def register_script(self, script: str):
+        """Register a Lua script, the returned callable runs it by its SHA"""
+        return self._redis.register_script(script)
+
+    async def release_slot(self, key: str, lease_id: str) -> None:
+        """Release a concurrency limiter slot"""
+        await self._redis.zrem(key, lease_id)
+
+    async def queue_text_request(self, request_uuid: str, text: str, timeout: float = AI_RESPONSE_TIMEOUT) -> None:
         """
         Add a text processing request to the queue.
 
         Args:
             request_uuid: Unique identifier for the request
             text: Text to be processed
+            timeout: Seconds the caller waits for the response; the ML workers drop the
+                request, including its throttled retries, after that
         """
         try:
             request_data = {
                 "request_uuid": request_uuid,
                 "text": text,
+                "deadline": time.time() + timeout,
             }
 
             # Add to the processing queue
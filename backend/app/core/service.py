@@ -8,29 +8,126 @@ Provides functions for managing user data and preferences:
 """
 
 import logging
+from functools import lru_cache
 
-from tortoise.exceptions import DoesNotExist
-
+from app.core.cache import LRUCache, cache_requests
+from app.core.configs.config import settings
 from app.core.db.models import User
-from app.core.redis import RedisClient, get_redis_client
 
 logger = logging.getLogger(__name__)
 
+# Cached for unknown users and users without a language, so repeated lookups of
+# them don't reach the database
+NO_LANGUAGE = ""
+
+
+class UserLanguageCache:
+    """
+    User languages behind an in-process LRU and Redis.
+
+    Lookups of many users cost at most one Redis MGET and one database query. Users
+    that don't exist or have no language are cached as well, with a shorter TTL in Redis.
+
+    Args:
+        redis_client: RedisClient of the shared cache.
+        maxsize: Maximum number of users kept in memory.
+        ttl: Seconds a language stays in memory.
+        redis_ttl: Seconds a language stays in Redis.
+        negative_ttl: Seconds a missing language stays in Redis.
+    """
+
+    def __init__(self, redis_client, maxsize: int, ttl: int, redis_ttl: int, negative_ttl: int):
+        self._redis = redis_client
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._redis_ttl = redis_ttl
+        self._negative_ttl = negative_ttl
+
+    async def get_many(self, user_ids: list[int]) -> dict[int, str | None]:
+        """
+        Languages of the given users.
+
+        Returns:
+            Language code by user ID, None for unknown users and users without a language.
+        """
+        languages: dict[int, str] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            language = self._memory.get(user_id)
+            if language is None:
+                missing.append(user_id)
+            else:
+                languages[user_id] = language
+        if languages:
+            cache_requests.inc(len(languages), cache="user_language", result="memory_hit")
+
+        if missing:
+            try:
+                cached = await self._redis.get_user_languages_by_ids(missing)
+            except Exception as e:
+                logger.warning(f"User language cache lookup failed: {e}")
+                cached = [None] * len(missing)
+            not_cached = []
+            for user_id, language in zip(missing, cached):
+                if language is None:
+                    not_cached.append(user_id)
+                else:
+                    self._memory.set(user_id, language)
+                    languages[user_id] = language
+            if len(missing) > len(not_cached):
+                cache_requests.inc(len(missing) - len(not_cached), cache="user_language", result="redis_hit")
+            if not_cached:
+                cache_requests.inc(len(not_cached), cache="user_language", result="miss")
+                languages.update(await self._load(not_cached))
+
+        return {user_id: languages[user_id] or None for user_id in user_ids}
+
+    async def _load(self, user_ids: list[int]) -> dict[int, str]:
+        """Read languages from the database and cache them, NO_LANGUAGE for missing ones."""
+        logger.debug(f"Re-caching languages of {len(user_ids)} users")
+        rows = await User.filter(id__in=user_ids).values_list("id", "language_code")
+        found = {user_id: language or NO_LANGUAGE for user_id, language in rows}
+        languages = {user_id: found.get(user_id, NO_LANGUAGE) for user_id in user_ids}
+        unknown = [user_id for user_id in user_ids if user_id not in found]
+        if unknown:
+            logger.warning(f"{len(unknown)} users not found when caching language_code, first id={unknown[0]}")
+
+        for user_id, language in languages.items():
+            self._memory.set(user_id, language)
+        present = {user_id: language for user_id, language in languages.items() if language}
+        absent = {user_id: language for user_id, language in languages.items() if not language}
+        try:
+            if present:
+                await self._redis.set_user_languages_by_ids(present, self._redis_ttl)
+            if absent:
+                await self._redis.set_user_languages_by_ids(absent, self._negative_ttl)
+        except Exception as e:
+            logger.warning(f"User language cache store failed: {e}")
+        return languages
+
+
+@lru_cache()
+def get_user_language_cache() -> UserLanguageCache:
+    """Get singleton instance of UserLanguageCache"""
+    # Imported here: app.core.redis pulls in app.api, whose routes import this module
+    from app.core.redis import SEVEN_DAYS_IN_SECONDS, get_redis_client
+
+    return UserLanguageCache(
+        get_redis_client(),
+        maxsize=settings.USER_CACHE_SIZE,
+        ttl=settings.USER_CACHE_TTL,
+        redis_ttl=SEVEN_DAYS_IN_SECONDS,
+        negative_ttl=settings.USER_NEGATIVE_CACHE_TTL,
+    )
+
+
+async def get_user_languages(user_ids: list[int]) -> dict[int, str | None]:
+    """Get languages of several users with one cache round trip and at most one database query"""
+    return await get_user_language_cache().get_many(user_ids)
+
 
 async def get_user_language(user_id: int) -> str | None:
     """Get cached user language or re-cache new one from database"""
-    redis_client: RedisClient = get_redis_client()
-    result = await redis_client.get_user_language_by_id(user_id)
-    if result is None:
-        logger.debug(f"Re-caching user language, id={user_id}")
-        try:
-            result = (await User.get(id=user_id).only("language_code")).language_code
-        except DoesNotExist:
-            logger.warning(f"User with id={user_id} not found when caching language_code")
-            return None
-        logger.debug(f"Caching user_id={user_id} language={result}")
-        await redis_client.set_user_language_by_id(user_id, result)
-    return result
+    return (await get_user_languages([user_id]))[user_id]
 
 
 async def await_something(something):
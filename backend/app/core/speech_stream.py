@@ -0,0 +1,276 @@
+"""
+Incremental speech recognition over a stream of audio chunks.
+
+Audio arrives as 16 kHz mono 16-bit little-endian PCM. An energy based VAD splits the
+stream into utterances, and long utterances are cut into segments at short pauses. Every
+closed segment is recognized in the background while the user keeps speaking, so when
+the VAD detects the end of speech only the last segment is left to recognize. Partial
+transcripts re-recognize the open segment only.
+"""
+
+import asyncio
+import io
+import logging
+import wave
+from collections import deque
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from app.core.speech_to_text import SpeechToTextEngine
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FRAME_MS = 30
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000 * SAMPLE_WIDTH
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Wrap raw 16-bit mono PCM into a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class EnergyVAD:
+    """
+    Frame level voice activity detector based on RMS energy.
+
+    Speech starts after ``start_frames`` consecutive loud frames and ends after
+    ``hangover_ms`` of silence. The noise floor is tracked while nobody speaks, so the
+    detector adapts to a constant background hum.
+    """
+
+    def __init__(self, threshold: float = 300.0, start_frames: int = 3, hangover_ms: int = 600):
+        self.threshold = threshold
+        self.start_frames = start_frames
+        self.hangover_frames = hangover_ms // FRAME_MS
+        self.noise_floor = 0.0
+        self.in_speech = False
+        self._loud_run = 0
+        self._silent_run = 0
+
+    @property
+    def silent_frames(self) -> int:
+        """Quiet frames since the last loud one of the current utterance."""
+        return self._silent_run
+
+    def is_loud(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        loud = rms > max(self.threshold, self.noise_floor * 3)
+        if not loud and not self.in_speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return loud
+
+    def update(self, frame: bytes) -> str | None:
+        """
+        Feed one frame.
+
+        Returns:
+            "start" when speech begins, "end" when it ends, None otherwise.
+        """
+        loud = self.is_loud(frame)
+        if not self.in_speech:
+            self._loud_run = self._loud_run + 1 if loud else 0
+            if self._loud_run >= self.start_frames:
+                self.in_speech = True
+                self._silent_run = 0
+                return "start"
+            return None
+
+        self._silent_run = 0 if loud else self._silent_run + 1
+        if self._silent_run >= self.hangover_frames:
+            self.in_speech = False
+            self._loud_run = 0
+            return "end"
+        return None
+
+
+class SpeechStreamSession:
+    """
+    Per-connection state of streaming recognition.
+
+    Final transcripts are produced by background tasks, so the connection keeps reading
+    audio while an utterance is recognized; they are delivered in utterance order.
+
+    Args:
+        engine: Speech to text engine used for partial and final recognition.
+        on_partial: Coroutine called with each partial transcript.
+        on_final: Coroutine called with the transcript of a finished utterance.
+        on_error: Coroutine called when an utterance could not be recognized.
+        partial_interval_ms: How much new speech triggers another partial recognition,
+            None to disable partial transcripts.
+        segment_ms: Speech after which the next pause closes a segment.
+        pause_ms: Silence inside an utterance that may close a segment.
+        preroll_ms: Audio kept from before the VAD fired, so the first syllable is not cut.
+        max_utterance_ms: Utterances longer than this are finalized even without a pause.
+    """
+
+    def __init__(
+        self,
+        engine: SpeechToTextEngine,
+        on_partial: Callable[[str], Awaitable[None]],
+        on_final: Callable[[str], Awaitable[None]],
+        on_error: Callable[[Exception], Awaitable[None]] | None = None,
+        partial_interval_ms: int | None = 1000,
+        segment_ms: int = 5000,
+        pause_ms: int = 240,
+        preroll_ms: int = 300,
+        max_utterance_ms: int = 30000,
+        vad: EnergyVAD | None = None,
+    ):
+        self.engine = engine
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.on_error = on_error
+        self.vad = vad or EnergyVAD()
+        self.partial_interval_frames = partial_interval_ms // FRAME_MS if partial_interval_ms else None
+        self.segment_frames = segment_ms // FRAME_MS
+        self.pause_frames = pause_ms // FRAME_MS
+        self.max_utterance_frames = max_utterance_ms // FRAME_MS
+
+        self._pending = bytearray()
+        self._preroll: deque[bytes] = deque(maxlen=preroll_ms // FRAME_MS)
+        self._segment: list[bytes] = []
+        self._segments: list[asyncio.Task[str]] = []
+        self._utterance_frames = 0
+        self._frames_since_partial = 0
+        self._partial_task: asyncio.Task | None = None
+        self._final_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def feed(self, chunk: bytes) -> None:
+        """Consume a chunk of PCM audio of arbitrary length."""
+        self._pending += chunk
+        complete = len(self._pending) - len(self._pending) % FRAME_BYTES
+        for offset in range(0, complete, FRAME_BYTES):
+            self._process_frame(bytes(self._pending[offset:offset + FRAME_BYTES]))
+        # Only the incomplete tail is kept, so a chunk is copied once, not once per frame
+        del self._pending[:complete]
+
+    async def flush(self) -> None:
+        """Finalize the current utterance, e.g. when the client stops recording."""
+        if self._segment or self._segments:
+            self._finalize()
+
+    async def drain(self) -> None:
+        """Wait until the transcripts of all finalized utterances are delivered."""
+        if self._final_task is not None:
+            await asyncio.wait([self._final_task])
+
+    async def close(self) -> None:
+        self._cancel_partial()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _spawn(self, coro: Awaitable) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _process_frame(self, frame: bytes) -> None:
+        event = self.vad.update(frame)
+        if event == "start":
+            self._segment = [*self._preroll, frame]
+            self._preroll.clear()
+            self._utterance_frames = len(self._segment)
+            self._frames_since_partial = 0
+            return
+        if not self.vad.in_speech and event != "end":
+            self._preroll.append(frame)
+            return
+
+        self._segment.append(frame)
+        self._utterance_frames += 1
+        if event == "end" or self._utterance_frames >= self.max_utterance_frames:
+            self._finalize()
+            return
+        if len(self._segment) >= self.segment_frames and self.vad.silent_frames >= self.pause_frames:
+            self._close_segment()
+            return
+
+        self._frames_since_partial += 1
+        if (
+            self.partial_interval_frames
+            and self._frames_since_partial >= self.partial_interval_frames
+            and self._partial_task is None
+        ):
+            self._frames_since_partial = 0
+            self._partial_task = asyncio.create_task(self._recognize_partial(b"".join(self._segment)))
+
+    async def _recognize(self, pcm: bytes) -> str:
+        return await self.engine.transcribe(pcm16_to_wav(pcm), audio_format="wav")
+
+    def _recognized_prefix(self) -> list[str]:
+        """Texts of the leading segments of the utterance that are already recognized."""
+        texts = []
+        for task in self._segments:
+            if not task.done() or task.cancelled() or task.exception() is not None:
+                break
+            texts.append(task.result())
+        return texts
+
+    async def _recognize_partial(self, pcm: bytes) -> None:
+        try:
+            text = await self._recognize(pcm)
+            if text:
+                await self.on_partial(" ".join([*filter(None, self._recognized_prefix()), text]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Partial recognition failed: {e}")
+        finally:
+            if self._partial_task is asyncio.current_task():
+                self._partial_task = None
+
+    def _cancel_partial(self) -> None:
+        if self._partial_task is not None:
+            self._partial_task.cancel()
+            self._partial_task = None
+
+    def _close_segment(self) -> None:
+        self._cancel_partial()
+        self._frames_since_partial = 0
+        pcm = b"".join(self._segment)
+        self._segment = []
+        self._segments.append(self._spawn(self._recognize(pcm)))
+
+    def _finalize(self) -> None:
+        # A segment closed at a pause may leave nothing but the trailing silence
+        if len(self._segment) > self.vad.silent_frames:
+            self._close_segment()
+        else:
+            self._cancel_partial()
+            self._segment = []
+        segments, self._segments = self._segments, []
+        self._utterance_frames = 0
+        self.vad.in_speech = False
+        self._final_task = self._spawn(self._deliver_final(segments, self._final_task))
+
+    async def _deliver_final(self, segments: list[asyncio.Task[str]], previous: asyncio.Task | None) -> None:
+        results = await asyncio.gather(*segments, return_exceptions=True)
+        # Keep finals in utterance order
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+            text = " ".join(result for result in results if result)
+            if text:
+                await self.on_final(text)
+        except Exception as e:
+            logger.warning(f"Final recognition failed: {e}")
+            if self.on_error is not None:
+                try:
+                    await self.on_error(e)
+                except Exception as report_error:
+                    logger.warning(f"Failed to report a recognition error: {report_error}")
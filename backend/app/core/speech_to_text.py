@@ -1,146 +1,280 @@
 """
 Speech to text conversion functionality.
 Handles the conversion of audio data to text using various services.
+
+Recognition is delegated to a pluggable engine selected by ``settings.STT_ENGINE``:
+- ``hf``: Whisper behind the HuggingFace Inference API
+- ``local``: int8-quantized Whisper (CTranslate2) in a warm pool of worker processes
 """
 
-import logging
 import asyncio
-import tempfile
-from app.core.hands.utils import SLInference
-# import cv2
-from collections import deque
-
 import io
 import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 import httpx
+import numpy as np
 from pydub import AudioSegment
-import os
 
+from app.core.cache import content_digest, get_transcript_cache
 from app.core.configs.config import settings
+from app.core.hands.registry import ModelNotLoadedError, get_gesture_registry
+from app.core.hands.utils import SLInference
+from app.core.hands.video import decode_video
+from app.core.rate_limit import get_upstream_limiter
 
 logger = logging.getLogger(__name__)
 
+HF_WHISPER_API_URL = "https://api-inference.huggingface.co/models/openai/whisper-large-v3-turbo"
+
 
-async def convert_webm_to_mp3(webm_bytes: bytes) -> bytes:
-    """Convert webm audio bytes to mp3 format"""
+def convert_webm_to_mp3(webm_bytes: bytes) -> bytes:
+    """Convert webm audio bytes to mp3 format. Runs ffmpeg, call it off the event loop."""
     try:
-        # Create temporary files for conversion
-        with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as webm_tmp, \
-             tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as mp3_tmp:
-            
-            # Write webm data to temp file
-            webm_tmp.write(webm_bytes)
-            webm_tmp.flush()
-            
-            # Convert webm to mp3 using pydub
-            audio = AudioSegment.from_file(webm_tmp.name, format='webm')
-            audio.export(mp3_tmp.name, format='mp3')
-            
-            # Read the converted mp3 data
-            with open(mp3_tmp.name, 'rb') as f:
-                mp3_bytes = f.read()
-            
-            # Clean up temp files
-            os.unlink(webm_tmp.name)
-            os.unlink(mp3_tmp.name)
-            
-            return mp3_bytes
+        audio = AudioSegment.from_file(io.BytesIO(webm_bytes), format="webm")
+        mp3 = io.BytesIO()
+        audio.export(mp3, format="mp3")
+        return mp3.getvalue()
     except Exception as e:
         logger.error(f"Error converting webm to mp3: {e}")
         raise ValueError("Failed to convert audio format")
 
 
-async def convert_speech_to_text(voice_bytes: io.BytesIO) -> str:
-    # Convert webm to mp3 first
-    mp3_bytes = await convert_webm_to_mp3(voice_bytes.getvalue())
-    return (await __hf_converter(mp3_bytes)).strip()
+class SpeechToTextEngine(ABC):
+    """Common interface of the speech recognition backends."""
+
+    name: str
+    # Model and options the transcripts depend on; cached transcripts are keyed by it
+    model_id: str
+    # Recognition runs on this host, so repeated partial recognition costs no API quota
+    local: bool = False
+
+    async def start(self) -> None:
+        """Acquire resources and warm the engine up before the first request."""
+
+    async def close(self) -> None:
+        """Release resources held by the engine."""
+
+    @abstractmethod
+    async def transcribe(self, audio_bytes: bytes, audio_format: str = "webm") -> str:
+        """
+        Recognize speech in an encoded audio file.
+
+        Args:
+            audio_bytes: Raw bytes of the audio file.
+            audio_format: Container format of the audio (e.g. "webm", "mp3", "wav").
+
+        Returns:
+            The recognized text.
+        """
+
+
+class HFInferenceEngine(SpeechToTextEngine):
+    """Whisper served by the HuggingFace Inference API."""
 
+    name = "hf"
+    native_formats = {"mp3", "wav", "flac"}
 
-async def __hf_converter(voice_bytes: bytes) -> str:
-    API_URL = "https://api-inference.huggingface.co/models/openai/whisper-large-v3-turbo"
-    headers = {"Authorization": f"Bearer {settings.HF_TOKEN.get_secret_value()}"}
-    async with httpx.AsyncClient() as client:
-        response = await client.post(API_URL, headers=headers, content=voice_bytes)
+    def __init__(self, api_url: str = HF_WHISPER_API_URL):
+        self._api_url = api_url
+        self.model_id = f"hf:{api_url.rsplit('/models/', 1)[-1]}"
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def transcribe(self, audio_bytes: bytes, audio_format: str = "webm") -> str:
+        if audio_format not in self.native_formats:
+            audio_bytes = await asyncio.to_thread(convert_webm_to_mp3, audio_bytes)
+        await self.start()
+        headers = {"Authorization": f"Bearer {settings.HF_TOKEN.get_secret_value()}"}
+        limiter = get_upstream_limiter("hf")
+        async with limiter.acquire():
+            response = await self._client.post(self._api_url, headers=headers, content=audio_bytes)
+        if response.status_code == 429:
+            raise limiter.throttled(response.headers.get("Retry-After"))
+        if response.status_code == 503:
+            # Answered while the model is being loaded, with the expected load time
+            raise limiter.throttled(hf_error_payload(response).get("estimated_time"))
+        if not response.is_success:
+            raise RuntimeError(f"HF Inference error {response.status_code}: {hf_error_payload(response)}")
         json_resp = response.json()
         logger.debug(f"Response from HF: {json_resp}")
-        return json_resp["text"]
+        if not isinstance(json_resp, dict) or "text" not in json_resp:
+            raise RuntimeError(f"Unexpected HF Inference response: {json_resp}")
+        return json_resp["text"].strip()
+
+
+def hf_error_payload(response: httpx.Response) -> dict:
+    """Error body of an HF Inference answer, empty if it is not a JSON object."""
+    try:
+        payload = response.json()
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+# Per-process state of the local Whisper workers
+_worker_model = None
+_worker_language: str | None = None
+
+
+def _init_whisper_worker(model_name: str, compute_type: str, cpu_threads: int, language: str | None) -> None:
+    """Load the CTranslate2 Whisper model once per worker process."""
+    global _worker_model, _worker_language
+    from faster_whisper import WhisperModel
+
+    _worker_model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+    _worker_language = language
+
+
+def _whisper_transcribe(audio_bytes: bytes) -> str:
+    """Run Whisper on encoded audio inside a worker process."""
+    segments, _info = _worker_model.transcribe(
+        io.BytesIO(audio_bytes), language=_worker_language, beam_size=1, vad_filter=True
+    )
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+def _whisper_warmup() -> None:
+    """Transcribe a second of silence so the first real request hits a hot model."""
+    _worker_model.transcribe(np.zeros(16000, dtype=np.float32), language=_worker_language, beam_size=1)
+
+
+class LocalWhisperEngine(SpeechToTextEngine):
+    """
+    int8-quantized Whisper (faster-whisper / CTranslate2) running on the CPU.
+
+    The model is loaded once per worker process, so requests never pay for model loading
+    and recognition does not compete with the event loop for the GIL.
+    """
+
+    name = "local"
+    local = True
+
+    def __init__(
+        self,
+        model_name: str,
+        compute_type: str = "int8",
+        workers: int = 2,
+        cpu_threads: int = 2,
+        language: str | None = "ru",
+    ):
+        self._workers = workers
+        self._initargs = (model_name, compute_type, cpu_threads, language)
+        self.model_id = f"local:{model_name}:{compute_type}:{language}"
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def start(self) -> None:
+        if self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._workers, initializer=_init_whisper_worker, initargs=self._initargs
+        )
+        # Concurrent warm-up tasks force every worker to spawn and load the model now
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _whisper_warmup) for _ in range(self._workers)))
+        logger.info(f"Local Whisper pool is warm, workers={self._workers}")
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def transcribe(self, audio_bytes: bytes, audio_format: str = "webm") -> str:
+        # PyAV inside faster-whisper decodes webm/mp3/wav directly, no transcoding needed
+        await self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _whisper_transcribe, audio_bytes)
+
+
+def create_stt_engine(name: str) -> SpeechToTextEngine:
+    """
+    Build a speech to text engine from the settings.
+
+    Args:
+        name: Engine name, "hf" or "local".
+    """
+    if name == "local":
+        return LocalWhisperEngine(
+            model_name=settings.STT_LOCAL_MODEL,
+            compute_type=settings.STT_LOCAL_COMPUTE_TYPE,
+            workers=settings.STT_WORKERS,
+            cpu_threads=settings.STT_CPU_THREADS,
+            language=settings.STT_LANGUAGE,
+        )
+    return HFInferenceEngine()
+
+
+@lru_cache()
+def get_stt_engine() -> SpeechToTextEngine:
+    """Get singleton instance of the configured speech to text engine"""
+    return create_stt_engine(settings.STT_ENGINE)
+
+
+async def convert_speech_to_text(voice_bytes: io.BytesIO) -> str:
+    return await speech_to_text(voice_bytes.getvalue())
 
 
 async def speech_to_text(voice_bytes: bytes) -> str:
-    # Convert webm to mp3 first
-    mp3_bytes = await convert_webm_to_mp3(voice_bytes)
-    return (await __hf_converter(mp3_bytes)).strip()
+    engine = get_stt_engine()
+    return await get_transcript_cache().get_or_compute(
+        f"speech:{content_digest(voice_bytes, engine.model_id)}",
+        lambda: engine.transcribe(voice_bytes, audio_format="webm"),
+    )
+
+
+DEFAULT_VIDEO_FPS = 30
 
 
 async def video_to_text(video_bytes: bytes) -> str:
     """
     Convert video to text using an SLInference model.
-    This function saves the video bytes to a temporary file, extracts frames via OpenCV,
-    feeds them to an inference thread, and aggregates the recognized gestures.
+    This function decodes frames at the model's frame rate straight from memory, up to
+    GESTURE_VIDEO_MAX_SECONDS of the clip, and runs offline strided gesture recognition
+    over the whole sequence as fast as the CPU allows.
 
     Args:
         video_bytes: Raw bytes of the video file (e.g., MP4 format).
 
     Returns:
-        The recognized gesture as text (or an empty string if none).
+        The recognized gesture sequence as a phrase (or an empty string if none).
     
     Raises:
+        ModelNotLoadedError: If the gesture model is not loaded.
         ValueError: If the video data cannot be processed.
     """
-    try:
-        # Save video bytes to a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp_file:
-            tmp_file.write(video_bytes)
-            tmp_file.flush()
-            tmp_path = tmp_file.name
-        logger.info(f"Temporary video file created at {tmp_path}")
-        
-        # Initialize the SLInference thread; adjust the config path as needed
-        inference_thread = SLInference("configs/config.json")
-        inference_thread.start()
-        
-        # Open the temporary video file using OpenCV
-        cap = cv2.VideoCapture(tmp_path)
-        if not cap.isOpened():
-            logger.error("Failed to open video stream from temporary file")
-            inference_thread.stop()
+
+    async def recognize() -> str:
+        target_fps = model.config.get("fps", DEFAULT_VIDEO_FPS)
+        max_frames = int(settings.GESTURE_VIDEO_MAX_SECONDS * target_fps)
+        frames = await asyncio.to_thread(decode_video, video_bytes, target_fps, max_frames)
+        if not frames:
             return ""
-        
-        gestures_deque = deque(maxlen=5)
-        frame_count = 0
-        
-        # Process a fixed number of frames (e.g., 60 frames ~2 seconds at 30 FPS)
-        while cap.isOpened() and frame_count < 60:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Resize the frame to 224x224 as expected by the model
-            frame_resized = cv2.resize(frame, (224, 224))
-            # Convert frame from BGR to RGB
-            frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-            
-            # Feed the frame into the inference thread
-            inference_thread.input_queue.append(frame_rgb)
-            
-            # Wait to simulate real-time processing (~33ms per frame)
-            await asyncio.sleep(1 / 30)
-            
-            # Get the current prediction from the inference thread (assumes inference_thread.pred is updated)
-            gesture = inference_thread.pred
-            if gesture and gesture not in ['no', '']:
-                if not gestures_deque or (gestures_deque and gesture != gestures_deque[-1]):
-                    gestures_deque.append(gesture)
-            frame_count += 1
-        
-        cap.release()
-        inference_thread.stop()  # Ensure the inference thread is stopped
-        
-        recognized_text = gestures_deque[-1] if gestures_deque else ""
-        logger.info(f"Recognized gesture: {recognized_text}")
+
+        # Per-request recognition state on top of the shared, batched model
+        inference = SLInference(model)
+        gestures = await asyncio.to_thread(inference.process_offline, frames)
+
+        recognized_text = " ".join(gestures)
+        logger.info(f"Recognized gestures: {recognized_text}")
         return recognized_text
+
+    try:
+        registry = get_gesture_registry()
+        model = registry.batcher
+        digest = content_digest(video_bytes, registry.model_id)
+        return await get_transcript_cache().get_or_compute(f"video:{digest}", recognize)
+    except ModelNotLoadedError:
+        raise
     except Exception as e:
         logger.exception(f"Error in video_to_text: {e}")
         raise ValueError("Error processing video data")
-
@@ -0,0 +1,476 @@
+"""
+Text to speech conversion functionality.
+
+Synthesis runs off the event loop, sentence by sentence, so the first audio is ready
+after the first sentence instead of the whole reply. Every sentence is cached by its
+content address (engine, language, voice, text) on local disk and in Redis.
+
+Synthesis is delegated to a pluggable engine selected by ``settings.TTS_ENGINE``:
+- ``gtts``: Google Text-to-Speech over the network, MP3
+- ``piper``: Piper ONNX voice in a warm pool of worker processes, offline, WAV
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator
+
+from gtts import gTTS
+from gtts.lang import tts_langs
+
+from app.core.configs.config import settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+tts_cache_requests = Counter("tts_cache_requests_total", "Synthesized sentence lookups by result")
+tts_synthesis_latency = Histogram("tts_synthesis_seconds", "Synthesis of one sentence that missed the cache")
+
+SENTENCE_END = re.compile(r"(?<=[.!?…;])\s+|\n+")
+MAX_SENTENCE_CHARS = 200
+
+# Google domains gTTS can speak through, each with its own accent
+GTTS_VOICES = frozenset({
+    "com", "ru", "com.au", "co.uk", "us", "ca", "co.in", "ie", "co.za", "com.ng", "fr", "com.br", "pt", "com.mx", "es",
+})
+
+
+def split_sentences(text: str, max_chars: int = MAX_SENTENCE_CHARS) -> list[str]:
+    """
+    Split text into sentences for incremental synthesis.
+
+    Sentences longer than max_chars are broken at the last comma or space before the
+    limit, so no single synthesis call gets an unbounded input.
+
+    Args:
+        text: Text to split.
+        max_chars: Longest piece returned.
+
+    Returns:
+        Non-empty sentences in order.
+    """
+    sentences = []
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(",", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            cut = cut + 1 if cut > 0 else max_chars
+            sentences.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def audio_digest(engine: str, lang: str, voice: str, text: str) -> str:
+    """Content address of a synthesized sentence."""
+    return hashlib.sha256(f"{engine}\0{lang}\0{voice}\0{text}".encode()).hexdigest()
+
+
+def strip_id3(audio: bytes) -> bytes:
+    """MP3 audio without its leading ID3v2 tag."""
+    if len(audio) < 10 or audio[:3] != b"ID3":
+        return audio
+    # Tag size is a 28-bit synchsafe integer, plus 10 bytes of header and 10 of an optional footer
+    size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+    footer = 10 if audio[5] & 0x10 else 0
+    return audio[10 + size + footer:]
+
+
+def read_wav(audio: bytes) -> tuple[tuple, bytes]:
+    """Format parameters (channels, sample width, rate) and PCM frames of a WAV file."""
+    with wave.open(io.BytesIO(audio), "rb") as wav:
+        return (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()), wav.readframes(wav.getnframes())
+
+
+def wav_header(params: tuple, data_size: int) -> bytes:
+    """RIFF header of a PCM WAV file with data_size bytes of frames."""
+    channels, sample_width, rate = params
+    return (
+        b"RIFF" + (36 + data_size).to_bytes(4, "little") + b"WAVEfmt "
+        + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + channels.to_bytes(2, "little")
+        + rate.to_bytes(4, "little") + (rate * channels * sample_width).to_bytes(4, "little")
+        + (channels * sample_width).to_bytes(2, "little") + (sample_width * 8).to_bytes(2, "little")
+        + b"data" + data_size.to_bytes(4, "little")
+    )
+
+
+def concat_audio(chunks: list[bytes], media_type: str) -> bytes:
+    """
+    Join separately synthesized audio into one playable file.
+
+    MP3 frames are self-contained, so the chunks are joined as they are once the ID3
+    tags that would otherwise land in the middle of the stream are dropped. WAV chunks
+    of one voice share a format, so their frames go under a single header.
+    """
+    if media_type == "audio/mpeg":
+        return b"".join(strip_id3(chunk) for chunk in chunks)
+    if media_type == "audio/wav":
+        decoded = [read_wav(chunk) for chunk in chunks]
+        if len({params for params, _frames in decoded}) > 1:
+            raise ValueError("Cannot concatenate WAV audio of different formats")
+        frames = b"".join(frames for _params, frames in decoded)
+        return wav_header(decoded[0][0], len(frames)) + frames if decoded else b""
+    raise ValueError(f"Cannot concatenate {media_type} audio")
+
+
+def stream_chunk(audio: bytes, media_type: str, first: bool) -> bytes:
+    """
+    One sentence of a streamed reply.
+
+    A WAV stream starts with a header of unknown length and continues with bare frames,
+    which players handle the same way as live recordings.
+    """
+    if media_type == "audio/wav":
+        params, frames = read_wav(audio)
+        return wav_header(params, 0xFFFFFFFF - 36) + frames if first else frames
+    return audio if first else strip_id3(audio)
+
+
+def gtts_synthesize(text: str, lang: str, voice: str) -> bytes:
+    """Synthesize MP3 speech with Google Text-to-Speech; voice is the Google domain (accent)."""
+    audio = io.BytesIO()
+    gTTS(text=text, lang=lang, tld=voice or "com", slow=False).write_to_fp(audio)
+    return audio.getvalue()
+
+
+class TextToSpeechEngine(ABC):
+    """Common interface of the speech synthesis backends."""
+
+    name: str
+    media_type: str
+    extension: str
+
+    async def start(self) -> None:
+        """Acquire resources and warm the engine up before the first request."""
+
+    async def close(self) -> None:
+        """Release resources held by the engine."""
+
+    def validate(self, lang: str, voice: str) -> None:
+        """
+        Check that the engine can speak the language with the voice.
+
+        Raises:
+            ValueError: If it cannot.
+        """
+
+    @abstractmethod
+    async def synthesize(self, text: str, lang: str, voice: str) -> bytes:
+        """
+        Synthesize one sentence.
+
+        Args:
+            text: Sentence to speak.
+            lang: Language code.
+            voice: Engine-specific voice, the engine default if empty.
+
+        Returns:
+            Encoded audio of the engine's media type.
+        """
+
+
+class GTTSEngine(TextToSpeechEngine):
+    """Google Text-to-Speech, called from worker threads."""
+
+    name = "gtts"
+    media_type = "audio/mpeg"
+    extension = "mp3"
+
+    def validate(self, lang: str, voice: str) -> None:
+        if lang not in gtts_languages():
+            raise ValueError(f"Unsupported language: {lang}")
+        if voice and voice not in GTTS_VOICES:
+            raise ValueError(f"Unsupported voice: {voice}, expected one of {', '.join(sorted(GTTS_VOICES))}")
+
+    async def synthesize(self, text: str, lang: str, voice: str) -> bytes:
+        return await asyncio.to_thread(gtts_synthesize, text, lang, voice)
+
+
+@lru_cache()
+def gtts_languages() -> frozenset[str]:
+    """Language codes gTTS can speak."""
+    return frozenset(tts_langs())
+
+
+# Per-process state of the Piper workers
+_worker_voice = None
+
+
+def _init_piper_worker(model_path: str) -> None:
+    """Load the Piper voice once per worker process."""
+    global _worker_voice
+    from piper import PiperVoice
+
+    _worker_voice = PiperVoice.load(model_path)
+
+
+def _piper_synthesize(text: str) -> bytes:
+    """Synthesize WAV speech inside a worker process."""
+    audio = io.BytesIO()
+    # piper-tts 1.3 renamed synthesize(text, wav_file) to synthesize_wav
+    synthesize_wav = getattr(_worker_voice, "synthesize_wav", None) or _worker_voice.synthesize
+    with wave.open(audio, "wb") as wav:
+        synthesize_wav(text, wav)
+    return audio.getvalue()
+
+
+def _piper_warmup() -> None:
+    """Synthesize a word so the first real request hits a hot model."""
+    _piper_synthesize("Привет")
+
+
+class PiperEngine(TextToSpeechEngine):
+    """
+    Piper ONNX voice running on the CPU, without network access.
+
+    The voice is loaded once per worker process, so requests never pay for model loading
+    and synthesis does not compete with the event loop for the GIL. A Piper voice speaks
+    one language, so lang and voice only take part in the cache key.
+    """
+
+    name = "piper"
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, model_path: str, workers: int = 2):
+        self._workers = workers
+        self._model_path = model_path
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def start(self) -> None:
+        if self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._workers, initializer=_init_piper_worker, initargs=(self._model_path,)
+        )
+        # Concurrent warm-up tasks force every worker to spawn and load the voice now
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _piper_warmup) for _ in range(self._workers)))
+        logger.info(f"Piper pool is warm, workers={self._workers}")
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def synthesize(self, text: str, lang: str, voice: str) -> bytes:
+        await self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _piper_synthesize, text)
+
+
+class TextToSpeechService:
+    """
+    Cached, non-blocking speech synthesis.
+
+    Lookups go to the disk cache first and to Redis second; misses are synthesized by
+    the engine, at most `workers` at a time, and stored in both tiers. Disk hits refresh
+    the file time, so pruning drops the files unused for the TTL first and then the least
+    recently used ones until the cache fits its size.
+
+    Args:
+        engine: Speech synthesis backend.
+        redis_client: RedisClient holding the shared audio cache.
+        cache_dir: Directory of the local audio cache.
+        ttl: Seconds a sentence stays in Redis and unused on disk.
+        workers: Sentences synthesized concurrently.
+        max_disk_bytes: Size of the disk cache, 0 to keep audio in Redis only.
+    """
+
+    def __init__(
+        self,
+        engine: TextToSpeechEngine,
+        redis_client,
+        cache_dir: str,
+        ttl: int,
+        workers: int = 4,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.engine = engine
+        self._redis = redis_client
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self._max_disk_bytes = max_disk_bytes
+        self._semaphore = asyncio.Semaphore(workers)
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        if max_disk_bytes:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._prune_disk()
+
+    @property
+    def media_type(self) -> str:
+        return self.engine.media_type
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self._cache_dir, f"{digest}.{self.engine.extension}")
+
+    def validate(self, text: str, lang: str, voice: str) -> None:
+        """
+        Check a request before synthesizing it.
+
+        Raises:
+            ValueError: If the text is blank or the engine cannot speak the language with the voice.
+        """
+        if not text.strip():
+            raise ValueError("Text is empty")
+        self.engine.validate(lang, voice)
+
+    def _read_disk(self, digest: str) -> bytes | None:
+        if not self._max_disk_bytes:
+            return None
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return audio
+
+    def _write_disk(self, digest: str, audio: bytes) -> None:
+        if not self._max_disk_bytes:
+            return
+        # Write and rename, so concurrent readers never see a partial file
+        path = self._path(digest)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._disk_lock:
+            self._disk_bytes += len(audio)
+            if self._disk_bytes > self._max_disk_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """
+        Drop cached files unused for the TTL, then the least recently used ones until the
+        cache takes at most 90% of its size, so pruning does not run on every write.
+        """
+        entries = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        total = sum(size for _mtime, size, _path in entries)
+        expired = time.time() - self._ttl
+        target = self._max_disk_bytes * 0.9
+        removed = 0
+        for mtime, size, path in entries:
+            if mtime >= expired and total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._disk_bytes = total
+        if removed:
+            logger.info(f"Pruned {removed} files from the TTS disk cache, {total} bytes left")
+
+    async def synthesize_sentence(self, sentence: str, lang: str, voice: str) -> bytes:
+        """
+        Audio of one sentence, from the cache or freshly synthesized.
+        """
+        digest = audio_digest(self.engine.name, lang, voice, sentence)
+        audio = await asyncio.to_thread(self._read_disk, digest)
+        if audio is not None:
+            tts_cache_requests.inc(result="disk_hit")
+            return audio
+
+        try:
+            audio = await self._redis.get_tts_audio(digest)
+        except Exception as e:
+            logger.warning(f"TTS cache lookup failed: {e}")
+        if audio is not None:
+            tts_cache_requests.inc(result="redis_hit")
+            await asyncio.to_thread(self._write_disk, digest, audio)
+            return audio
+
+        tts_cache_requests.inc(result="miss")
+        async with self._semaphore:
+            started = time.perf_counter()
+            audio = await self.engine.synthesize(sentence, lang, voice)
+            tts_synthesis_latency.observe(time.perf_counter() - started)
+
+        await asyncio.to_thread(self._write_disk, digest, audio)
+        try:
+            await self._redis.set_tts_audio(digest, audio, self._ttl)
+        except Exception as e:
+            logger.warning(f"TTS cache store failed: {e}")
+        return audio
+
+    async def sentences(self, text: str, lang: str = "ru", voice: str = "") -> AsyncIterator[bytes]:
+        """
+        Audio of the text as one file per sentence, in order.
+
+        All sentences start synthesizing at once (bounded by the worker count), and each
+        one is yielded as soon as it and the ones before it are ready.
+        """
+        tasks = [
+            asyncio.create_task(self.synthesize_sentence(sentence, lang, voice))
+            for sentence in split_sentences(text)
+        ]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            # The client went away or a sentence failed: drop the rest
+            for task in tasks:
+                task.cancel()
+
+    async def stream(self, text: str, lang: str = "ru", voice: str = "") -> AsyncIterator[bytes]:
+        """
+        Audio of the text as chunks that play back as one stream.
+        """
+        first = True
+        async for audio in self.sentences(text, lang, voice):
+            yield stream_chunk(audio, self.media_type, first)
+            first = False
+
+    async def synthesize(self, text: str, lang: str = "ru", voice: str = "") -> bytes:
+        """
+        Audio of the whole text.
+        """
+        return concat_audio([audio async for audio in self.sentences(text, lang, voice)], self.media_type)
+
+
+@lru_cache()
+def get_tts_engine() -> TextToSpeechEngine:
+    """Get singleton instance of the configured text to speech engine"""
+    if settings.TTS_ENGINE == "piper":
+        return PiperEngine(settings.TTS_PIPER_MODEL, workers=settings.TTS_LOCAL_WORKERS)
+    return GTTSEngine()
+
+
+@lru_cache()
+def get_tts_service() -> TextToSpeechService:
+    """Get singleton instance of TextToSpeechService"""
+    # Imported here: app.core.redis pulls in app.api, whose routes import this module
+    from app.core.redis import get_redis_client
+
+    return TextToSpeechService(
+        get_tts_engine(),
+        get_redis_client(),
+        cache_dir=settings.TTS_CACHE_DIR,
+        ttl=settings.TTS_CACHE_TTL,
+        workers=settings.TTS_WORKERS,
+        max_disk_bytes=settings.TTS_CACHE_MAX_BYTES,
+    )
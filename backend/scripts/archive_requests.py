@@ -0,0 +1,41 @@
+"""
+Retention job of the requests table.
+
+Usage (from the backend directory, e.g. daily from cron):
+    python -m scripts.archive_requests --retention-months 12 --archive-dir archive/requests
+
+Creates the upcoming monthly partitions, then detaches the partitions that ended
+before the retention period, exports each to <archive-dir>/<partition>.ndjson.gz
+and drops it.
+"""
+
+import argparse
+import asyncio
+
+from app.core.configs.config import settings
+from app.core.db import close_db, init_db
+from app.core.db.partitions import archive_partitions, ensure_partitions
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-months", type=int, default=settings.REQUESTS_RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", default=settings.REQUESTS_ARCHIVE_DIR)
+    parser.add_argument("--months-ahead", type=int, default=settings.REQUESTS_PARTITIONS_AHEAD)
+    args = parser.parse_args()
+
+    await init_db()
+    try:
+        created = await ensure_partitions(args.months_ahead)
+        print(f"Partitions ensured: {', '.join(created) or 'none'}")
+        archived = await archive_partitions(args.retention_months, args.archive_dir)
+        for name, rows in archived:
+            print(f"Archived {name}: {rows} rows")
+        if not archived:
+            print("Nothing to archive")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Memory allocated per evaluated gesture window, before and after the frame ring buffer.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_gesture_allocations --window 32 --windows 50
+
+"legacy" reproduces the original path: np.array over a deque of frames, astype, division,
+einops.rearrange, softmax with temporaries and a full argsort. "ring" writes frames into a
+FrameRingBuffer in place, normalizes into its preallocated clip and uses argpartition.
+Model execution is excluded, so only Python-side preprocessing and postprocessing count.
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+from einops import rearrange
+
+from app.core.hands.buffer import FRAME_SIZE, FrameRingBuffer
+
+NUM_CLASSES = 1000
+TOPK = 3
+
+
+def legacy_window(frames: deque, logits: np.ndarray) -> np.ndarray:
+    clip = np.array(frames).astype(np.float32) / 255.0
+    clip = rearrange(clip, "t h w c -> 1 c t h w")
+    exp_x = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+    prediction = np.squeeze(exp_x / np.sum(exp_x, axis=1, keepdims=True))
+    return prediction.argsort()[-TOPK:][::-1]
+
+
+def ring_window(buffer: FrameRingBuffer, logits: np.ndarray) -> np.ndarray:
+    buffer.to_clip()
+    logits -= np.max(logits, axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= np.sum(logits, axis=1, keepdims=True)
+    prediction = logits[0]
+    topk = np.argpartition(prediction, -TOPK)[-TOPK:]
+    return topk[np.argsort(prediction[topk])[::-1]]
+
+
+def measure(name: str, push, evaluate, frames: list[np.ndarray], windows: int, window_size: int) -> None:
+    rng = np.random.default_rng(0)
+    for frame in frames[:window_size]:
+        push(frame)
+    evaluate(rng.standard_normal((1, NUM_CLASSES), dtype=np.float32))  # warm-up
+
+    tracemalloc.start()
+    allocated = 0
+    started = time.perf_counter()
+    for index in range(windows):
+        push(frames[index % len(frames)])
+        logits = rng.standard_normal((1, NUM_CLASSES), dtype=np.float32)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        evaluate(logits)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    print(f"{name:<8}{allocated / windows / 2**20:>16.2f}{elapsed / windows * 1000:>14.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--window", type=int, default=32, help="Frames per window")
+    parser.add_argument("--windows", type=int, default=50, help="Windows to evaluate")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8) for _ in range(args.window * 2)]
+
+    print(f"{'path':<8}{'peak MiB/window':>16}{'ms/window':>14}")
+    queue = deque(maxlen=args.window)
+    measure("legacy", queue.append, lambda logits: legacy_window(queue, logits), frames, args.windows, args.window)
+    buffer = FrameRingBuffer(args.window)
+    measure("ring", buffer.append, lambda logits: ring_window(buffer, logits), frames, args.windows, args.window)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Throughput versus latency of batched gesture inference on CPU.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_gesture_batching configs/config.json --clips 128
+
+For every batch size, as many concurrent clients as the batch size submit clips through
+a BatchingPredictor; the script reports clips per second and per-clip latency.
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.hands.batcher import BatchingPredictor
+from app.core.hands.registry import FRAME_SIZE, GestureModelRegistry
+from scripts.stats import percentile
+
+
+def run(batcher: BatchingPredictor, clients: int, clips: int, window: np.ndarray) -> tuple[float, list[float]]:
+    def client(count: int) -> list[float]:
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            batcher.predict(window)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    per_client = max(1, clips // clients)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, [per_client] * clients))
+    elapsed = time.perf_counter() - started
+    latencies = [latency for result in results for latency in result]
+    return len(latencies) / elapsed, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("config", help="Path to the gesture model config.json")
+    parser.add_argument("--clips", type=int, default=128, help="Clips per batch size")
+    parser.add_argument("--wait-ms", type=float, default=5.0, help="Batch collection window")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    predictor = GestureModelRegistry().load(args.config)
+    window = np.random.randint(0, 255, (predictor.config["window_size"], FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8)
+
+    print(f"{'batch':>6}{'clips/s':>12}{'mean, ms':>12}{'p50, ms':>12}{'p95, ms':>12}")
+    for batch_size in args.batch_sizes:
+        batcher = BatchingPredictor(predictor, max_batch_size=batch_size, max_wait_ms=args.wait_ms)
+        batcher.start()
+        run(batcher, batch_size, batch_size, window)  # warm-up
+        throughput, latencies = run(batcher, batch_size, args.clips, window)
+        batcher.stop()
+        print(
+            f"{batch_size:>6}{throughput:>12.1f}{statistics.mean(latencies) * 1000:>12.1f}"
+            f"{percentile(latencies, 50) * 1000:>12.1f}{percentile(latencies, 95) * 1000:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Latency, throughput and top-1 agreement of ONNX Runtime session profiles on CPU.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_gesture_sessions configs/config.json --clips 32 --batch 8 [--video clip.mp4]
+
+Every profile is run with the FP32 model and, when it exists, the INT8 variant written by
+scripts.quantize_gesture_model. Latency is measured on single clips, throughput on
+batches of --batch clips. Top-1 agreement compares predicted classes with the FP32 model
+under the default profile; windows come from --video when given, random frames otherwise.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from app.core.hands.buffer import FRAME_SIZE, FrameRingBuffer
+from app.core.hands.model import Predictor
+from app.core.hands.registry import GestureModelRegistry
+from app.core.hands.session import SESSION_PROFILES, quantized_model_path
+from app.core.hands.video import decode_video
+from scripts.stats import percentile
+
+
+def load_windows(config: dict, clips: int, video: str | None) -> np.ndarray:
+    window_size = config["window_size"]
+    if video is None:
+        rng = np.random.default_rng(0)
+        frames = rng.integers(0, 255, (clips + window_size, FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8)
+    else:
+        with open(video, "rb") as f:
+            frames = decode_video(f.read(), config.get("fps", 30), clips + window_size)
+
+    buffer = FrameRingBuffer(window_size)
+    windows = []
+    for frame in frames:
+        buffer.append(frame)
+        if len(buffer) == window_size:
+            windows.append(buffer.to_clip()[0].copy())
+    return np.stack(windows[:clips])
+
+
+def measure(predictor: Predictor, windows: np.ndarray, batch: int) -> tuple[list[float], float, np.ndarray]:
+    predictor.predict_proba_batch(windows[:1])  # warm-up
+    latencies = []
+    top1 = []
+    for window in windows:
+        started = time.perf_counter()
+        probabilities = predictor.predict_proba_batch(window[None])
+        latencies.append(time.perf_counter() - started)
+        top1.append(int(np.argmax(probabilities[0])))
+
+    started = time.perf_counter()
+    for index in range(0, len(windows), batch):
+        predictor.predict_proba_batch(windows[index : index + batch])
+    throughput = len(windows) / (time.perf_counter() - started)
+    return latencies, throughput, np.array(top1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("config", help="Path to the gesture model config.json")
+    parser.add_argument("--clips", type=int, default=32, help="Windows per profile")
+    parser.add_argument("--batch", type=int, default=8, help="Clips per run in the throughput pass")
+    parser.add_argument("--video", help="Video to take windows from instead of random frames")
+    parser.add_argument("--profiles", nargs="+", default=list(SESSION_PROFILES))
+    args = parser.parse_args()
+
+    config = GestureModelRegistry.read_config(args.config)
+    windows = load_windows(config, args.clips, args.video)
+    variants = [False]
+    if os.path.exists(config.get("path_to_quantized_model") or quantized_model_path(config["path_to_model"])):
+        variants.append(True)
+
+    reference = None
+    print(f"{'profile':<12}{'model':<7}{'p50, ms':>10}{'p95, ms':>10}{'clips/s':>10}{'top-1 agree':>13}")
+    for quantized in variants:
+        for profile in args.profiles:
+            predictor = Predictor({**config, "session": {"profile": profile}, "quantized": quantized})
+            latencies, throughput, top1 = measure(predictor, windows, args.batch)
+            if reference is None:
+                reference = top1
+            latencies_ms = [latency * 1000 for latency in latencies]
+            p95 = percentile(latencies_ms, 95)
+            agreement = float(np.mean(top1 == reference)) * 100
+            print(
+                f"{profile:<12}{'int8' if quantized else 'fp32':<7}{statistics.median(latencies_ms):>10.2f}"
+                f"{p95:>10.2f}{throughput:>10.1f}{agreement:>12.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
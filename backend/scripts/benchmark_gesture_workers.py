@@ -0,0 +1,82 @@
+"""
+Event loop lag under gesture load, with the model in the server process and in worker processes.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_gesture_workers configs/config.json --streams 4 --workers 2 --seconds 5
+
+Several simulated camera streams push random frames through SLInference while a probe
+coroutine sleeps 10 ms in a loop; the extra time each sleep takes is the delay any other
+request on the same event loop (text, speech) would see. workers=0 runs the in-process
+batcher, other values the shared memory worker pool.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from app.core.hands.buffer import FRAME_SIZE
+from app.core.hands.registry import GestureModelRegistry
+from app.core.hands.utils import SLInference
+
+PROBE_INTERVAL = 0.01
+
+
+async def stream(model, frames: list[np.ndarray], deadline: float) -> int:
+    inference = SLInference(model)
+    evaluated = 0
+    index = 0
+    while time.monotonic() < deadline:
+        if inference.append(frames[index % len(frames)]):
+            await inference.aevaluate()
+            evaluated += 1
+        index += 1
+        await asyncio.sleep(0)
+    return evaluated
+
+
+async def probe(deadline: float) -> list[float]:
+    lags = []
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+    return lags
+
+
+async def run(model, streams: int, seconds: float) -> tuple[list[float], int]:
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8) for _ in range(64)]
+    deadline = time.monotonic() + seconds
+    lags, *evaluated = await asyncio.gather(probe(deadline), *(stream(model, frames, deadline) for _ in range(streams)))
+    return lags, sum(evaluated)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("config", help="Path to the gesture model config.json")
+    parser.add_argument("--streams", type=int, default=4, help="Concurrent camera streams")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2], help="Worker process counts to compare")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of every run")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'windows/s':>12}{'lag p50, ms':>14}{'lag p99, ms':>14}{'lag max, ms':>14}")
+    for workers in args.workers:
+        registry = GestureModelRegistry()
+        registry.load(args.config, workers=workers)
+        try:
+            lags, evaluated = asyncio.run(run(registry.batcher, args.streams, args.seconds))
+        finally:
+            registry.close()
+        lags.sort()
+        p99 = lags[min(len(lags) - 1, round(0.99 * (len(lags) - 1)))]
+        print(
+            f"{workers:>8}{evaluated / args.seconds:>12.1f}{statistics.median(lags):>14.2f}"
+            f"{p99:>14.2f}{lags[-1]:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Page latency of the request history at a large table size.
+
+Usage (from the backend directory, against a scratch database):
+    python -m scripts.benchmark_history --seed 10000000 --pages 50
+
+Seeds the requests table with generated rows in Postgres itself, then walks the
+history with the keyset cursor, unfiltered and filtered, and prints per-page latency
+and the plan of one deep page, which should be an index scan without a sort.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from tortoise import Tortoise
+
+from app.core.db import close_db, init_db, migrate_db
+from app.core.db.partitions import ensure_partitions
+from app.core.history import decode_cursor, fetch_history
+from scripts.stats import percentile
+
+SEED_SQL = """
+INSERT INTO requests (id, request_type, input_text, status, response, created_at, updated_at)
+SELECT
+    md5(random()::text || n)::uuid,
+    (ARRAY['speech', 'text', 'video', 'gesture'])[1 + n % 4],
+    'generated',
+    (ARRAY['Completed', 'Processing'])[1 + (n % 10 = 0)::int],
+    NULL,
+    now() - make_interval(secs => n * 0.5),
+    now() - make_interval(secs => n * 0.5)
+FROM generate_series(1, $1) AS n
+"""
+
+PAGE_SQL = """
+EXPLAIN ANALYZE SELECT * FROM requests
+WHERE created_at <= $1 AND (created_at < $1 OR id < $2)
+ORDER BY created_at DESC, id DESC LIMIT 51
+"""
+
+
+async def walk(pages: int, **filters) -> tuple[list[float], str | None]:
+    latencies, cursor = [], None
+    for _ in range(pages):
+        started = time.perf_counter()
+        _rows, cursor = await fetch_history(limit=50, cursor=cursor, **filters)
+        latencies.append(time.perf_counter() - started)
+        if cursor is None:
+            break
+    return latencies, cursor
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="Rows to insert before measuring")
+    parser.add_argument("--pages", type=int, default=50, help="Pages to walk per scenario")
+    args = parser.parse_args()
+
+    await init_db()
+    await migrate_db()
+    connection = Tortoise.get_connection("default")
+    try:
+        if args.seed:
+            # Rows are spread back in time, 2 per second, and need their monthly partitions
+            await ensure_partitions(months_back=args.seed // (2 * 86400 * 28) + 1)
+            started = time.perf_counter()
+            await connection.execute_query(SEED_SQL, [args.seed])
+            await connection.execute_script("ANALYZE requests")
+            print(f"Seeded {args.seed} rows in {time.perf_counter() - started:.1f} s")
+
+        print(f"{'scenario':<20}{'pages':>7}{'p50, ms':>10}{'p95, ms':>10}{'max, ms':>10}")
+        cursor = None
+        for name, filters in [
+            ("all", {}),
+            ("type=speech", {"request_type": "speech"}),
+            ("status=Processing", {"status": "Processing"}),
+        ]:
+            latencies, last_cursor = await walk(args.pages, **filters)
+            cursor = cursor or last_cursor
+            print(
+                f"{name:<20}{len(latencies):>7}{statistics.median(latencies) * 1000:>10.2f}"
+                f"{percentile(latencies, 95) * 1000:>10.2f}{max(latencies) * 1000:>10.2f}"
+            )
+
+        if cursor is not None:
+            _count, plan = await connection.execute_query(PAGE_SQL, list(decode_cursor(cursor)))
+            print("\n".join(row["QUERY PLAN"] for row in plan))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""
+Compare speech to text engines by real-time factor and latency.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_stt samples/*.webm --engines hf local --runs 5
+
+Real-time factor (RTF) is processing time divided by audio duration; values below 1
+mean the engine is faster than real time.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from pydub import AudioSegment
+
+from app.core.speech_to_text import SpeechToTextEngine, create_stt_engine
+from scripts.stats import percentile
+
+
+async def benchmark_engine(engine: SpeechToTextEngine, samples: list[tuple[bytes, str, float]], runs: int) -> dict:
+    await engine.start()
+    latencies, rtfs = [], []
+    try:
+        for _ in range(runs):
+            for audio_bytes, audio_format, duration in samples:
+                started = time.perf_counter()
+                await engine.transcribe(audio_bytes, audio_format=audio_format)
+                elapsed = time.perf_counter() - started
+                latencies.append(elapsed)
+                rtfs.append(elapsed / duration)
+    finally:
+        await engine.close()
+
+    return {
+        "engine": engine.name,
+        "calls": len(latencies),
+        "rtf_mean": statistics.mean(rtfs),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", type=Path, help="Audio files to transcribe")
+    parser.add_argument("--engines", nargs="+", default=["hf", "local"], choices=["hf", "local"])
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the sample set per engine")
+    args = parser.parse_args()
+
+    samples = []
+    for path in args.files:
+        audio_format = path.suffix.lstrip(".")
+        duration = AudioSegment.from_file(path, format=audio_format).duration_seconds
+        samples.append((path.read_bytes(), audio_format, duration))
+
+    print(f"{'engine':<8}{'calls':>8}{'RTF':>10}{'p50, ms':>12}{'p95, ms':>12}")
+    for name in args.engines:
+        result = await benchmark_engine(create_stt_engine(name), samples, args.runs)
+        print(
+            f"{result['engine']:<8}{result['calls']:>8}{result['rtf_mean']:>10.3f}"
+            f"{result['p50_ms']:>12.1f}{result['p95_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
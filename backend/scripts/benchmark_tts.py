@@ -0,0 +1,123 @@
+"""
+Compare text to speech engines by real-time factor and latency.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_tts --engines standin piper --runs 5 --concurrency 4
+
+The "standin" engine replaces gTTS without network access: it waits for a simulated
+round trip plus server time proportional to the text length and returns silence of the
+expected duration, so the offline engines can be compared with the gTTS path anywhere.
+Real-time factor (RTF) is synthesis time divided by audio duration; values below 1
+mean the engine is faster than real time.
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+
+from pydub import AudioSegment
+
+from app.core.configs.config import settings
+from app.core.text_to_speech import GTTSEngine, PiperEngine, TextToSpeechEngine, read_wav, wav_header
+from scripts.stats import percentile
+
+SENTENCES = [
+    "Лифт вызван.",
+    "Ожидайте на пятом этаже.",
+    "Заявка на уборку снега во дворе принята, ожидайте дворника в течение часа.",
+    "Показания счётчика горячей воды переданы в управляющую компанию.",
+    "Платёж на сумму две тысячи триста рублей принят.",
+]
+
+
+class StandInEngine(TextToSpeechEngine):
+    """gTTS-like latency profile without network access."""
+
+    name = "standin"
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, rtt_ms: float, ms_per_char: float, chars_per_second: float = 14.0):
+        self._rtt = rtt_ms / 1000
+        self._seconds_per_char = ms_per_char / 1000
+        self._chars_per_second = chars_per_second
+
+    async def synthesize(self, text: str, lang: str, voice: str) -> bytes:
+        await asyncio.sleep(self._rtt + self._seconds_per_char * len(text))
+        rate = 16000
+        frames = b"\0\0" * int(rate * len(text) / self._chars_per_second)
+        return wav_header((1, 2, rate), len(frames)) + frames
+
+
+def build_engine(name: str, args: argparse.Namespace) -> TextToSpeechEngine:
+    if name == "piper":
+        return PiperEngine(args.piper_model, workers=args.concurrency)
+    if name == "standin":
+        return StandInEngine(args.rtt_ms, args.ms_per_char)
+    return GTTSEngine()
+
+
+def duration(audio: bytes, media_type: str) -> float:
+    if media_type == "audio/wav":
+        (channels, sample_width, rate), frames = read_wav(audio)
+        return len(frames) / (channels * sample_width * rate)
+    return AudioSegment.from_file(io.BytesIO(audio), format="mp3").duration_seconds
+
+
+async def benchmark_engine(engine: TextToSpeechEngine, runs: int, concurrency: int) -> dict:
+    started = time.perf_counter()
+    await engine.start()
+    warmup = time.perf_counter() - started
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, rtfs = [], []
+
+    async def synthesize(text: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            audio = await engine.synthesize(text, settings.TTS_LANGUAGE, "")
+            elapsed = time.perf_counter() - started
+        latencies.append(elapsed)
+        rtfs.append(elapsed / duration(audio, engine.media_type))
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(synthesize(text) for _ in range(runs) for text in SENTENCES))
+        wall = time.perf_counter() - started
+    finally:
+        await engine.close()
+
+    return {
+        "engine": engine.name,
+        "calls": len(latencies),
+        "warmup_s": warmup,
+        "rtf_mean": statistics.mean(rtfs),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "throughput": len(latencies) / wall,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["standin", "piper"], choices=["gtts", "piper", "standin"])
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the sentence set per engine")
+    parser.add_argument("--concurrency", type=int, default=2, help="Sentences in flight, also the Piper pool size")
+    parser.add_argument("--piper-model", default=settings.TTS_PIPER_MODEL, help="Piper voice (.onnx with .onnx.json)")
+    parser.add_argument("--rtt-ms", type=float, default=250.0, help="Round trip of the gTTS stand-in")
+    parser.add_argument("--ms-per-char", type=float, default=2.0, help="Server time per character of the stand-in")
+    args = parser.parse_args()
+
+    print(f"{'engine':<9}{'calls':>7}{'warmup, s':>11}{'RTF':>8}{'p50, ms':>10}{'p95, ms':>10}{'calls/s':>9}")
+    for name in args.engines:
+        result = await benchmark_engine(build_engine(name, args), args.runs, args.concurrency)
+        print(
+            f"{result['engine']:<9}{result['calls']:>7}{result['warmup_s']:>11.2f}{result['rtf_mean']:>8.3f}"
+            f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['throughput']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
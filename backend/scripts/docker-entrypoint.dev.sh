@@ -6,6 +6,12 @@
 : "${PORT:=8000}"
 : "${WORKERS:=1}"
 : "${LOG_LEVEL:=debug}"
+# Set to false on replicas when the schema is migrated by a separate deploy step
+: "${MIGRATE_DB:=true}"
+
+if [ "$MIGRATE_DB" = "true" ]; then
+    python -m scripts.migrate_db || exit 1
+fi
 
 # # Start uvicorn
 # exec uvicorn app.api:app \
@@ -0,0 +1,63 @@
+"""
+Export the request history for model retraining.
+
+Usage (from the backend directory):
+    python -m scripts.export_requests --task call_elevator --since 2025-01-01 -o dataset.ndjson.gz
+
+Streams the rows through a server-side cursor, oldest first, in constant memory.
+Output ending in .gz is compressed; NDJSON output is a dataset for posttrain/train.py.
+"""
+
+import argparse
+import asyncio
+import gzip
+import sys
+from datetime import datetime
+
+from app.core.db import close_db, init_db
+from app.core.export import export_requests
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", help="Output file, stdout by default")
+    parser.add_argument(
+        "--format", dest="export_format", choices=["ndjson", "csv"], help="By default from the extension"
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Inclusive lower bound of created_at")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Exclusive upper bound of created_at")
+    parser.add_argument("--task", help="Task the AI chose")
+    parser.add_argument("--request-type", help="speech, text, video or gesture")
+    parser.add_argument("--status", help="Request status, e.g. Completed")
+    args = parser.parse_args()
+
+    output = args.output or ""
+    export_format = args.export_format or ("csv" if output.removesuffix(".gz").endswith(".csv") else "ndjson")
+    if not output:
+        f = sys.stdout.buffer
+    elif output.endswith(".gz"):
+        f = gzip.open(output, "wb")
+    else:
+        f = open(output, "wb")
+
+    # Only connects: the export never changes the schema
+    await init_db()
+    try:
+        chunks = export_requests(
+            export_format,
+            since=args.since,
+            until=args.until,
+            task=args.task,
+            request_type=args.request_type,
+            status=args.status,
+        )
+        async for chunk in chunks:
+            f.write(chunk)
+    finally:
+        await close_db()
+        if f is not sys.stdout.buffer:
+            f.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
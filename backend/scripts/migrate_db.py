@@ -0,0 +1,26 @@
+"""
+Apply the database schema changes and create the upcoming request partitions.
+
+Usage (from the backend directory, once per deploy, before the app starts):
+    python -m scripts.migrate_db
+
+The app itself only connects to the database, so replicas and CLI tools never run DDL.
+"""
+
+import asyncio
+
+from app.core.db import close_db, init_db, migrate_db
+from app.core.logging import setup_logging
+
+
+async def main() -> None:
+    setup_logging()
+    await init_db()
+    try:
+        await migrate_db()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
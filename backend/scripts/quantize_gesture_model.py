@@ -0,0 +1,38 @@
+"""
+Write the INT8 dynamically quantized variant of the gesture model.
+
+Usage (from the backend directory):
+    python -m scripts.quantize_gesture_model configs/config.json [--per-channel]
+
+The output goes to "path_to_quantized_model" of the config, or next to the model as
+model.int8.onnx. Set "quantized": true in the config (or GESTURE_QUANTIZED=true) to serve it,
+and compare it with the FP32 model first using scripts.benchmark_gesture_sessions.
+"""
+
+import argparse
+import json
+import os
+
+from app.core.hands.session import quantize_model, quantized_model_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("config", help="Path to the gesture model config.json")
+    parser.add_argument("--per-channel", action="store_true", help="Quantize weights per output channel")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    source = config["path_to_model"]
+    output = config.get("path_to_quantized_model") or quantized_model_path(source)
+
+    quantize_model(source, output, per_channel=args.per_channel)
+    print(
+        f"{source} ({os.path.getsize(source) / 2**20:.1f} MiB) -> "
+        f"{output} ({os.path.getsize(output) / 2**20:.1f} MiB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Statistics shared by the benchmark scripts.
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of the values.
+
+    Args:
+        values: Measurements, in any order.
+        q: Percentile from 0 to 100.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,17 @@
+from app.core.analytics import LATENCY_BOUNDS_MS, histogram_percentile
+
+
+def test_histogram_percentile_interpolates_within_bucket():
+    buckets = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+    buckets[1] = 10  # 50..100 ms
+    buckets[3] = 10  # 250..500 ms
+
+    assert histogram_percentile(buckets, 25) == 75
+    assert histogram_percentile(buckets, 100) == 500
+
+
+def test_histogram_percentile_edges():
+    overflow = [0] * len(LATENCY_BOUNDS_MS) + [3]
+
+    assert histogram_percentile([0] * (len(LATENCY_BOUNDS_MS) + 1), 50) is None
+    assert histogram_percentile(overflow, 50) == LATENCY_BOUNDS_MS[-1]
@@ -0,0 +1,129 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import cv2
+import numpy as np
+import pytest
+
+from app.core.cache import LRUCache, TieredCache, cache_requests, content_digest
+from app.core.image import dhash
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest entry
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_transcript_cache_promotes_redis_hits_to_memory():
+    redis = AsyncMock()
+    redis.get_transcript.return_value = "привет"
+    cache = TieredCache("transcript", redis.get_transcript, redis.set_transcript, maxsize=8, ttl=60)
+    key = f"speech:{content_digest(b'same upload')}"
+    hits_before = cache_requests.value(cache="transcript", result="memory_hit")
+
+    assert await cache.get(key) == "привет"
+    assert await cache.get(key) == "привет"
+
+    redis.get_transcript.assert_awaited_once_with(key)
+    assert cache_requests.value(cache="transcript", result="memory_hit") == hits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_transcript_cache_miss_when_redis_is_down():
+    redis = AsyncMock()
+    redis.get_transcript.side_effect = ConnectionError("redis is down")
+    cache = TieredCache("transcript", redis.get_transcript, redis.set_transcript, maxsize=8, ttl=60)
+
+    assert await cache.get(f"video:{content_digest(b'clip')}") is None
+
+
+def test_content_digest_is_scoped_by_model():
+    assert content_digest(b"audio") != content_digest(b"audio", "local:small:int8:ru")
+    assert content_digest(b"audio", "hf:whisper") != content_digest(b"audio", "local:small:int8:ru")
+
+
+@pytest.mark.asyncio
+async def test_transcript_cache_coalesces_concurrent_misses():
+    redis = AsyncMock()
+    redis.get_transcript.return_value = None
+    cache = TieredCache("transcript", redis.get_transcript, redis.set_transcript, maxsize=8, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def recognize():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "привет"
+
+    key = f"speech:{content_digest(b'same upload')}"
+    coalesced_before = cache_requests.value(cache="transcript", result="coalesced")
+    waiters = [asyncio.create_task(cache.get_or_compute(key, recognize)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["привет"] * 3
+    assert calls == 1
+    assert cache_requests.value(cache="transcript", result="coalesced") == coalesced_before + 2
+    redis.set_transcript.assert_awaited_once_with(key, "привет", 60)
+
+
+@pytest.mark.asyncio
+async def test_transcript_cache_shares_errors_of_coalesced_recognition():
+    redis = AsyncMock()
+    redis.get_transcript.return_value = None
+    cache = TieredCache("transcript", redis.get_transcript, redis.set_transcript, maxsize=8, ttl=60)
+    release = asyncio.Event()
+
+    async def recognize():
+        await release.wait()
+        raise RuntimeError("engine failed")
+
+    waiters = [asyncio.create_task(cache.get_or_compute("speech:d1", recognize)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    redis.set_transcript.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_stores_in_both_tiers():
+    redis = AsyncMock()
+    redis.get_gesture_text.return_value = None
+    cache = TieredCache("gesture_text", redis.get_gesture_text, redis.set_gesture_text, maxsize=8, ttl=60)
+
+    assert await cache.get("f0e1") is None
+    await cache.set("f0e1", "привет")
+
+    assert await cache.get("f0e1") == "привет"
+    redis.set_gesture_text.assert_awaited_once_with("f0e1", "привет", 60)
+    redis.get_gesture_text.assert_awaited_once_with("f0e1")
+
+
+def test_dhash_ignores_reencoding_noise():
+    rng = np.random.default_rng(0)
+    image = cv2.resize(rng.integers(0, 255, (8, 9, 3), dtype=np.uint8), (640, 480), interpolation=cv2.INTER_NEAREST)
+    noisy = np.clip(image.astype(np.int16) + rng.integers(-3, 4, image.shape), 0, 255).astype(np.uint8)
+
+    original = dhash(cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes())
+    reencoded = dhash(cv2.imencode(".jpg", noisy, [cv2.IMWRITE_JPEG_QUALITY, 70])[1].tobytes())
+    other = dhash(cv2.imencode(".jpg", image[:, ::-1], [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes())
+
+    assert original == reencoded
+    assert original != other
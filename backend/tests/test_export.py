@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from app.core.export import build_export_query
+
+
+def test_export_query_numbers_only_given_filters():
+    since = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    query, args = build_export_query("id", since=since, task="call_elevator")
+
+    assert query == "SELECT id FROM requests WHERE created_at >= $1 AND task = $2 ORDER BY created_at, id"
+    assert args == [since, "call_elevator"]
+
+
+def test_export_query_without_filters():
+    query, args = build_export_query("id")
+
+    assert "WHERE" not in query
+    assert args == []
@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+import pytest
+from einops import rearrange
+
+from app.core.hands.batcher import BatchingPredictor
+from app.core.hands.buffer import FrameRingBuffer
+
+
+def legacy_clip(frames):
+    clip = np.array(frames).astype(np.float32) / 255.0
+    return rearrange(clip, "t h w c -> 1 c t h w")
+
+
+def test_ring_buffer_clip_matches_legacy_preprocessing_after_wraparound():
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (8, 6, 3), dtype=np.uint8) for _ in range(7)]
+    buffer = FrameRingBuffer(window_size=4, height=8, width=6)
+
+    for frame in frames:
+        buffer.append(frame)
+
+    assert len(buffer) == 4
+    np.testing.assert_allclose(buffer.to_clip(), legacy_clip(frames[-4:]), rtol=1e-6)
+
+
+def test_ring_buffer_reuses_its_clip_array():
+    buffer = FrameRingBuffer(window_size=2, height=4, width=4)
+    buffer.append(np.zeros((4, 4, 3), dtype=np.uint8))
+    buffer.append(np.full((4, 4, 3), 255, dtype=np.uint8))
+
+    first = buffer.to_clip()
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.to_clip() is first
+
+
+class RecordingPredictor:
+    config = {"window_size": 2}
+    labels = {0: "no", 1: "привет"}
+
+    def __init__(self):
+        self.preprocess_threads = []
+
+    def preprocess(self, x):
+        self.preprocess_threads.append(threading.get_ident())
+        return x.to_clip().copy()
+
+    def predict_proba_batch(self, clips):
+        return np.tile([0.1, 0.9], (len(clips), 1))
+
+
+@pytest.mark.asyncio
+async def test_batcher_normalizes_windows_off_the_event_loop():
+    predictor = RecordingPredictor()
+    batcher = BatchingPredictor(predictor, max_batch_size=4, max_wait_ms=1)
+    batcher.start()
+    buffer = FrameRingBuffer(window_size=2, height=4, width=4)
+    buffer.append(np.zeros((4, 4, 3), dtype=np.uint8))
+    buffer.append(np.full((4, 4, 3), 255, dtype=np.uint8))
+    try:
+        probabilities = await batcher.apredict_proba(buffer)
+    finally:
+        batcher.stop()
+
+    np.testing.assert_allclose(probabilities, [0.1, 0.9])
+    assert predictor.preprocess_threads and threading.get_ident() not in predictor.preprocess_threads
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.core.hands.pool import ProcessPoolPredictor
+
+
+def crash_first_call(marker: str, segment_name: str, shape: tuple) -> np.ndarray:
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return np.array([0.1, 0.9])
+
+
+@pytest.fixture
+def pool(tmp_path):
+    labels = tmp_path / "classes.txt"
+    labels.write_text("0\tno\n1\tпривет\n")
+    config = {"path_to_class_list": str(labels), "threshold": 0.5, "window_size": 2}
+
+    def fork_pool(self):
+        # Forked stand-in workers see the patched task function
+        return ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork"))
+
+    with (
+        patch.object(ProcessPoolPredictor, "_create_pool", fork_pool),
+        patch("app.core.hands.pool._gesture_predict_proba", partial(crash_first_call, str(tmp_path / "crashed"))),
+    ):
+        predictor = ProcessPoolPredictor(config, workers=1)
+        predictor.shape = (3, 2, 4, 4)
+        predictor.start()
+        yield predictor
+        predictor.stop()
+
+
+def test_pool_restarts_after_a_worker_crash(pool):
+    window = [np.zeros((4, 4, 3), dtype=np.uint8)] * 2
+
+    np.testing.assert_allclose(pool.predict_proba(window), [0.1, 0.9])
+    np.testing.assert_allclose(pool.predict_proba(window), [0.1, 0.9])
+    assert pool._generation == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_restarts_after_a_worker_crash_in_coroutines(pool):
+    window = [np.zeros((4, 4, 3), dtype=np.uint8)] * 2
+
+    np.testing.assert_allclose(await pool.apredict_proba(window), [0.1, 0.9])
+    assert pool._generation == 1
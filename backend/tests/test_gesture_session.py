@@ -0,0 +1,35 @@
+import onnx
+from onnx import TensorProto, helper
+
+from app.core.hands.session import SESSION_PROFILES, create_session, optimized_model_path, resolve_session_settings
+
+
+def save_model(path) -> str:
+    graph = helper.make_graph(
+        [helper.make_node("Relu", ["x"], ["y"])],
+        "relu",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 4])],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def test_latency_and_throughput_profiles_differ():
+    latency, throughput = SESSION_PROFILES["latency"], SESSION_PROFILES["throughput"]
+
+    assert latency["execution_mode"] != throughput["execution_mode"]
+    assert latency["inter_op_threads"] != throughput["inter_op_threads"]
+
+
+def test_optimized_model_is_cached_without_temporary_files(tmp_path):
+    model_path = save_model(tmp_path / "model.onnx")
+    config = {"profile": "throughput", "cache_optimized_model": True}
+
+    create_session(model_path, "CPUExecutionProvider", config)
+    create_session(model_path, "CPUExecutionProvider", config)
+
+    cached = optimized_model_path(model_path, resolve_session_settings(config))
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(["model.onnx", cached.rsplit("/", 1)[-1]])
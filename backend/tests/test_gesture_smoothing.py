@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.core.hands.smoothing import GestureSequenceDecoder
+
+LABELS = {0: "no", 1: "привет", 2: "дом"}
+
+
+def probs(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def test_decoder_emits_full_sequence():
+    decoder = GestureSequenceDecoder(LABELS, threshold=0.5, alpha=1.0)
+    windows = [probs(0.1, 0.8, 0.1), probs(0.1, 0.8, 0.1), probs(0.9, 0.05, 0.05), probs(0.1, 0.1, 0.8)]
+
+    emitted = [decoder.update(window) for window in windows]
+
+    assert emitted == ["привет", None, None, "дом"]
+    assert decoder.phrase == "привет дом"
+
+
+def test_smoothing_suppresses_a_single_noisy_window():
+    decoder = GestureSequenceDecoder(LABELS, threshold=0.6, alpha=0.3)
+    for _ in range(3):
+        decoder.update(probs(0.1, 0.85, 0.05))
+    decoder.update(probs(0.05, 0.15, 0.8))  # one outlier window
+
+    assert decoder.gestures == ["привет"]
+
+
+def test_repeated_gesture_after_a_pause_is_emitted_twice():
+    decoder = GestureSequenceDecoder(LABELS, threshold=0.5, alpha=1.0)
+    for window in [probs(0.1, 0.8, 0.1), probs(0.9, 0.05, 0.05), probs(0.1, 0.8, 0.1)]:
+        decoder.update(window)
+
+    assert decoder.gestures == ["привет", "привет"]
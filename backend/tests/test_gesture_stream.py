@@ -0,0 +1,49 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.hands.motion import gesture_windows
+from app.core.hands.stream import GestureStreamSession
+
+
+class SlowModel:
+    config = {"window_size": 2, "stride": 1, "threshold": 0.5, "motion_threshold": None}
+    labels = {0: "no", 1: "привет"}
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def adecode_frames(self, images):
+        return [np.frombuffer(image, dtype=np.uint8).reshape(224, 224, 3) for image in images]
+
+    async def apredict_proba(self, x):
+        self.calls += 1
+        await self.release.wait()
+        return np.array([0.1, 0.9])
+
+
+@pytest.mark.asyncio
+async def test_windows_dropped_during_an_evaluation_count_as_skipped():
+    model = SlowModel()
+
+    async def on_gesture(gesture, phrase):
+        pass
+
+    session = GestureStreamSession(model, on_gesture=on_gesture)
+    evaluated = gesture_windows.value(result="evaluated")
+    skipped = gesture_windows.value(result="skipped")
+
+    frame = np.zeros((224, 224, 3), dtype=np.uint8).tobytes()
+    for _ in range(2):
+        await session.feed(frame)
+    await asyncio.sleep(0)
+    for _ in range(3):
+        await session.feed(frame)
+    model.release.set()
+    await session.close()
+
+    assert model.calls == 1
+    assert gesture_windows.value(result="evaluated") == evaluated + 1
+    assert gesture_windows.value(result="skipped") == skipped + 3
@@ -0,0 +1,19 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.history import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    request_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, request_id)) == (created_at, request_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(datetime.now(), uuid.uuid4())[:-6]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
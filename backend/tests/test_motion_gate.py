@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.core.hands.motion import MotionGate
+
+
+def test_static_frames_close_the_gate():
+    gate = MotionGate()
+    frame = np.full((224, 224, 3), 128, dtype=np.uint8)
+
+    for _ in range(8):
+        gate.update(frame)
+
+    assert gate.is_static(8)
+
+
+def test_motion_reopens_the_gate():
+    gate = MotionGate()
+    frame = np.full((224, 224, 3), 128, dtype=np.uint8)
+    for _ in range(8):
+        gate.update(frame)
+
+    moved = frame.copy()
+    moved[:32, :32] = 0
+    assert gate.update(moved) > gate.threshold
+    assert not gate.is_static(8)
+
+
+def test_sensor_noise_is_not_motion():
+    gate = MotionGate()
+    rng = np.random.default_rng(0)
+    base = np.full((224, 224, 3), 128, dtype=np.int16)
+
+    for _ in range(8):
+        noise = rng.integers(-6, 7, base.shape)
+        gate.update((base + noise).astype(np.uint8))
+
+    assert gate.is_static(8)
@@ -0,0 +1,132 @@
+from contextlib import asynccontextmanager
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.db import partitions
+from app.core.db.partitions import (
+    LIST_DETACH_PENDING_SQL,
+    LIST_DETACHED_SQL,
+    LIST_PARTITIONS_SQL,
+    add_months,
+    archive_partitions,
+    ensure_partitions,
+    month_bound,
+    partition_name,
+)
+from app.core.db.schema import LOCK_SCHEMA_SQL
+
+
+def test_add_months_crosses_years():
+    assert add_months(date(2025, 11, 17), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 31), -1) == date(2024, 12, 1)
+
+
+def test_partition_names_and_bounds():
+    assert partition_name(date(2025, 3, 1)) == "requests_p202503"
+    assert month_bound(date(2025, 3, 1)) == "2025-03-01 00:00:00+00"
+
+
+class FakeConnection:
+    """Records the DDL it gets and answers the catalog queries with fixed rows."""
+
+    def __init__(self, partitions=(), pending=(), detached=()):
+        self.partitions = dict(partitions)
+        self.pending = list(pending)
+        self.detached = list(detached)
+        self.scripts = []
+        self.in_transaction = False
+        self.transactional = []
+
+    async def execute_query_dict(self, query, values=None):
+        if query == LIST_PARTITIONS_SQL:
+            return [{"name": name, "bound": bound} for name, bound in self.partitions.items()]
+        if query == LIST_DETACH_PENDING_SQL:
+            return [{"name": name} for name in self.pending]
+        if query == LIST_DETACHED_SQL:
+            return [{"name": name} for name in self.detached]
+        raise AssertionError(f"Unexpected query {query}")
+
+    async def execute_script(self, query):
+        self.scripts.append(query)
+        self.transactional.append(self.in_transaction)
+
+    @asynccontextmanager
+    async def transaction(self, _name="default"):
+        self.in_transaction = True
+        try:
+            yield self
+        finally:
+            self.in_transaction = False
+
+
+def use_connection(connection):
+    return (
+        patch.object(partitions.Tortoise, "get_connection", return_value=connection),
+        patch.object(partitions, "in_transaction", connection.transaction),
+    )
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_skips_months_covered_by_the_legacy_table():
+    connection = FakeConnection({"requests_legacy": "FOR VALUES FROM (MINVALUE) TO ('2025-04-01 00:00:00+00')"})
+    get_connection, transaction = use_connection(connection)
+
+    with get_connection, transaction:
+        created = await ensure_partitions(months_ahead=2, today=date(2025, 3, 17))
+
+    assert created == ["requests_p202504", "requests_p202505"]
+    assert connection.scripts[0] == LOCK_SCHEMA_SQL
+    assert connection.scripts[1] == (
+        "CREATE TABLE requests_p202504 PARTITION OF requests "
+        "FOR VALUES FROM ('2025-04-01 00:00:00+00') TO ('2025-05-01 00:00:00+00')"
+    )
+    # The lock only holds within the transaction
+    assert all(connection.transactional)
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_fills_gaps_and_reports_only_created_partitions():
+    connection = FakeConnection(
+        {
+            "requests_p202503": "FOR VALUES FROM ('2025-03-01 00:00:00+00') TO ('2025-04-01 00:00:00+00')",
+            "requests_p202505": "FOR VALUES FROM ('2025-05-01 00:00:00+00') TO ('2025-06-01 00:00:00+00')",
+        }
+    )
+    get_connection, transaction = use_connection(connection)
+
+    with get_connection, transaction:
+        created = await ensure_partitions(months_ahead=2, today=date(2025, 3, 17))
+        assert created == ["requests_p202504"]
+        connection.partitions["requests_p202504"] = (
+            "FOR VALUES FROM ('2025-04-01 00:00:00+00') TO ('2025-05-01 00:00:00+00')"
+        )
+        assert await ensure_partitions(months_ahead=2, today=date(2025, 3, 17)) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_partitions_detaches_concurrently_and_finalizes_interrupted_detaches(tmp_path):
+    connection = FakeConnection(
+        {
+            "requests_p202501": "FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2025-02-01 00:00:00+00')",
+            "requests_p202503": "FOR VALUES FROM ('2025-03-01 00:00:00+00') TO ('2025-04-01 00:00:00+00')",
+        },
+        pending=["requests_p202412"],
+        detached=["requests_p202412", "requests_p202501", "orders_2024"],
+    )
+    get_connection, transaction = use_connection(connection)
+
+    with get_connection, transaction, patch.object(partitions, "export_table", AsyncMock(return_value=3)) as export:
+        archived = await archive_partitions(retention_months=1, archive_dir=str(tmp_path), today=date(2025, 3, 17))
+
+    assert connection.scripts == [
+        "ALTER TABLE requests DETACH PARTITION requests_p202412 FINALIZE",
+        "ALTER TABLE requests DETACH PARTITION requests_p202501 CONCURRENTLY",
+        "DROP TABLE requests_p202412",
+        "DROP TABLE requests_p202501",
+    ]
+    # DETACH ... CONCURRENTLY cannot run inside a transaction block
+    assert not any(connection.transactional)
+    assert archived == [("requests_p202412", 3), ("requests_p202501", 3)]
+    export.assert_awaited_with("requests_p202501", str(tmp_path / "requests_p202501.ndjson.gz"))
@@ -0,0 +1,61 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.phrase_bank import PhraseBank, number_vocabulary, number_words
+
+
+def test_number_words_agree_with_thousands():
+    assert number_words(0) == ["ноль"]
+    assert number_words(5042) == ["пять", "тысяч", "сорок", "два"]
+    assert number_words(21000) == ["двадцать", "одна", "тысяча"]
+    assert number_words(2312) == ["две", "тысячи", "триста", "двенадцать"]
+    assert set(number_words(999_999)) <= number_vocabulary()
+
+
+def make_bank() -> PhraseBank:
+    service = MagicMock(media_type="audio/mpeg")
+    service.synthesize_sentence = AsyncMock(side_effect=lambda text, lang, voice: f"<{text}>".encode())
+    service.synthesize = AsyncMock(return_value=b"<full>")
+    return PhraseBank(service, {"call_elevator": "Лифт вызван. Этаж {floor}."})
+
+
+@pytest.mark.asyncio
+async def test_phrase_bank_assembles_numbers_from_segments():
+    bank = make_bank()
+    await bank.warm()
+
+    audio, source = await bank.confirmation("call_elevator", {"floor": 12})
+
+    assert source == "bank"
+    assert audio == "<Лифт вызван. Этаж><двенадцать>".encode()
+    bank.service.synthesize.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_phrase_bank_falls_back_to_synthesis():
+    bank = make_bank()
+    await bank.warm()
+
+    assert await bank.confirmation("call_elevator", {"floor": "B2"}) == (b"<full>", "synthesis")
+    bank.service.synthesize.assert_awaited_once_with("Лифт вызван. Этаж B2.", lang="ru")
+    with pytest.raises(ValueError):
+        await bank.confirmation("call_elevator", {})
+
+
+@pytest.mark.asyncio
+async def test_phrase_bank_retries_failed_segments_until_ready():
+    bank = make_bank()
+    render = bank.service.synthesize_sentence.side_effect
+    failures = iter([True])
+
+    def flaky(text, lang, voice):
+        if text == "двенадцать" and next(failures, False):
+            raise ConnectionError("gTTS is down")
+        return render(text, lang, voice)
+
+    bank.service.synthesize_sentence.side_effect = flaky
+    await bank.keep_warm(retry_interval=0)
+
+    assert bank.is_ready
+    assert (await bank.confirmation("call_elevator", {"floor": 12}))[1] == "bank"
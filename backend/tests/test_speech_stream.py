@@ -0,0 +1,137 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.api.schemas.stream import ControlMessage
+from app.core.speech_stream import FRAME_BYTES, SAMPLE_RATE, SpeechStreamSession
+
+
+class FakeEngine:
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    async def transcribe(self, audio_bytes, audio_format="webm"):
+        self.calls.append((len(audio_bytes), audio_format))
+        return "вызови лифт"
+
+
+def pcm(seconds: float, amplitude: int) -> bytes:
+    samples = int(SAMPLE_RATE * seconds)
+    tone = amplitude * np.sin(np.linspace(0, 440 * 2 * np.pi * seconds, samples))
+    return tone.astype("<i2").tobytes()
+
+
+@pytest.mark.asyncio
+async def test_final_transcript_is_emitted_at_end_of_speech():
+    engine = FakeEngine()
+    partials, finals = [], []
+
+    async def on_partial(text):
+        partials.append(text)
+
+    async def on_final(text):
+        finals.append(text)
+
+    session = SpeechStreamSession(engine, on_partial=on_partial, on_final=on_final, partial_interval_ms=10_000)
+    audio = pcm(0.5, 0) + pcm(1.0, 5000) + pcm(1.0, 0)
+
+    # Odd chunk sizes must not break framing
+    for offset in range(0, len(audio), FRAME_BYTES + 7):
+        await session.feed(audio[offset:offset + FRAME_BYTES + 7])
+    await session.drain()
+
+    assert finals == ["вызови лифт"]
+    assert partials == []
+    assert engine.calls[0][1] == "wav"
+
+
+@pytest.mark.asyncio
+async def test_silence_produces_no_transcripts():
+    engine = FakeEngine()
+    finals = []
+
+    async def on_final(text):
+        finals.append(text)
+
+    async def on_partial(text):
+        pass
+
+    session = SpeechStreamSession(engine, on_partial=on_partial, on_final=on_final)
+    await session.feed(pcm(2.0, 50))
+    await session.flush()
+
+    assert finals == []
+    assert engine.calls == []
+
+
+class SegmentEngine:
+    name = "segments"
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def transcribe(self, audio_bytes, audio_format="webm"):
+        self.calls.append(len(audio_bytes))
+        index = len(self.calls)
+        await self.release.wait()
+        return f"часть {index}"
+
+
+@pytest.mark.asyncio
+async def test_long_utterance_is_recognized_in_segments_off_the_receive_path():
+    engine = SegmentEngine()
+    finals = []
+
+    async def on_final(text):
+        finals.append(text)
+
+    async def on_partial(text):
+        pass
+
+    session = SpeechStreamSession(
+        engine, on_partial=on_partial, on_final=on_final, partial_interval_ms=None, segment_ms=1000, pause_ms=240
+    )
+    # Three phrases separated by pauses shorter than the end-of-speech hangover
+    audio = pcm(1.2, 5000) + pcm(0.3, 0) + pcm(1.2, 5000) + pcm(0.3, 0) + pcm(0.5, 5000) + pcm(1.0, 0)
+    await session.feed(audio)
+    await asyncio.sleep(0)
+
+    # Feeding never waits for recognition, and each segment is sent only once
+    assert len(engine.calls) == 3
+    assert sum(engine.calls) < len(audio) + 3 * 1024
+    assert finals == []
+
+    engine.release.set()
+    await session.drain()
+    assert finals == ["часть 1 часть 2 часть 3"]
+
+
+@pytest.mark.asyncio
+async def test_partials_can_be_disabled():
+    engine = FakeEngine()
+    partials = []
+
+    async def on_partial(text):
+        partials.append(text)
+
+    async def on_final(text):
+        pass
+
+    session = SpeechStreamSession(engine, on_partial=on_partial, on_final=on_final, partial_interval_ms=None)
+    await session.feed(pcm(3.0, 5000))
+    await asyncio.sleep(0)
+    await session.close()
+
+    assert partials == []
+    assert engine.calls == []
+
+
+def test_malformed_control_frames_are_ignored():
+    assert ControlMessage.parse('{"type": "end"}').type == "end"
+    assert ControlMessage.parse("end") is None
+    assert ControlMessage.parse('["end"]') is None
+    assert ControlMessage.parse('{"kind": "end"}') is None
@@ -0,0 +1,146 @@
+import io
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import av
+import httpx
+import numpy as np
+import pytest
+
+from app.core.cache import TieredCache
+from app.core.hands.registry import GestureModelRegistry, ModelNotLoadedError
+from app.core.hands.video import decode_video
+from app.core.rate_limit import UpstreamBusyError, UpstreamLimiter
+from app.core.speech_to_text import (
+    HFInferenceEngine,
+    LocalWhisperEngine,
+    create_stt_engine,
+    get_stt_engine,
+    video_to_text,
+)
+
+
+def hf_engine(status_code: int, payload) -> HFInferenceEngine:
+    engine = HFInferenceEngine()
+    engine._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(status_code, json=payload))
+    )
+    return engine
+
+
+@pytest.fixture
+def limiter():
+    # Limiter whose Redis is down, so calls go through unlimited
+    redis = MagicMock()
+    redis.register_script.return_value = AsyncMock(side_effect=ConnectionError("redis is down"))
+    limiter = UpstreamLimiter(redis, "hf", rate=1, burst=1, concurrency=1, max_wait=1)
+    with patch("app.core.speech_to_text.get_upstream_limiter", return_value=limiter):
+        yield limiter
+
+
+def test_stt_engine_selection():
+    assert isinstance(create_stt_engine("local"), LocalWhisperEngine)
+    assert isinstance(create_stt_engine("hf"), HFInferenceEngine)
+
+    get_stt_engine.cache_clear()
+    try:
+        with patch("app.core.speech_to_text.settings.STT_ENGINE", "local"):
+            assert isinstance(get_stt_engine(), LocalWhisperEngine)
+    finally:
+        get_stt_engine.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_hf_engine_returns_text(limiter):
+    engine = hf_engine(200, {"text": " Вызови лифт "})
+    assert await engine.transcribe(b"audio", audio_format="mp3") == "Вызови лифт"
+    await engine.close()
+
+
+@pytest.mark.asyncio
+async def test_hf_engine_model_loading_is_busy(limiter):
+    engine = hf_engine(
+        503, {"error": "Model openai/whisper-large-v3-turbo is currently loading", "estimated_time": 20.0}
+    )
+    with pytest.raises(UpstreamBusyError) as exc_info:
+        await engine.transcribe(b"audio", audio_format="mp3")
+    assert exc_info.value.retry_after == 20.0
+    await engine.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status_code, payload", [(400, {"error": "Malformed audio"}), (200, {"error": "Internal"})])
+async def test_hf_engine_errors_are_not_key_errors(limiter, status_code, payload):
+    engine = hf_engine(status_code, payload)
+    with pytest.raises(RuntimeError):
+        await engine.transcribe(b"audio", audio_format="mp3")
+    await engine.close()
+
+
+def encode_clip(seconds: float, fps: int = 30) -> bytes:
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="mp4") as container:
+        stream = container.add_stream("mpeg4", rate=fps)
+        stream.width, stream.height, stream.pix_fmt = 64, 64, "yuv420p"
+        for index in range(int(seconds * fps)):
+            image = np.full((64, 64, 3), index % 255, dtype=np.uint8)
+            for packet in stream.encode(av.VideoFrame.from_ndarray(image, format="rgb24")):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def test_decode_video_samples_the_whole_clip_at_the_target_rate():
+    # 60 fps source, 30 fps model: every second frame of all 4 seconds
+    frames = decode_video(encode_clip(4.0, fps=60), target_fps=30, max_frames=30 * 30, size=32)
+
+    assert len(frames) == 120
+    assert frames[0].shape == (32, 32, 3)
+
+
+def test_decode_video_warns_only_when_frames_are_dropped(caplog):
+    clip = encode_clip(2.0)
+
+    with caplog.at_level("WARNING", logger="app.core.hands.video"):
+        assert len(decode_video(clip, target_fps=30, max_frames=60, size=32)) == 60
+    assert "truncated" not in caplog.text
+
+    with caplog.at_level("WARNING", logger="app.core.hands.video"):
+        assert len(decode_video(clip, target_fps=30, max_frames=59, size=32)) == 59
+    assert "truncated" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_video_to_text_recognizes_the_whole_clip():
+    registry = MagicMock(model_id="model:fp32")
+    registry.batcher.config = {"fps": 30}
+    redis = AsyncMock()
+    redis.get_transcript.return_value = None
+    seen = []
+
+    class RecordingInference:
+        def __init__(self, model):
+            pass
+
+        def process_offline(self, frames):
+            seen.append(len(frames))
+            return ["привет", "как дела"]
+
+    with (
+        patch("app.core.speech_to_text.get_gesture_registry", return_value=registry),
+        patch(
+            "app.core.speech_to_text.get_transcript_cache",
+            return_value=TieredCache("transcript", redis.get_transcript, redis.set_transcript, maxsize=8, ttl=60),
+        ),
+        patch("app.core.speech_to_text.SLInference", RecordingInference),
+    ):
+        assert await video_to_text(encode_clip(4.0)) == "привет как дела"
+
+    assert seen == [120]
+
+
+@pytest.mark.asyncio
+async def test_video_to_text_reports_a_missing_model():
+    with patch("app.core.speech_to_text.get_gesture_registry", return_value=GestureModelRegistry()):
+        with pytest.raises(ModelNotLoadedError):
+            await video_to_text(b"clip")
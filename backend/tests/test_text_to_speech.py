@@ -0,0 +1,104 @@
+import os
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.text_to_speech import (
+    GTTSEngine,
+    TextToSpeechService,
+    audio_digest,
+    concat_audio,
+    read_wav,
+    split_sentences,
+    stream_chunk,
+    wav_header,
+)
+
+
+def test_split_sentences_keeps_order():
+    text = "Лифт вызван. Ожидайте на 5 этаже!\nСпасибо"
+
+    assert split_sentences(text) == ["Лифт вызван.", "Ожидайте на 5 этаже!", "Спасибо"]
+
+
+def test_split_sentences_breaks_long_sentences_at_commas():
+    sentence = ", ".join(["слово"] * 60)
+
+    pieces = split_sentences(sentence, max_chars=50)
+
+    assert all(len(piece) <= 50 for piece in pieces)
+    assert " ".join(pieces) == sentence
+
+
+def test_audio_digest_depends_on_voice():
+    assert audio_digest("gtts", "ru", "com", "Привет") != audio_digest("gtts", "ru", "ru", "Привет")
+
+
+def test_concat_audio_drops_id3_tags():
+    tag = b"ID3\x04\x00\x00\x00\x00\x00\x02ab"
+
+    assert concat_audio([tag + b"\xff\xf3one", tag + b"\xff\xf3two"], "audio/mpeg") == b"\xff\xf3one\xff\xf3two"
+
+
+def test_concat_audio_joins_wav_frames_under_one_header():
+    first = wav_header((1, 2, 16000), 4) + b"\x01\x00\x02\x00"
+    second = wav_header((1, 2, 16000), 2) + b"\x03\x00"
+
+    params, frames = read_wav(concat_audio([first, second], "audio/wav"))
+
+    assert params == (1, 2, 16000)
+    assert frames == b"\x01\x00\x02\x00\x03\x00"
+    assert stream_chunk(second, "audio/wav", first=False) == b"\x03\x00"
+
+
+def make_service(tmp_path, **kwargs):
+    redis = AsyncMock()
+    redis.get_tts_audio.return_value = None
+    return TextToSpeechService(GTTSEngine(), redis, cache_dir=str(tmp_path), ttl=60, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "text, lang, voice",
+    [("   ", "ru", ""), ("Привет", "xx", ""), ("Привет", "ru", "example.org")],
+)
+def test_validate_rejects_blank_text_and_unknown_language_or_voice(tmp_path, text, lang, voice):
+    with pytest.raises(ValueError):
+        make_service(tmp_path).validate(text, lang, voice)
+
+
+def test_validate_accepts_known_language_and_voice(tmp_path):
+    make_service(tmp_path).validate("Привет", "ru", "com")
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_drops_least_recently_used_files(tmp_path):
+    service = make_service(tmp_path, max_disk_bytes=250)
+    service.engine.synthesize = AsyncMock(side_effect=lambda text, lang, voice: text.encode() * 100)
+
+    await service.synthesize_sentence("a", "ru", "")
+    await service.synthesize_sentence("b", "ru", "")
+    old = time.time() - 10
+    os.utime(service._path(audio_digest("gtts", "ru", "", "b")), (old, old))
+    await service.synthesize_sentence("c", "ru", "")
+
+    cached = {path.read_bytes()[:1] for path in tmp_path.iterdir()}
+    assert cached == {b"a", b"c"}
+
+
+def test_disk_cache_drops_expired_files_at_startup(tmp_path):
+    (tmp_path / "stale.mp3").write_bytes(b"audio")
+    old = time.time() - 120
+    os.utime(tmp_path / "stale.mp3", (old, old))
+
+    make_service(tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_cache_can_be_disabled(tmp_path):
+    service = make_service(tmp_path / "tts", max_disk_bytes=0)
+    service._write_disk("digest", b"audio")
+
+    assert service._read_disk("digest") is None
+    assert not (tmp_path / "tts").exists()
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes.v1 import translator
+
+
+def make_registry(batcher):
+    return SimpleNamespace(is_loaded=True, batcher=batcher, config={"threshold": 0.9})
+
+
+@pytest.mark.asyncio
+async def test_local_failure_falls_back_to_gigachat():
+    batcher = MagicMock()
+    batcher.adecode_frames = AsyncMock(side_effect=RuntimeError("worker died"))
+
+    with patch.object(translator, "get_gesture_registry", return_value=make_registry(batcher)), \
+            patch.object(translator.settings, "GESTURE_LOCAL_FIRST", True):
+        assert await translator.recognize_locally([b"frame"]) is None
+
+
+@pytest.mark.asyncio
+async def test_zero_threshold_is_not_replaced_by_the_model_default():
+    batcher = MagicMock()
+    batcher.adecode_frames = AsyncMock(return_value=["frame"])
+
+    with patch.object(translator, "get_gesture_registry", return_value=make_registry(batcher)), \
+            patch.object(translator, "recognize_snapshot", AsyncMock(return_value=("привет", 0.1))), \
+            patch.object(translator.settings, "GESTURE_LOCAL_FIRST", True), \
+            patch.object(translator.settings, "GESTURE_LOCAL_THRESHOLD", 0.0):
+        response = await translator.recognize_locally([b"frame"])
+
+    assert response.text == "привет"
+    assert response.source == "local"
+
+
+@pytest.mark.asyncio
+async def test_images_must_be_a_list():
+    request = MagicMock()
+    request.json = AsyncMock(return_value={"images": "aGVsbG8="})
+
+    with pytest.raises(HTTPException) as exc:
+        await translator.process_gesture(request)
+
+    assert exc.value.status_code == 400
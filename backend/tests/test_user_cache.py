@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.service import UserLanguageCache
+
+
+@pytest.mark.asyncio
+async def test_user_language_cache_batches_lookups():
+    redis = AsyncMock()
+    redis.get_user_languages_by_ids.return_value = ["ru", None, None]
+    cache = UserLanguageCache(redis, maxsize=8, ttl=60, redis_ttl=3600, negative_ttl=30)
+
+    with patch("app.core.service.User") as user:
+        user.filter.return_value.values_list = AsyncMock(return_value=[(2, "en")])
+        assert await cache.get_many([1, 2, 3, 1]) == {1: "ru", 2: "en", 3: None}
+
+    redis.get_user_languages_by_ids.assert_awaited_once_with([1, 2, 3])
+    user.filter.assert_called_once_with(id__in=[2, 3])
+    redis.set_user_languages_by_ids.assert_any_await({2: "en"}, 3600)
+    redis.set_user_languages_by_ids.assert_any_await({3: ""}, 30)
+
+
+@pytest.mark.asyncio
+async def test_user_language_cache_serves_negatives_from_memory():
+    redis = AsyncMock()
+    redis.get_user_languages_by_ids.return_value = [None]
+    cache = UserLanguageCache(redis, maxsize=8, ttl=60, redis_ttl=3600, negative_ttl=30)
+
+    with patch("app.core.service.User") as user:
+        user.filter.return_value.values_list = AsyncMock(return_value=[])
+        assert await cache.get_many([7]) == {7: None}
+        assert await cache.get_many([7]) == {7: None}
+
+    user.filter.assert_called_once()
+    redis.get_user_languages_by_ids.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_user_language_cache_falls_back_to_database_when_redis_is_down():
+    redis = AsyncMock()
+    redis.get_user_languages_by_ids.side_effect = ConnectionError("redis is down")
+    redis.set_user_languages_by_ids.side_effect = ConnectionError("redis is down")
+    cache = UserLanguageCache(redis, maxsize=8, ttl=60, redis_ttl=3600, negative_ttl=30)
+
+    with patch("app.core.service.User") as user:
+        user.filter.return_value.values_list = AsyncMock(return_value=[(5, "ru")])
+        assert await cache.get_many([5]) == {5: "ru"}
+        assert await cache.get_many([5]) == {5: "ru"}
+
+    user.filter.assert_called_once()
@@ -7,6 +7,7 @@ from .translation import check_and_translate_to_russian
 from .enums import InputType, TaskType
 from .constants import TASK_PARAMETERS, TASK_INPUT_SUPPORT, FEW_SHOT_EXAMPLES
 from .llm import llm_generate
+from .rate_limit import UpstreamBusyError
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +109,8 @@ async def process_request(
             logger.info(f"Generated voice response at: {audio_path}")
         
         return classification_result
+    except UpstreamBusyError:
+        raise
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
         return {"status": "error", "message": f"Ошибка при обработке запроса: {str(e)}"} 
\ No newline at end of file
@@ -1,5 +1,7 @@
 import os
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, RateLimitError
+
+from .rate_limit import get_upstream_limiter
 
 client = AsyncOpenAI(
     api_key="rpa_3I7F4NH6UOAWV8KMWMIO8QPT1L5XW5VL5122VEUK1vr02z",
@@ -8,14 +10,19 @@ client = AsyncOpenAI(
 
 
 async def llm_generate(prompt: str) -> str:
-    """Generate text using OpenAI API asynchronously"""
-    response = await client.chat.completions.create(
-        model="Qwen/Qwen2-VL-7B-Instruct",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500,
-        temperature=0.1,
-        top_p=0.95
-    )
+    """Generate text using OpenAI API asynchronously, within the RunPod quota shared with other workers"""
+    limiter = get_upstream_limiter("runpod")
+    async with limiter.acquire():
+        try:
+            response = await client.chat.completions.create(
+                model="Qwen/Qwen2-VL-7B-Instruct",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=500,
+                temperature=0.1,
+                top_p=0.95
+            )
+        except RateLimitError as e:
+            raise limiter.throttled(e.response.headers.get("Retry-After")) from e
     return response.choices[0].message.content.strip()
 
     
\ No newline at end of file
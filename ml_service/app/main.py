@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 import orjson
 import redis.asyncio as aioredis
 
@@ -7,6 +8,7 @@ from typing import Optional
 
 from .agent import process_request
 from .enums import InputType
+from .rate_limit import UpstreamBusyError
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +20,11 @@ logger = logging.getLogger(__name__)
 # Redis configuration
 REDIS_URL = "redis://redis_db:6379"
 PROCESSING_QUEUE_KEY = "ai:processing:queue"
+# Throttled requests wait here, scored by the time they are due for a retry
+RETRY_QUEUE_KEY = "ai:processing:retry"
+MAX_ATTEMPTS = 5
+# Longest wait for a new request before the due retries are checked again
+POLL_TIMEOUT = 1
 
 
 class MLService:
@@ -41,17 +48,28 @@ class MLService:
         
         while True:
             try:
+                await self.requeue_due_retries()
                 # Get the next request from the queue
-                _, request_data = await self._redis.blpop(PROCESSING_QUEUE_KEY)
-                request = orjson.loads(request_data)
+                item = await self._redis.blpop(PROCESSING_QUEUE_KEY, timeout=POLL_TIMEOUT)
+                if item is None:
+                    continue
+                request = orjson.loads(item[1])
+                if is_expired(request):
+                    logger.warning(f"Dropping request {request['request_uuid']}, the backend stopped waiting for it")
+                    continue
                 
                 logger.info(f"Processing request: {request['request_uuid']}")
                 
                 # Process the request asynchronously
-                result = await process_request(
-                    input_data=request["text"],
-                    input_type=InputType.TEXT
-                )
+                try:
+                    result = await process_request(
+                        input_data=request["text"],
+                        input_type=InputType.TEXT
+                    )
+                except UpstreamBusyError as e:
+                    # Throttled, not failed: retry later and go on with the rest of the queue
+                    await self.retry_later(request, e.retry_after)
+                    continue
                 
                 if result["status"] == "success":
                     # Store the result back in Redis
@@ -69,6 +87,23 @@ class MLService:
                 logger.error(f"Error processing queue: {str(e)}", exc_info=True)
                 await asyncio.sleep(0.001)
     
+    async def retry_later(self, request: dict, delay: float) -> None:
+        """Schedule a throttled request for a retry, unless it is out of attempts or time"""
+        request["attempts"] = request.get("attempts", 0) + 1
+        due = time.time() + delay
+        if request["attempts"] > MAX_ATTEMPTS or due > request.get("deadline", float("inf")):
+            logger.warning(f"Dropping throttled request {request['request_uuid']} after {request['attempts']} attempts")
+            return
+        logger.warning(f"Request {request['request_uuid']} is throttled, retrying in {delay:.1f} s")
+        await self._redis.zadd(RETRY_QUEUE_KEY, {orjson.dumps(request): due})
+
+    async def requeue_due_retries(self) -> None:
+        """Move the retries that are due back to the head of the queue"""
+        for request_data in await self._redis.zrangebyscore(RETRY_QUEUE_KEY, "-inf", time.time()):
+            # Several workers may see the same retry, only the one that removes it requeues it
+            if await self._redis.zrem(RETRY_QUEUE_KEY, request_data):
+                await self._redis.lpush(PROCESSING_QUEUE_KEY, request_data)
+
     async def cleanup(self):
         """Cleanup resources"""
         if self._redis:
@@ -76,6 +111,11 @@ class MLService:
             logger.info("Redis connection closed")
 
 
+def is_expired(request: dict) -> bool:
+    """Whether the backend has already given up waiting for the response"""
+    return time.time() > request.get("deadline", float("inf"))
+
+
 async def main():
     """Main entry point"""
     service = MLService()
@@ -0,0 +1,180 @@
+"""
+Distributed rate and concurrency limits for external APIs.
+
+Copy of backend/app/core/rate_limit.py for the ML workers: the same Lua scripts on the
+same Redis keys, so the backend replicas and the workers share one quota per upstream.
+Keep the two files in sync.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis_db:6379")
+
+# Reserves one token. The bucket may go into debt of up to max_wait seconds of refill,
+# so callers queue in arrival order and sleep for the returned wait instead of polling.
+# Returns {acquired, wait seconds as a string}; Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if wait > max_wait then
+    return {0, tostring(wait)}
+end
+
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return {1, tostring(wait)}
+"""
+
+# Takes a slot of a counting semaphore kept as a sorted set of leases scored by expiry,
+# so slots of crashed callers free themselves. Returns 1 when the slot is taken.
+CONCURRENCY_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local lease = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + lease, ARGV[2])
+redis.call('EXPIRE', KEYS[1], math.ceil(lease) + 1)
+return 1
+"""
+
+SLOT_POLL_INTERVAL = 0.05
+
+
+class UpstreamBusyError(Exception):
+    """An external API is over its quota: the limiter would wait too long or the API answered 429."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Upstream {upstream} is busy, retry in {retry_after:.1f} s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class UpstreamLimiter:
+    """
+    Token bucket plus concurrency limit of one external API, shared through Redis.
+
+    Calls over the rate queue for up to max_wait seconds instead of failing. Redis errors
+    disable limiting for the call rather than failing it. Waits are logged, the workers
+    have no metrics endpoint.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        upstream: str,
+        rate: float,
+        burst: int,
+        concurrency: int,
+        max_wait: float,
+        lease: float = 120.0,
+    ):
+        self.upstream = upstream
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_wait = max_wait
+        self.lease = lease
+        self._redis = redis
+        self._bucket_key = f"ratelimit:{upstream}:tokens"
+        self._slots_key = f"ratelimit:{upstream}:slots"
+        self._take_token = redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._take_slot = redis.register_script(CONCURRENCY_SCRIPT)
+
+    async def wait_for_token(self, max_wait: float) -> None:
+        acquired, wait = await self._take_token(keys=[self._bucket_key], args=[self.rate, self.burst, max_wait])
+        wait = float(wait)
+        if not acquired:
+            raise UpstreamBusyError(self.upstream, wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def wait_for_slot(self, lease_id: str, deadline: float) -> None:
+        while not await self._take_slot(keys=[self._slots_key], args=[self.concurrency, lease_id, self.lease]):
+            if time.monotonic() >= deadline:
+                raise UpstreamBusyError(self.upstream, SLOT_POLL_INTERVAL)
+            await asyncio.sleep(SLOT_POLL_INTERVAL * (0.5 + random.random()))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Wait for a token and a concurrency slot for the duration of one call."""
+        started = time.monotonic()
+        lease_id = uuid.uuid4().hex
+        limited = True
+        try:
+            await self.wait_for_token(self.max_wait)
+            await self.wait_for_slot(lease_id, started + self.max_wait)
+        except UpstreamBusyError:
+            logger.warning(f"Rate limiter rejected a {self.upstream} call after {time.monotonic() - started:.2f} s")
+            raise
+        except Exception as e:
+            logger.warning(f"Rate limiter for {self.upstream} is unavailable, calling without it: {e}")
+            limited = False
+        waited = time.monotonic() - started
+        if waited > 0.01:
+            logger.info(f"Rate limiter delayed a {self.upstream} call by {waited:.2f} s")
+
+        try:
+            yield
+        finally:
+            if limited:
+                try:
+                    await self._redis.zrem(self._slots_key, lease_id)
+                except Exception as e:
+                    logger.warning(f"Failed to release {self.upstream} slot, it expires in {self.lease} s: {e}")
+
+    def throttled(self, retry_after: str | float | None = None) -> UpstreamBusyError:
+        """
+        Error for a 429 answer of the upstream itself, honouring its Retry-After header.
+        """
+        logger.warning(f"Upstream {self.upstream} answered 429, Retry-After: {retry_after}")
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = 1 / self.rate
+        return UpstreamBusyError(self.upstream, delay)
+
+
+@lru_cache()
+def get_upstream_limiter(upstream: str) -> UpstreamLimiter:
+    """Limiter of an external API configured by the <UPSTREAM>_* environment variables"""
+    prefix = upstream.upper()
+    return UpstreamLimiter(
+        aioredis.from_url(REDIS_URL, decode_responses=True),
+        upstream,
+        rate=float(os.getenv(f"{prefix}_RATE_LIMIT", "1")),
+        burst=int(os.getenv(f"{prefix}_BURST", "5")),
+        concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", "4")),
+        # The workers are not user-facing, queue longer than the backend
+        max_wait=float(os.getenv("UPSTREAM_MAX_WAIT", "30")),
+    )
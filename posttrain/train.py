@@ -9,20 +9,46 @@ from transformers import (
 )
 from peft import get_peft_model, LoraConfig, TaskType
 from datasets import Dataset
+import csv
+import gzip
 import json
-from typing import Dict, List
+from typing import Dict, Iterator, List
+
+def read_examples(dataset_path: str) -> Iterator:
+    """
+    Чтение примеров: JSON-массив синтетических примеров или выгрузка истории запросов
+    бэкенда (scripts.export_requests) в NDJSON/JSONL или CSV, в том числе сжатая .gz
+    """
+    opener = gzip.open if dataset_path.endswith('.gz') else open
+    path = dataset_path.removesuffix('.gz')
+    with opener(dataset_path, 'rt', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            yield from (json.loads(line) for line in f if line.strip())
+        elif path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            yield from json.load(f)
+
+def format_example(example) -> str | None:
+    """Текст обучающего примера; строки истории без запроса или ответа пропускаются"""
+    if isinstance(example, dict):
+        response = example.get('response')
+        if not example.get('input_text') or not response:
+            return None
+        if not isinstance(response, str):
+            response = json.dumps(response, ensure_ascii=False)
+        example = f"{example['input_text']}\n{response}"
+    return f"### Задача:\n{example}\n\n"
 
 def load_dataset(dataset_path: str) -> Dataset:
     """Загрузка готового датасета"""
-    with open(dataset_path, 'r', encoding='utf-8') as f:
-        examples = json.load(f)
-    
     # Преобразуем примеры в формат для обучения
     training_data = []
-    for example in examples:
+    for example in read_examples(dataset_path):
         # Форматируем каждый пример в единый текст
-        formatted_text = f"### Задача:\n{example}\n\n"
-        training_data.append({"text": formatted_text})
+        formatted_text = format_example(example)
+        if formatted_text is not None:
+            training_data.append({"text": formatted_text})
     
     return Dataset.from_list(training_data)
 